@@ -1,6 +1,17 @@
 from django.contrib import admin
 
-from book.models import Book
+from book.models import Author, Book
 
 
-admin.site.register(Book)
+@admin.register(Book)
+class BookAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        if (
+            "author" in form.changed_data
+            and "author_profile" not in form.changed_data
+        ):
+            obj.author_profile = Author.for_book(obj.author)
+        super().save_model(request, obj, form, change)
+
+
+admin.site.register(Author)
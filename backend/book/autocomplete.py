@@ -0,0 +1,146 @@
+import bisect
+import threading
+import time
+
+from book.models import Book
+
+
+class BookAutocompleteIndex:
+    """
+    In-memory prefix index over book titles and author names.
+
+    Entries are kept in a sorted list of ``(key, kind, label, book_id)``
+    tuples, where ``key`` is the casefolded label starting at one of its
+    words, so "prin" completes "The Little Prince" and "seredyuk"
+    completes "Nestor Seredyuk". A lookup is a binary search followed by
+    a short scan, no database round trip.
+
+    The index is built lazily from the database, kept up to date by the
+    ``Book`` signals of the current process and rebuilt every
+    ``refresh_interval`` seconds to pick up changes made by other
+    processes.
+    """
+
+    TITLE = "title"
+    AUTHOR = "author"
+
+    refresh_interval = 300
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self._book_entries = {}
+        self._built_at = 0
+
+    @staticmethod
+    def _normalize(value):
+        return " ".join(value.split()).casefold()
+
+    def _make_entries(self, book_id, title, author):
+        labels = [(self.TITLE, title.strip())]
+        labels.extend(
+            (self.AUTHOR, name.strip()) for name in author.split(",")
+        )
+
+        entries = []
+        for kind, label in labels:
+            words = self._normalize(label).split(" ")
+            for position in range(len(words)):
+                key = " ".join(words[position:])
+                if key:
+                    entries.append((key, kind, label, book_id))
+        return entries
+
+    def _build(self):
+        entries = []
+        book_entries = {}
+        books = Book.objects.values_list("id", "title", "author")
+        for book_id, title, author in books.iterator():
+            book_entries[book_id] = self._make_entries(book_id, title, author)
+            entries.extend(book_entries[book_id])
+
+        entries.sort()
+        self._entries = entries
+        self._book_entries = book_entries
+        self._built_at = time.monotonic()
+
+    def _ensure_built(self):
+        expired = time.monotonic() - self._built_at > self.refresh_interval
+        if self._entries is None or expired:
+            self._build()
+
+    def _remove(self, book_id):
+        for entry in self._book_entries.pop(book_id, []):
+            position = bisect.bisect_left(self._entries, entry)
+            if (
+                position < len(self._entries)
+                and self._entries[position] == entry
+            ):
+                del self._entries[position]
+
+    def update_book(self, book):
+        """Replace the entries of a created or edited book."""
+        with self._lock:
+            if self._entries is None:
+                return
+            self._remove(book.pk)
+            entries = self._make_entries(book.pk, book.title, book.author)
+            for entry in entries:
+                bisect.insort(self._entries, entry)
+            self._book_entries[book.pk] = entries
+
+    def remove_book(self, book_id):
+        with self._lock:
+            if self._entries is not None:
+                self._remove(book_id)
+
+    def invalidate(self):
+        """Drop the index, it is rebuilt on the next lookup."""
+        with self._lock:
+            self._entries = None
+            self._book_entries = {}
+
+    def _scan(self, prefix):
+        key = self._normalize(prefix)
+        if not key:
+            return
+        position = bisect.bisect_left(self._entries, (key,))
+        while position < len(self._entries):
+            entry = self._entries[position]
+            if not entry[0].startswith(key):
+                return
+            yield entry
+            position += 1
+
+    def complete(self, prefix, limit=10):
+        """Return up to ``limit`` title and author completions."""
+        completions = {self.TITLE: [], self.AUTHOR: []}
+        seen = set()
+        with self._lock:
+            self._ensure_built()
+            for _, kind, label, _ in self._scan(prefix):
+                if (kind, label) in seen or len(completions[kind]) >= limit:
+                    continue
+                seen.add((kind, label))
+                completions[kind].append(label)
+                if all(len(found) >= limit for found in completions.values()):
+                    break
+        return {
+            "titles": completions[self.TITLE],
+            "authors": completions[self.AUTHOR],
+        }
+
+    def book_ids(self, prefix, limit=10):
+        """Return ids of up to ``limit`` books matching by title or author."""
+        ids = []
+        with self._lock:
+            self._ensure_built()
+            for *_, book_id in self._scan(prefix):
+                if book_id not in ids:
+                    ids.append(book_id)
+                    if len(ids) >= limit:
+                        break
+        return ids
+
+
+book_autocomplete = BookAutocompleteIndex()
@@ -0,0 +1,208 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from library_service.caching import (
+    bump_version,
+    conditional_response,
+    get_version,
+    increment,
+    request_fingerprint,
+)
+from library_service.renderers import JSONFragments, dumps_json
+from library_service.serializers import ValuesPlan
+
+CATALOG_GENERATION_KEY = "book:catalog:generation"
+CATALOG_HITS_KEY = "book:catalog:hits"
+CATALOG_MISSES_KEY = "book:catalog:misses"
+BOOK_VERSION_KEY = "book:version:{}"
+FRAGMENT_HITS_KEY = "book:fragment:hits"
+FRAGMENT_MISSES_KEY = "book:fragment:misses"
+
+
+def get_catalog_generation():
+    return get_version(CATALOG_GENERATION_KEY)
+
+
+def bump_catalog_generation():
+    """Invalidate every cached catalog response and catalog ETag."""
+    bump_version(CATALOG_GENERATION_KEY)
+
+
+def get_book_versions(book_ids):
+    """
+    Return the fragment versions of books, ``0`` for never changed ones.
+
+    Missing versions are not written back, so a list of thousands of
+    books costs a single multi-get.
+    """
+    keys = {book_id: BOOK_VERSION_KEY.format(book_id) for book_id in book_ids}
+    found = cache.get_many(keys.values())
+    return {book_id: found.get(key, 0) for book_id, key in keys.items()}
+
+
+def bump_book_versions(book_ids):
+    """Invalidate the cached fragments of the given books."""
+    for book_id in book_ids:
+        bump_version(BOOK_VERSION_KEY.format(book_id))
+
+
+def invalidate_books(book_ids):
+    """
+    Invalidate everything cached about some books.
+
+    ``Book`` signals do this on save and delete; code changing books
+    with ``QuerySet.update()`` must call it itself.
+    """
+    bump_catalog_generation()
+    bump_book_versions(book_ids)
+
+
+def get_catalog_cache_stats():
+    return {
+        "generation": get_catalog_generation(),
+        "hits": cache.get(CATALOG_HITS_KEY, 0),
+        "misses": cache.get(CATALOG_MISSES_KEY, 0),
+        "fragment_hits": cache.get(FRAGMENT_HITS_KEY, 0),
+        "fragment_misses": cache.get(FRAGMENT_MISSES_KEY, 0),
+    }
+
+
+def catalog_cache_key(request, generation):
+    fingerprint = request_fingerprint(request, request.accepted_media_type)
+    return f"book:catalog:{generation}:{fingerprint}"
+
+
+class CatalogCacheMixin:
+    """
+    Cache ``list`` and ``retrieve`` responses of the book catalog.
+
+    Entries are keyed by the catalog generation, so every book write
+    invalidates all of them at once through ``bump_catalog_generation``,
+    and by the negotiated media type, so streamed formats never get a
+    cached JSON body.
+    The generation also drives the ETag, so clients holding a current
+    copy get a ``304 Not Modified`` before the cache is even consulted.
+    """
+
+    def _cached_response(self, request, handler, *args, **kwargs):
+        generation = get_catalog_generation()
+
+        def get_response():
+            key = catalog_cache_key(request, generation)
+            cached = cache.get(key)
+            if cached is not None:
+                increment(CATALOG_HITS_KEY)
+                response = Response(cached)
+                response["X-Cache"] = "HIT"
+                return response
+
+            increment(CATALOG_MISSES_KEY)
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(
+                    key,
+                    response.data,
+                    timeout=settings.BOOK_CATALOG_CACHE_TIMEOUT,
+                )
+            response["X-Cache"] = "MISS"
+            return response
+
+        return conditional_response(request, [generation], get_response)
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+
+def get_book_fragments(book_ids, variant, render):
+    """
+    Return the encoded JSON of books, in the order of ``book_ids``.
+
+    Fragments are cached per book under its current version, so a book
+    write invalidates only its own fragment. Misses are rendered in one
+    call to ``render(missing_ids)``, which returns ``{id: bytes}``, and
+    stored with a single multi-set. Books gone in the meantime are left
+    out.
+    """
+    versions = get_book_versions(book_ids)
+    keys = {
+        book_id: f"book:fragment:{variant}:{book_id}:{versions[book_id]}"
+        for book_id in book_ids
+    }
+    found = cache.get_many(keys.values())
+    fragments = {
+        book_id: found[key] for book_id, key in keys.items() if key in found
+    }
+
+    missing = [book_id for book_id in keys if book_id not in fragments]
+    if missing:
+        rendered = render(missing)
+        cache.set_many(
+            {keys[book_id]: rendered[book_id] for book_id in rendered},
+            timeout=settings.BOOK_CATALOG_CACHE_TIMEOUT,
+        )
+        fragments.update(rendered)
+        increment(FRAGMENT_MISSES_KEY, len(missing))
+    if len(keys) > len(missing):
+        increment(FRAGMENT_HITS_KEY, len(keys) - len(missing))
+
+    return [fragments[book_id] for book_id in book_ids if book_id in fragments]
+
+
+class BookFragmentListMixin:
+    """
+    Assemble book lists from per-book cached JSON fragments.
+
+    The filtered, ordered and paginated query only reads book ids (and
+    the ordering values needed by keyset cursors); the rows themselves
+    come from ``get_book_fragments`` and are written out as they are by
+    ``FragmentJSONRenderer``. Fragments depend on the selected fields and
+    on the host used in image URLs, both are part of their key.
+    """
+
+    def get_fragment_variant(self, serializer):
+        host = self.request.build_absolute_uri("/")
+        parts = (host, tuple(serializer.fields))
+        return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+    def render_fragments(self, serializer, book_ids):
+        queryset = self.get_queryset().filter(pk__in=book_ids)
+        plan = ValuesPlan.compile(serializer)
+        if plan is not None:
+            return {
+                row["pk"]: dumps_json(plan.render_row(row))
+                for row in plan.values(queryset)
+            }
+        return {
+            book.pk: dumps_json(serializer.to_representation(book))
+            for book in queryset
+        }
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = [
+            field.lstrip("-")
+            for field in queryset.query.order_by
+            if isinstance(field, str) and field.lstrip("-") != "pk"
+        ]
+        rows = queryset.values("pk", *ordering)
+        page = self.paginate_queryset(rows)
+
+        serializer = self.get_serializer()
+        fragments = JSONFragments(
+            get_book_fragments(
+                [row["pk"] for row in (rows if page is None else page)],
+                self.get_fragment_variant(serializer),
+                lambda book_ids: self.render_fragments(serializer, book_ids),
+            )
+        )
+        if page is not None:
+            return self.get_paginated_response(fragments)
+        return Response(fragments)
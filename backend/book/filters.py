@@ -1,5 +1,14 @@
+import re
+
 import django_filters
-from django.db.models import Q
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Greatest
+from rest_framework.filters import OrderingFilter, SearchFilter
 
 from book.models import Book
 
@@ -7,6 +16,9 @@ from book.models import Book
 class BookFilter(django_filters.FilterSet):
     id = django_filters.CharFilter(method="search_by_ids")
     author = django_filters.CharFilter(method="search_by_authors")
+    author_id = django_filters.CharFilter(method="search_by_author_ids")
+    author_slug = django_filters.CharFilter(method="search_by_author_slugs")
+    title = django_filters.CharFilter(method="search_by_titles")
 
     daily_fee = django_filters.NumberFilter(field_name="daily_fee")
 
@@ -15,7 +27,16 @@ class BookFilter(django_filters.FilterSet):
 
     class Meta:
         model = Book
-        fields = ["id", "author", "daily_fee", "min_fee", "max_fee"]
+        fields = [
+            "id",
+            "author",
+            "author_id",
+            "author_slug",
+            "title",
+            "daily_fee",
+            "min_fee",
+            "max_fee",
+        ]
 
     def search_by_ids(self, queryset, name, value):
         if not value:
@@ -23,11 +44,117 @@ class BookFilter(django_filters.FilterSet):
         ids_list = value.split(",")
         return queryset.filter(id__in=ids_list).distinct()
 
+    def search_by_author_ids(self, queryset, name, value):
+        terms = [term.strip() for term in value.split(",") if term.strip()]
+        if not terms:
+            return queryset
+        ids = [int(term) for term in terms if term.isdigit()]
+        return queryset.filter(author_profile_id__in=ids)
+
+    def search_by_author_slugs(self, queryset, name, value):
+        slugs = [slug.strip() for slug in value.split(",") if slug.strip()]
+        if not slugs:
+            return queryset
+        return queryset.filter(author_profile__slug__in=slugs)
+
     def search_by_authors(self, queryset, name, value):
-        if not value:
+        return self._search_by_similarity(queryset, "author", value)
+
+    def search_by_titles(self, queryset, name, value):
+        return self._search_by_similarity(queryset, "title", value)
+
+    @staticmethod
+    def _search_by_similarity(queryset, field_name, value):
+        """
+        Match a comma separated list of terms against a trigram-indexed field.
+
+        A row matches if it contains one of the terms or has a word close
+        enough to it (typos), and gets a ``<field>_similarity`` annotation
+        that ``BookOrderingFilter`` uses to put the best matches first.
+        The annotation is cast from ``real`` to double precision so its
+        value round-trips exactly through keyset pagination cursors.
+        """
+        terms = [term.strip() for term in value.split(",") if term.strip()]
+        if not terms:
             return queryset
-        authors_list = value.split(",")
+
         query = Q()
-        for search_author in authors_list:
-            query |= Q(author__icontains=search_author)
-        return queryset.filter(query).distinct()
+        for term in terms:
+            query |= Q(**{f"{field_name}__icontains": term})
+            query |= Q(**{f"{field_name}__trigram_word_similar": term})
+
+        similarities = [
+            TrigramWordSimilarity(term, field_name) for term in terms
+        ]
+        similarity = (
+            Greatest(*similarities) if len(similarities) > 1
+            else similarities[0]
+        )
+        return queryset.filter(query).annotate(
+            **{f"{field_name}_similarity": Cast(similarity, FloatField())}
+        )
+
+
+class BookSearchFilter(SearchFilter):
+    """
+    Full-text search over the GIN-indexed ``Book.search_vector`` column.
+
+    Every search term is matched as a prefix of a word in the title or
+    the author, so ``?search=med`` still finds "Medicine". Matches are
+    annotated with ``search_rank`` (as double precision, like the
+    similarity annotations of ``BookFilter``) for ``BookOrderingFilter``.
+    """
+
+    search_config = "english"
+    search_description = "Full-text search by book title and author."
+
+    def get_search_query(self, search_terms):
+        words = []
+        for term in search_terms:
+            words.extend(re.findall(r"\w+", term))
+        if not words:
+            return None
+        return SearchQuery(
+            " & ".join(f"{word}:*" for word in words),
+            search_type="raw",
+            config=self.search_config,
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        search_query = self.get_search_query(self.get_search_terms(request))
+        if search_query is None:
+            return queryset
+
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=Cast(
+                SearchRank(F("search_vector"), search_query), FloatField()
+            )
+        )
+
+
+class BookOrderingFilter(OrderingFilter):
+    """
+    Put the most relevant books first when searching.
+
+    An explicit ``ordering`` parameter always wins. Otherwise the relevance
+    annotations added by ``BookSearchFilter`` and ``BookFilter`` lead and
+    the view's default ordering breaks ties. Must run after both of them.
+    """
+
+    relevance_annotations = (
+        "search_rank",
+        "author_similarity",
+        "title_similarity",
+    )
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if request.query_params.get(self.ordering_param):
+            return ordering
+
+        relevance = [
+            f"-{annotation}"
+            for annotation in self.relevance_annotations
+            if annotation in queryset.query.annotations
+        ]
+        return [*relevance, *(ordering or [])]
@@ -0,0 +1,293 @@
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Count, F, Q
+
+from book.cache import invalidate_books
+from book.models import Book
+
+
+def _next_available_sql(expected):
+    """
+    SQL of the date a copy of ``book`` is expected back.
+
+    The earliest expected return of its open borrowings, or ``expected``
+    (the borrowing about to be created) if sooner, pushed back by the
+    average days late of the past returns of the book, rounded up.
+    """
+    borrowings = connection.ops.quote_name(
+        Book._meta.get_field("borrowings").related_model._meta.db_table
+    )
+    return (
+        f"LEAST({expected}, ("
+        f"SELECT MIN(expected_return_date) FROM {borrowings} "
+        "WHERE book_id = book.id AND actual_return_date IS NULL"
+        ")) + COALESCE(CEIL("
+        "book.late_days::numeric / NULLIF(book.returned_count, 0)"
+        "), 0)::integer"
+    )
+
+
+def reserve_copy(book_id, expected_return_date=None):
+    """
+    Take one copy of a book off the shelf, if there is one left.
+
+    A single conditional ``UPDATE ... WHERE inventory > 0`` does the check
+    and the decrement, so concurrent borrowers can neither oversell the
+    book nor lose each other's updates, and they only wait on each other
+    for the duration of the statement. Taking the last copy also sets
+    ``next_available_date``, counting the borrowing to be created for
+    ``expected_return_date``. Returns whether a copy was taken.
+    """
+    table = connection.ops.quote_name(Book._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS book SET inventory = book.inventory - 1, "
+            "next_available_date = CASE WHEN book.inventory = 1 THEN "
+            f"{_next_available_sql('%s::date')} END "
+            "WHERE book.id = %s AND book.inventory > 0",
+            [expected_return_date, book_id],
+        )
+        reserved = cursor.rowcount
+    if reserved:
+        invalidate_books([book_id])
+    return bool(reserved)
+
+
+def reserve_copies(book_ids, expected_return_dates=None):
+    """
+    Take one copy of each of several books in a single statement.
+
+    Same guarantees as ``reserve_copy``, ``expected_return_dates`` are
+    those of the borrowings to be created, in the order of ``book_ids``.
+    Books without a copy left are skipped. Returns the set of ids a copy
+    was taken of.
+    """
+    book_ids = list(book_ids)
+    if not book_ids:
+        return set()
+    if expected_return_dates is None:
+        expected_return_dates = [None] * len(book_ids)
+    table = connection.ops.quote_name(Book._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS book SET inventory = book.inventory - 1, "
+            "next_available_date = CASE WHEN book.inventory = 1 THEN "
+            f"{_next_available_sql('reserved.expected')} END "
+            "FROM unnest(%s::bigint[], %s::date[]) "
+            "AS reserved (id, expected) "
+            "WHERE book.id = reserved.id AND book.inventory > 0 "
+            "RETURNING book.id",
+            [book_ids, list(expected_return_dates)],
+        )
+        reserved = {row[0] for row in cursor.fetchall()}
+    if reserved:
+        invalidate_books(reserved)
+    return reserved
+
+
+def release_copy(book_id, late_days=0):
+    """
+    Put one returned copy of a book back on the shelf.
+
+    ``late_days`` is how late the copy was returned, added to the history
+    ``next_available_date`` is predicted from. The book is available
+    again, so its ``next_available_date`` is cleared.
+    """
+    Book.objects.filter(pk=book_id).update(
+        inventory=F("inventory") + 1,
+        returned_count=F("returned_count") + 1,
+        late_days=F("late_days") + late_days,
+        next_available_date=None,
+    )
+    invalidate_books([book_id])
+
+
+def release_copies(book_ids, late_days=None):
+    """
+    Put returned copies of several books back, one per occurrence of an id.
+
+    ``late_days`` are how late each copy was returned, in the order of
+    ``book_ids``. Copies and days late are summed per book and written
+    by a single ``UPDATE ... FROM unnest(...)``, however large the pile.
+    """
+    book_ids = list(book_ids)
+    copies = Counter(book_ids)
+    days = Counter()
+    for book_id, late in zip(book_ids, late_days or [0] * len(book_ids)):
+        days[book_id] += late
+    if not copies:
+        return
+
+    table = connection.ops.quote_name(Book._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS book "
+            "SET inventory = book.inventory + returned.copies, "
+            "returned_count = book.returned_count + returned.copies, "
+            "late_days = book.late_days + returned.late_days, "
+            "next_available_date = NULL "
+            "FROM unnest(%s::bigint[], %s::integer[], %s::integer[]) "
+            "AS returned (id, copies, late_days) "
+            "WHERE book.id = returned.id",
+            [
+                list(copies),
+                list(copies.values()),
+                [days[book_id] for book_id in copies],
+            ],
+        )
+    invalidate_books(copies)
+
+
+def set_aside_copies(book_ids):
+    """
+    Take copies back off the shelf for the holds they were given to.
+
+    One copy per occurrence of an id, by a single ``UPDATE ... FROM
+    unnest(...)``. The copies wait for their patrons and can no longer be
+    borrowed by anyone else; setting aside the last copy of a book sets
+    its ``next_available_date`` again.
+    """
+    copies = Counter(book_ids)
+    if not copies:
+        return
+    table = connection.ops.quote_name(Book._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS book "
+            "SET inventory = book.inventory - held.copies, "
+            "next_available_date = CASE WHEN book.inventory = held.copies "
+            f"THEN {_next_available_sql('NULL::date')} END "
+            "FROM unnest(%s::bigint[], %s::integer[]) AS held (id, copies) "
+            "WHERE book.id = held.id",
+            [list(copies), list(copies.values())],
+        )
+    invalidate_books(copies)
+
+
+def put_back_copies(book_ids):
+    """
+    Put copies set aside for holds back on the shelf.
+
+    One copy per occurrence of an id, for holds cancelled or expired
+    before their patron came. Unlike ``release_copies`` this is not a
+    return and leaves the lateness history alone.
+    """
+    copies = Counter(book_ids)
+    if not copies:
+        return
+    table = connection.ops.quote_name(Book._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS book "
+            "SET inventory = book.inventory + held.copies, "
+            "next_available_date = NULL "
+            "FROM unnest(%s::bigint[], %s::integer[]) AS held (id, copies) "
+            "WHERE book.id = held.id",
+            [list(copies), list(copies.values())],
+        )
+    invalidate_books(copies)
+
+
+def find_inventory_drift():
+    """
+    Return the books whose inventory drifted, as tuples.
+
+    One grouped aggregate counts the open borrowings and the copies set
+    aside for ready holds of every book, and only keeps the books whose
+    inventory is not ``total_copies`` minus both counts, or whose
+    ``total_copies`` is not known yet. Rows are ``(book_id, inventory,
+    total_copies, open_borrowings, set_aside)``.
+    """
+    return (
+        Book.objects.annotate(
+            open_borrowings=Count(
+                "borrowings",
+                filter=Q(borrowings__actual_return_date__isnull=True),
+                distinct=True,
+            ),
+            set_aside=Count(
+                "holds",
+                filter=Q(holds__ready_until__isnull=False),
+                distinct=True,
+            ),
+        )
+        .filter(
+            Q(total_copies__isnull=True)
+            | ~Q(
+                inventory=F("total_copies")
+                - F("open_borrowings")
+                - F("set_aside")
+            )
+        )
+        .order_by()
+        .values_list(
+            "id", "inventory", "total_copies", "open_borrowings", "set_aside"
+        )
+    )
+
+
+def reconcile_inventory(dry_run=False):
+    """
+    Set the inventory of every book to its copies not borrowed.
+
+    Drift is found by ``find_inventory_drift`` and corrected by a single
+    ``UPDATE ... FROM unnest(...)``, which only touches rows whose
+    inventory is still the one read: a borrowing created or returned in
+    between has moved both sides already and the book is left for the
+    next run. Copies set aside for ready holds are not on the shelf
+    either. Books without ``total_copies`` (created by ``bulk_create``)
+    keep their inventory and get their total counted.
+
+    Returns the discrepancies, as dicts, whether corrected or not.
+    """
+    discrepancies = []
+    updates = []
+    for book_id, inventory, total_copies, open_borrowings, set_aside in (
+        find_inventory_drift().iterator()
+    ):
+        if total_copies is None:
+            updates.append(
+                (
+                    book_id,
+                    inventory,
+                    inventory,
+                    inventory + open_borrowings + set_aside,
+                )
+            )
+            continue
+        expected = max(total_copies - open_borrowings - set_aside, 0)
+        discrepancies.append(
+            {
+                "book": book_id,
+                "inventory": inventory,
+                "expected": expected,
+                "total_copies": total_copies,
+                "open_borrowings": open_borrowings,
+                "set_aside": set_aside,
+            }
+        )
+        if expected != inventory:
+            updates.append((book_id, inventory, expected, total_copies))
+
+    if updates and not dry_run:
+        table = connection.ops.quote_name(Book._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} AS book "
+                "SET inventory = drift.expected, "
+                "total_copies = drift.total_copies, "
+                "next_available_date = CASE WHEN drift.expected = 0 "
+                "THEN book.next_available_date END "
+                "FROM unnest("
+                "%s::bigint[], %s::integer[], %s::integer[], %s::integer[]"
+                ") AS drift (id, inventory, expected, total_copies) "
+                "WHERE book.id = drift.id "
+                "AND book.inventory = drift.inventory "
+                "RETURNING book.id",
+                [list(column) for column in zip(*updates)],
+            )
+            corrected = {row[0] for row in cursor.fetchall()}
+        if corrected:
+            invalidate_books(corrected)
+    return discrepancies
@@ -0,0 +1,96 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from book.models import Book
+from book.serializers import BookSerializer
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingListSerializer
+from library_service.serializers import ValuesPlan
+from payment.models import Payment
+from payment.serializers import PaymentSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare list serialization through DRF serializers with the "
+        "queryset.values() plan on the rows of the current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1000,
+            help="Number of rows serialized per run (default 1000).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per measurement, the best one is kept (default 5).",
+        )
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        request = APIRequestFactory().get("/")
+        context = {"request": request}
+        cases = [
+            ("books", Book.objects.order_by("id"), BookSerializer, {}),
+            (
+                "borrowings",
+                Borrowing.objects.order_by("id"),
+                BorrowingListSerializer,
+                {},
+            ),
+            (
+                "borrowings?expand=book",
+                Borrowing.objects.select_related("book").order_by("id"),
+                BorrowingListSerializer,
+                {"expand": ["book"]},
+            ),
+            (
+                "payments",
+                Payment.objects.select_related("borrowing").order_by("id"),
+                PaymentSerializer,
+                {},
+            ),
+        ]
+
+        self.stdout.write(
+            f"{'list':<24}{'rows':>8}{'serializer':>14}"
+            f"{'values':>12}{'speedup':>10}"
+        )
+        for name, queryset, serializer_class, kwargs in cases:
+            queryset = queryset[:rows]
+            count = queryset.count()
+            if not count:
+                self.stdout.write(f"{name:<24}{0:>8}  no rows, skipped")
+                continue
+
+            def serialize():
+                return serializer_class(
+                    queryset.all(), many=True, context=context, **kwargs
+                ).data
+
+            with override_settings(FAST_LIST_SERIALIZATION=True):
+                plan = ValuesPlan.compile(
+                    serializer_class(context=context, **kwargs)
+                )
+
+            def render():
+                return plan.render(plan.values(queryset.all()))
+
+            if serialize() != render():
+                self.stderr.write(f"{name}: outputs differ")
+
+            repeat = options["repeat"]
+            slow = min(timeit.repeat(serialize, number=1, repeat=repeat))
+            fast = min(timeit.repeat(render, number=1, repeat=repeat))
+            self.stdout.write(
+                f"{name:<24}{count:>8}{slow * 1000:>12.1f}ms"
+                f"{fast * 1000:>10.1f}ms{slow / fast:>9.1f}x"
+            )
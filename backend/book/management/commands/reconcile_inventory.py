@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from book.inventory import reconcile_inventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Set the inventory of every book to its copies not borrowed and "
+        "report the books whose inventory had drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the discrepancies, change nothing.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        discrepancies = reconcile_inventory(dry_run=options["dry_run"])
+        elapsed = time.perf_counter() - started
+
+        for item in discrepancies:
+            self.stdout.write(
+                f"book {item['book']}: inventory {item['inventory']}, "
+                f"expected {item['expected']} "
+                f"({item['total_copies']} copies, "
+                f"{item['open_borrowings']} borrowed, "
+                f"{item['set_aside']} set aside for holds)"
+            )
+        action = "found" if options["dry_run"] else "corrected"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(discrepancies)} discrepancies {action} "
+                f"in {elapsed:.2f}s"
+            )
+        )
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:42
+
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0005_book_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Author",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "slug",
+                    models.SlugField(allow_unicode=True, max_length=255, unique=True),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        django.db.models.functions.text.Lower("name"),
+                        name="book_author_name_ci_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="author_profile",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="books",
+                to="book.author",
+            ),
+        ),
+    ]
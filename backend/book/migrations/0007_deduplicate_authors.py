@@ -0,0 +1,57 @@
+import re
+
+from django.db import migrations
+from django.db.models import Count
+from django.utils.text import slugify
+
+SEVERAL_AUTHORS = re.compile(r"[,;&]|\s+and\s+", re.IGNORECASE)
+
+
+def deduplicate_authors(apps, schema_editor):
+    """
+    Create one Author per distinct author string and link the books.
+
+    Strings differing only by case or whitespace are merged and the most
+    used spelling becomes the author name. The books keep their author
+    string as written, like ``Author.for_book`` does, and strings listing
+    several authors are left unlinked.
+    """
+    Author = apps.get_model("book", "Author")
+    Book = apps.get_model("book", "Book")
+
+    spellings = {}
+    rows = (
+        Book.objects.values("author")
+        .annotate(books=Count("id"))
+        .order_by("-books", "author")
+    )
+    for row in rows:
+        if SEVERAL_AUTHORS.search(row["author"]):
+            continue
+        name = " ".join(row["author"].split())
+        spellings.setdefault(name.lower(), []).append(row["author"])
+
+    slugs = set(Author.objects.values_list("slug", flat=True))
+    for names in spellings.values():
+        name = " ".join(names[0].split())
+        base = slugify(name, allow_unicode=True)[:240] or "author"
+        slug = base
+        suffix = 2
+        while slug in slugs:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        slugs.add(slug)
+
+        author = Author.objects.create(name=name, slug=slug)
+        Book.objects.filter(author__in=names).update(author_profile=author)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0006_author"),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_authors, migrations.RunPython.noop),
+    ]
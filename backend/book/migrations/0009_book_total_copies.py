@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:13
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_total_copies(apps, schema_editor):
+    """Copies owned are the ones on the shelf plus the borrowed ones."""
+    Book = apps.get_model("book", "Book")
+    Borrowing = apps.get_model("borrowing", "Borrowing")
+
+    open_borrowings = (
+        Borrowing.objects.filter(
+            book=OuterRef("pk"), actual_return_date__isnull=True
+        )
+        .values("book")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Book.objects.update(
+        total_copies=F("inventory")
+        + Coalesce(Subquery(open_borrowings), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0007_deduplicate_authors"),
+        ("borrowing", "0005_borrowing_accrued_fine"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="total_copies",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(count_total_copies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:28
+
+from django.db import migrations, models
+
+
+def backfill_availability(apps, schema_editor):
+    """
+    Count the lateness of past returns, live and archived, and predict
+    the next available date of the books with no copy left.
+    """
+    book, borrowing, archived = (
+        schema_editor.quote_name(apps.get_model(*model)._meta.db_table)
+        for model in (
+            ("book", "Book"),
+            ("borrowing", "Borrowing"),
+            ("borrowing", "ArchivedBorrowing"),
+        )
+    )
+    schema_editor.execute(
+        f"UPDATE {book} AS book "
+        "SET returned_count = history.returned, "
+        "late_days = history.late_days "
+        "FROM ("
+        "SELECT book_id, COUNT(*) AS returned, "
+        "SUM(GREATEST(actual_return_date - expected_return_date, 0)) "
+        "AS late_days FROM ("
+        "SELECT book_id, expected_return_date, actual_return_date "
+        f"FROM {borrowing} WHERE actual_return_date IS NOT NULL "
+        "UNION ALL "
+        "SELECT book_id, expected_return_date, actual_return_date "
+        f"FROM {archived}"
+        ") AS returns GROUP BY book_id"
+        ") AS history "
+        "WHERE book.id = history.book_id"
+    )
+    schema_editor.execute(
+        f"UPDATE {book} AS book SET next_available_date = ("
+        f"SELECT MIN(expected_return_date) FROM {borrowing} "
+        "WHERE book_id = book.id AND actual_return_date IS NULL"
+        ") + COALESCE(CEIL("
+        "book.late_days::numeric / NULLIF(book.returned_count, 0)"
+        "), 0)::integer "
+        "WHERE book.inventory = 0"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0009_book_total_copies"),
+        ("borrowing", "0007_hold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="late_days",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="next_available_date",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="returned_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            backfill_availability, migrations.RunPython.noop
+        ),
+    ]
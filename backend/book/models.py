@@ -1,9 +1,15 @@
 import os
+import re
 import uuid
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Lower, Upper
 from django.utils.text import slugify
 
+SEVERAL_AUTHORS = re.compile(r"[,;&]|\s+and\s+", re.IGNORECASE)
+
 
 def book_image_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
@@ -12,6 +18,67 @@ def book_image_file_path(instance, filename):
     return os.path.join("uploads/movies/", filename)
 
 
+class Author(models.Model):
+    """
+    A distinct author name, shared by all books written under it.
+
+    Names are matched case-insensitively with whitespace collapsed, see
+    ``Author.get_for_name``; ``Book.author`` keeps the name as written on
+    the book, ``Book.author_profile`` links it to its ``Author``. The
+    link is set by ``BookSerializer`` and the admin through
+    ``Author.for_book``. Author strings are not split, so a book credited
+    to several authors ("A, B") is linked to no ``Author`` at all.
+    """
+
+    name = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=255, unique=True, allow_unicode=True)
+
+    class Meta:
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(
+                Lower("name"), name="book_author_name_ci_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def normalize_name(name):
+        return " ".join(name.split())
+
+    @classmethod
+    def make_slug(cls, name):
+        base = slugify(name, allow_unicode=True)[:240] or "author"
+        slug = base
+        suffix = 2
+        while cls.objects.filter(slug=slug).exists():
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        return slug
+
+    @classmethod
+    def get_for_name(cls, name):
+        """Return the author called ``name``, creating it if needed."""
+        name = cls.normalize_name(name)
+        author = cls.objects.filter(name__iexact=name).first()
+        if author is not None:
+            return author
+        try:
+            with transaction.atomic():
+                return cls.objects.create(name=name, slug=cls.make_slug(name))
+        except IntegrityError:
+            return cls.objects.get(name__iexact=name)
+
+    @classmethod
+    def for_book(cls, name):
+        """Return the author of a book credited to ``name``, if only one."""
+        if SEVERAL_AUTHORS.search(name):
+            return None
+        return cls.get_for_name(name)
+
+
 class Book(models.Model):
 
     class CoverChoices(models.TextChoices):
@@ -20,10 +87,108 @@ class Book(models.Model):
 
     title = models.CharField(max_length=255)
     author = models.CharField(max_length=255)
+    author_profile = models.ForeignKey(
+        Author,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="books",
+    )
     cover = models.CharField(max_length=10, choices=CoverChoices.choices)
     inventory = models.PositiveIntegerField()
+    # Copies owned, on the shelf or borrowed. Follows the changes made to
+    # ``inventory`` through ``save()``, see ``reconcile_inventory``.
+    total_copies = models.PositiveIntegerField(
+        null=True, blank=True, editable=False
+    )
+    # Earliest date a copy is expected back while none is left, ``None``
+    # otherwise. Maintained by the reserve and release statements of
+    # ``book.inventory`` from the open borrowings and the lateness of past
+    # returns counted below.
+    next_available_date = models.DateField(
+        null=True, blank=True, editable=False
+    )
+    returned_count = models.PositiveIntegerField(default=0, editable=False)
+    late_days = models.PositiveIntegerField(default=0, editable=False)
     daily_fee = models.DecimalField(decimal_places=2, max_digits=10)
     image = models.ImageField(null=True, blank=True, upload_to=book_image_file_path)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector("author", weight="B", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="book_search_vector_idx"),
+            GinIndex(
+                fields=["title"],
+                name="book_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["author"],
+                name="book_author_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="book_title_upper_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("author"), name="gin_trgm_ops"),
+                name="book_author_upper_trgm_idx",
+            ),
+            models.Index(
+                fields=["daily_fee", "id"], name="book_daily_fee_idx"
+            ),
+            models.Index(fields=["title", "id"], name="book_title_idx"),
+            models.Index(fields=["author", "id"], name="book_author_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} / {self.author}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        book = super().from_db(db, field_names, values)
+        book._loaded_inventory = book.__dict__.get("inventory")
+        return book
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_inventory = self.__dict__.get("inventory")
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        loaded_inventory = getattr(self, "_loaded_inventory", None)
+        if self._state.adding and self.total_copies is None:
+            self.total_copies = self.inventory
+        elif (
+            loaded_inventory is not None
+            and self.total_copies is not None
+            and self.inventory != loaded_inventory
+            and (update_fields is None or "inventory" in update_fields)
+        ):
+            self.total_copies = max(
+                self.total_copies + self.inventory - loaded_inventory, 0
+            )
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "total_copies"}
+
+        update_fields = kwargs.get("update_fields")
+        if (
+            self.inventory
+            and self.next_available_date is not None
+            and (update_fields is None or "inventory" in update_fields)
+        ):
+            self.next_available_date = None
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "next_available_date"
+                }
+        super().save(*args, **kwargs)
+        self._loaded_inventory = self.inventory
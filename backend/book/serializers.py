@@ -1,16 +1,50 @@
 from rest_framework import serializers
 
-from book.models import Book
+from book.models import Author, Book
+from library_service.serializers import DynamicFieldsModelSerializer
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(DynamicFieldsModelSerializer):
+    author_id = serializers.IntegerField(
+        source="author_profile_id", read_only=True
+    )
 
     class Meta:
         model = Book
-        fields = ("id", "title", "author", "cover", "inventory", "daily_fee", "image")
+        fields = (
+            "id",
+            "title",
+            "author",
+            "author_id",
+            "cover",
+            "inventory",
+            "next_available_date",
+            "daily_fee",
+            "image",
+        )
+
+    def create(self, validated_data):
+        validated_data["author_profile"] = Author.for_book(
+            validated_data["author"]
+        )
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        author = validated_data.get("author", instance.author)
+        if author != instance.author:
+            validated_data["author_profile"] = Author.for_book(author)
+        return super().update(instance, validated_data)
 
 
 class BookImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = ("id", "image")
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    books_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Author
+        fields = ("id", "name", "slug", "books_count")
@@ -1,6 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from book.autocomplete import book_autocomplete
+from book.cache import invalidate_books
 from book.models import Book
 from book.tasks import new_book_available_notification
 
@@ -14,4 +16,20 @@ def new_book_available(sender, instance, created, **kwargs):
             f"Author: {instance.author}\n\n"
             "Description: Lorem ipsum dolor sit amet, consectetuer"
         )
-        new_book_available_notification.delay(message)
\ No newline at end of file
+        new_book_available_notification.delay(message)
+
+
+@receiver(post_save, sender=Book)
+def update_autocomplete_index(sender, instance, **kwargs):
+    book_autocomplete.update_book(instance)
+
+
+@receiver(post_delete, sender=Book)
+def remove_from_autocomplete_index(sender, instance, **kwargs):
+    book_autocomplete.remove_book(instance.pk)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    invalidate_books([instance.pk])
@@ -6,6 +6,7 @@ from asgiref.sync import sync_to_async
 from celery import shared_task
 from django.contrib.auth import get_user_model
 from telegram import Bot
+from book.inventory import reconcile_inventory
 from book.models import Book
 
 token = os.getenv("TELEGRAM_TOKEN")
@@ -49,4 +50,10 @@ def new_book_available_notification(message):
             await bot.send_message(chat_id=user_id, text=message)
 
     asyncio.run(send())
-    return "Success"
\ No newline at end of file
+    return "Success"
+
+
+@shared_task
+def reconcile_book_inventory():
+    """Correct inventory drift, the discrepancies are the task result."""
+    return reconcile_inventory()
@@ -0,0 +1,215 @@
+import importlib
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from book.models import Author, Book
+from book.serializers import BookSerializer
+from book.signals import new_book_available
+
+BOOK_URL = reverse("book:book-list")
+AUTHOR_URL = reverse("book:author-list")
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Sample book",
+        "author": "Sample Author",
+        "cover": "Hard",
+        "inventory": 1,
+        "daily_fee": 1,
+    }
+    defaults.update(params)
+    serializer = BookSerializer(data=defaults)
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+def update_book(book, **data):
+    serializer = BookSerializer(book, data=data, partial=True)
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+class AuthorModelTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+
+    def test_books_of_same_author_share_profile(self):
+        first = sample_book(author="Taras Shevchenko")
+        second = sample_book(author="  taras   SHEVCHENKO ")
+
+        self.assertEqual(first.author_profile_id, second.author_profile_id)
+        self.assertEqual(1, Author.objects.count())
+        self.assertEqual("Taras Shevchenko", first.author_profile.name)
+        self.assertEqual("taras-shevchenko", first.author_profile.slug)
+
+    def test_changing_author_relinks_book(self):
+        book = sample_book(author="Lesya Ukrainka")
+
+        book = update_book(book, author="Ivan Franko")
+
+        self.assertEqual("Ivan Franko", book.author_profile.name)
+
+    def test_saving_other_fields_keeps_profile_without_lookup(self):
+        book = sample_book()
+
+        with CaptureQueriesContext(connection) as queries:
+            update_book(book, inventory=5)
+
+        self.assertFalse(
+            any("book_author" in query["sql"] for query in queries)
+        )
+        self.assertIsNotNone(book.author_profile_id)
+
+    def test_several_authors_are_not_linked(self):
+        for author in ["Ivan Franko, Lesya Ukrainka", "Ilf and Petrov"]:
+            book = sample_book(author=author)
+            self.assertIsNone(book.author_profile_id)
+
+        self.assertFalse(Author.objects.exists())
+
+    def test_saving_the_model_does_not_resolve_the_author(self):
+        book = Book.objects.create(
+            title="Kobzar",
+            author="Taras Shevchenko",
+            cover="Hard",
+            inventory=1,
+            daily_fee=1,
+        )
+
+        self.assertIsNone(book.author_profile_id)
+
+    def test_slugs_are_unique(self):
+        first = Author.get_for_name("Jan Novak")
+        second = Author.get_for_name("Jan Novák")
+
+        self.assertNotEqual(first, second)
+        self.assertEqual("jan-novak", first.slug)
+        self.assertNotEqual(first.slug, second.slug)
+
+    def test_migration_merges_spellings(self):
+        migration = importlib.import_module(
+            "book.migrations.0007_deduplicate_authors"
+        )
+        Book.objects.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author=author,
+                cover="Hard",
+                inventory=1,
+                daily_fee=1,
+            )
+            for number, author in enumerate(
+                [
+                    "Ivan Franko",
+                    "ivan franko",
+                    "Ivan  Franko",
+                    "Marko Vovchok",
+                    "Ivan Franko, Marko Vovchok",
+                ]
+            )
+        )
+
+        migration.deduplicate_authors(apps, None)
+
+        self.assertEqual(
+            ["Ivan Franko", "Marko Vovchok"],
+            list(Author.objects.values_list("name", flat=True)),
+        )
+        franko = Author.objects.get(name="Ivan Franko")
+        self.assertEqual(
+            ["Ivan  Franko", "Ivan Franko", "ivan franko"],
+            sorted(franko.books.values_list("author", flat=True)),
+        )
+        self.assertEqual(
+            ["Ivan Franko, Marko Vovchok"],
+            list(
+                Book.objects.filter(author_profile=None).values_list(
+                    "author", flat=True
+                )
+            ),
+        )
+
+
+class AuthorFilterTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+        self.client = APIClient()
+        self.franko = sample_book(title="Zakhar Berkut", author="Ivan Franko")
+        sample_book(title="Boa constrictor", author="Ivan Franko")
+        self.kotsiubynsky = sample_book(
+            title="Shadows of Forgotten Ancestors",
+            author="Mykhailo Kotsiubynsky",
+        )
+
+    def test_filter_by_author_id(self):
+        res = self.client.get(
+            BOOK_URL, {"author_id": self.kotsiubynsky.author_profile_id}
+        )
+
+        books = res.data["results"]
+        self.assertEqual([self.kotsiubynsky.id], [b["id"] for b in books])
+        self.assertEqual(
+            self.kotsiubynsky.author_profile_id, books[0]["author_id"]
+        )
+
+    def test_filter_by_author_slug(self):
+        res = self.client.get(
+            BOOK_URL, {"author_slug": "ivan-franko,unknown"}
+        )
+
+        self.assertEqual(2, len(res.data["results"]))
+
+    def test_filter_by_invalid_author_id(self):
+        res = self.client.get(BOOK_URL, {"author_id": "abc"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([], res.data["results"])
+
+    def test_author_filter_is_an_equality_join(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(BOOK_URL, {"author_slug": "ivan-franko"})
+
+        select = next(
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "book_book"' in query["sql"]
+        )
+        self.assertIn('"book_author"."slug" IN', select)
+        self.assertNotIn("LIKE", select)
+
+    def test_list_authors_with_book_counts(self):
+        res = self.client.get(AUTHOR_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [("Ivan Franko", 2), ("Mykhailo Kotsiubynsky", 1)],
+            [
+                (author["name"], author["books_count"])
+                for author in res.data["results"]
+            ],
+        )
+
+    def test_retrieve_author(self):
+        author = self.franko.author_profile
+
+        res = self.client.get(reverse("book:author-detail", args=[author.id]))
+
+        self.assertEqual(
+            {
+                "id": author.id,
+                "name": "Ivan Franko",
+                "slug": "ivan-franko",
+                "books_count": 2,
+            },
+            res.data,
+        )
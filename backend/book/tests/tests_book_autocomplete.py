@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from django.db.models.signals import post_save
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from book.autocomplete import book_autocomplete
+from book.models import Book
+from book.signals import new_book_available
+
+AUTOCOMPLETE_URL = reverse("book:book-autocomplete")
+
+
+class BookAutocompleteTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        book_autocomplete.invalidate()
+        self.addCleanup(book_autocomplete.invalidate)
+
+        self.client = APIClient()
+
+        self.prince = Book.objects.create(
+            title="The Little Prince",
+            author="Antoine de Saint-Exupery",
+            cover="Hard",
+            inventory=10,
+            daily_fee=Decimal("0.55"),
+        )
+        self.farm = Book.objects.create(
+            title="Animal Farm",
+            author="George Orwell",
+            cover="Hard",
+            inventory=12,
+            daily_fee=Decimal("0.45"),
+        )
+        self.medicine = Book.objects.create(
+            title="Internal Medicine. Book 1",
+            author="Nestor Seredyuk, Ihor Vakalyuk",
+            cover="Soft",
+            inventory=1,
+            daily_fee=Decimal("1.32"),
+        )
+
+    def test_autocomplete_is_public(self):
+        res = self.client.get(AUTOCOMPLETE_URL + "?q=an")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_autocomplete_by_title_and_author_prefix(self):
+        res = self.client.get(AUTOCOMPLETE_URL + "?q=an")
+        self.assertEqual(
+            {"titles": ["Animal Farm"], "authors": ["Antoine de Saint-Exupery"]},
+            res.data,
+        )
+
+    def test_autocomplete_matches_any_word(self):
+        res = self.client.get(AUTOCOMPLETE_URL + "?q=PRIN")
+        self.assertEqual(["The Little Prince"], res.data["titles"])
+
+        res = self.client.get(AUTOCOMPLETE_URL + "?q=vakal")
+        self.assertEqual(["Ihor Vakalyuk"], res.data["authors"])
+
+    def test_autocomplete_empty_prefix(self):
+        res = self.client.get(AUTOCOMPLETE_URL)
+        self.assertEqual({"titles": [], "authors": []}, res.data)
+
+    def test_autocomplete_limit(self):
+        for number in range(5):
+            Book.objects.create(
+                title=f"Poems {number}",
+                author="Taras Shevchenko",
+                cover="Soft",
+                inventory=1,
+                daily_fee=Decimal("0.30"),
+            )
+
+        res = self.client.get(AUTOCOMPLETE_URL + "?q=poems&limit=3")
+        self.assertEqual(["Poems 0", "Poems 1", "Poems 2"], res.data["titles"])
+
+        res = self.client.get(AUTOCOMPLETE_URL + "?q=poems&limit=ten")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_autocomplete_without_database_queries(self):
+        self.client.get(AUTOCOMPLETE_URL + "?q=an")
+
+        with self.assertNumQueries(0):
+            self.client.get(AUTOCOMPLETE_URL + "?q=or")
+
+    def test_index_follows_book_changes(self):
+        self.client.get(AUTOCOMPLETE_URL + "?q=an")
+
+        self.farm.title = "Nineteen Eighty-Four"
+        self.farm.save()
+        self.prince.delete()
+
+        res = self.client.get(AUTOCOMPLETE_URL + "?q=an")
+        self.assertEqual({"titles": [], "authors": []}, res.data)
+
+        res = self.client.get(AUTOCOMPLETE_URL + "?q=eighty")
+        self.assertEqual(["Nineteen Eighty-Four"], res.data["titles"])
+
+    def test_book_ids_for_bot_search(self):
+        self.assertEqual(
+            [self.medicine.id], book_autocomplete.book_ids("seredyuk")
+        )
+        self.assertEqual(
+            [self.farm.id, self.prince.id], book_autocomplete.book_ids("a")
+        )
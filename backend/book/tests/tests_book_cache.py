@@ -0,0 +1,296 @@
+import json
+import pickle
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from book.cache import get_catalog_cache_stats
+from book.models import Book
+from book.signals import new_book_available
+
+BOOK_URL = reverse("book:book-list")
+CACHE_STATS_URL = reverse("book:book-cache-stats")
+BORROWING_LIST_URL = reverse("borrowing:borrowings-list")
+
+
+class BookCatalogCacheTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="Animal Farm",
+            author="George Orwell",
+            cover="Hard",
+            inventory=12,
+            daily_fee=Decimal("0.45"),
+        )
+
+    def test_repeated_list_request_is_served_from_cache(self):
+        res = self.client.get(BOOK_URL + "?ordering=title&min_fee=0.1")
+        self.assertEqual(res["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(BOOK_URL + "?min_fee=0.1&ordering=title")
+
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(res.data, cached.data)
+
+    def test_detail_request_is_served_from_cache(self):
+        url = BOOK_URL + f"{self.book.id}/"
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url)
+
+        self.assertEqual(res["X-Cache"], "HIT")
+        self.assertEqual(res.data["title"], "Animal Farm")
+
+    def test_ndjson_request_is_not_served_cached_json(self):
+        self.client.get(BOOK_URL)
+
+        res = self.client.get(BOOK_URL, HTTP_ACCEPT="application/x-ndjson")
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertTrue(res.streaming)
+        self.assertEqual("application/x-ndjson", res["Content-Type"])
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        titles = [json.loads(line)["title"] for line in lines]
+        self.assertEqual(["Animal Farm"], titles)
+
+    def test_missing_book_is_not_cached(self):
+        self.client.get(BOOK_URL + "0/")
+        res = self.client.get(BOOK_URL + "0/")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(get_catalog_cache_stats()["hits"], 0)
+
+    def test_book_changes_invalidate_cache(self):
+        self.client.get(BOOK_URL)
+
+        self.book.daily_fee = Decimal("0.50")
+        self.book.save()
+
+        res = self.client.get(BOOK_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["daily_fee"], "0.50")
+
+        self.book.delete()
+
+        res = self.client.get(BOOK_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"], [])
+
+    def test_borrowing_invalidates_cache(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.get(BOOK_URL)
+
+        self.client.force_authenticate(user)
+        self.client.post(
+            BORROWING_LIST_URL,
+            {
+                "book": self.book.id,
+                "expected_return_date": date.today() + timedelta(days=7),
+            },
+        )
+
+        res = self.client.get(BOOK_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["results"][0]["inventory"], 11)
+
+    def test_list_and_detail_send_etag(self):
+        res = self.client.get(BOOK_URL)
+        self.assertIn("ETag", res)
+
+        detail = self.client.get(BOOK_URL + f"{self.book.id}/")
+        self.assertIn("ETag", detail)
+        self.assertNotEqual(res["ETag"], detail["ETag"])
+
+    def test_unchanged_catalog_returns_not_modified(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        self.assertEqual(res.content, b"")
+
+    def test_book_changes_change_etag(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+
+        self.book.inventory = 5
+        self.book.save()
+
+        res = self.client.get(BOOK_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get(BOOK_URL)["ETag"]
+
+        res = self.client.get(
+            BOOK_URL + "?ordering=-id", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_cache_stats_admin_only(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="test_password"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(CACHE_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cache_stats_counts_hits_and_misses(self):
+        admin = get_user_model().objects.create_user(
+            email="admin@test.com", password="admin_password", is_staff=True
+        )
+        self.client.get(BOOK_URL)
+        self.client.get(BOOK_URL)
+        self.client.get(BOOK_URL + f"{self.book.id}/")
+
+        self.client.force_authenticate(admin)
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["hits"], 1)
+        self.assertEqual(res.data["misses"], 2)
+
+
+class BookFragmentCacheTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+
+        self.client = APIClient()
+        self.books = [
+            Book.objects.create(
+                title=f"Book {number}",
+                author="Test Author",
+                cover="Hard",
+                inventory=number,
+                daily_fee=Decimal("0.5") * (number + 1),
+            )
+            for number in range(4)
+        ]
+
+    def stats(self):
+        stats = get_catalog_cache_stats()
+        return stats["fragment_hits"], stats["fragment_misses"]
+
+    def test_different_lists_share_book_fragments(self):
+        self.client.get(BOOK_URL)
+        self.assertEqual((0, 4), self.stats())
+
+        with self.assertNumQueries(1):
+            res = self.client.get(BOOK_URL + "?ordering=-daily_fee&min_fee=1")
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual((3, 4), self.stats())
+        self.assertEqual(
+            [book.id for book in reversed(self.books[1:])],
+            [book["id"] for book in res.json()["results"]],
+        )
+
+    def test_write_invalidates_only_the_fragment_of_the_book(self):
+        self.client.get(BOOK_URL)
+        self.books[2].title = "Renamed"
+        self.books[2].save()
+
+        res = self.client.get(BOOK_URL)
+
+        self.assertEqual((3, 5), self.stats())
+        self.assertEqual("Renamed", res.json()["results"][2]["title"])
+
+    def test_deleted_book_leaves_the_list(self):
+        self.client.get(BOOK_URL)
+        self.books[0].delete()
+
+        res = self.client.get(BOOK_URL)
+
+        self.assertEqual(3, len(res.json()["results"]))
+
+    def test_assembled_list_matches_serializer_output(self):
+        self.client.get(BOOK_URL)
+        cached = self.client.get(BOOK_URL + "?ordering=id")
+
+        self.assertEqual(
+            [
+                {
+                    "id": book.id,
+                    "title": book.title,
+                    "author": "Test Author",
+                    "author_id": book.author_profile_id,
+                    "cover": "Hard",
+                    "inventory": book.inventory,
+                    "next_available_date": None,
+                    "daily_fee": f"{book.daily_fee:.2f}",
+                    "image": None,
+                }
+                for book in self.books
+            ],
+            cached.json()["results"],
+        )
+
+    def test_assembled_bytes_match_json_renderer(self):
+        self.client.get(BOOK_URL)
+        res = self.client.get(BOOK_URL + "?page_size=2")
+
+        self.assertEqual(JSONRenderer().render(res.data), res.content)
+
+    def test_fragments_are_decoded_only_when_read(self):
+        books = self.client.get(BOOK_URL).data["results"]
+        self.assertNotIn("items", vars(books))
+
+        self.assertEqual("Book 0", books[0]["title"])
+        cached = pickle.loads(pickle.dumps(books))
+        self.assertEqual({"fragments": books.fragments}, vars(cached))
+        self.assertEqual(books, cached)
+
+    def test_indented_list_is_rendered_normally(self):
+        res = self.client.get(
+            BOOK_URL, HTTP_ACCEPT="application/json; indent=2"
+        )
+
+        self.assertIn(b'\n    {\n      "id"', res.content)
+        self.assertEqual(4, len(res.json()["results"]))
+
+    def test_paginated_lists_are_assembled_from_fragments(self):
+        res = self.client.get(BOOK_URL + "?page_size=3")
+        body = res.json()
+        self.assertEqual(3, len(body["results"]))
+
+        res = self.client.get(body["next"])
+        self.assertEqual(
+            [self.books[3].id], [book["id"] for book in res.json()["results"]]
+        )
+
+        res = self.client.get(BOOK_URL + "?limit=2&offset=1")
+        self.assertEqual(4, res.json()["count"])
+        self.assertEqual(
+            [self.books[1].id, self.books[2].id],
+            [book["id"] for book in res.json()["results"]],
+        )
+        self.assertEqual((2, 4), self.stats())
+
+    def test_sparse_fieldsets_get_their_own_fragments(self):
+        self.client.get(BOOK_URL)
+
+        res = self.client.get(BOOK_URL + "?fields=id")
+
+        self.assertEqual(
+            [{"id": book.id} for book in self.books], res.json()["results"]
+        )
+        self.assertEqual((0, 8), self.stats())
@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from book.models import Book
+from book.signals import new_book_available
+
+BOOK_URL = reverse("book:book-list")
+
+
+def detail_url(book_id):
+    return reverse("book:book-detail", args=[book_id])
+
+
+class BookDynamicFieldsTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="The Little Prince",
+            author="Antoine de Saint-Exupery",
+            cover="Hard",
+            inventory=3,
+            daily_fee=1,
+        )
+
+    def test_list_returns_only_requested_fields(self):
+        res = self.client.get(BOOK_URL, {"fields": "id,title"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [{"id": self.book.id, "title": "The Little Prince"}],
+            res.data["results"],
+        )
+
+    def test_retrieve_returns_only_requested_fields(self):
+        res = self.client.get(
+            detail_url(self.book.id), {"fields": "title,inventory"}
+        )
+
+        self.assertEqual(
+            {"title": "The Little Prince", "inventory": 3}, res.data
+        )
+
+    def test_unknown_fields_are_ignored(self):
+        res = self.client.get(BOOK_URL, {"fields": "id,unknown"})
+
+        self.assertEqual([{"id": self.book.id}], res.data["results"])
+
+    def test_without_fields_parameter_returns_all_fields(self):
+        res = self.client.get(detail_url(self.book.id))
+
+        self.assertEqual(
+            {
+                "id",
+                "title",
+                "author",
+                "author_id",
+                "cover",
+                "inventory",
+                "next_available_date",
+                "daily_fee",
+                "image",
+            },
+            set(res.data),
+        )
+
+    def test_only_requested_columns_are_selected(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(BOOK_URL, {"fields": "id,title"})
+
+        selects = " ".join(
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "book_book"' in query["sql"]
+        )
+        self.assertIn('"book_book"."title"', selects)
+        self.assertNotIn('"book_book"."author"', selects)
+        self.assertNotIn('"book_book"."daily_fee"', selects)
@@ -55,71 +55,139 @@ class UnauthenticatedUserTests(TestCase):
         res = self.client.get(BOOK_URL)
         books = Book.objects.all().order_by("id")
         expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
 
     def test_order_books_by_daily_fee_descending(self):
         res = self.client.get(BOOK_URL + "?ordering=-daily_fee")
         books = Book.objects.all().order_by("-daily_fee")
         expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
 
     def test_search_books_with_search_parameters_title(self):
         res = self.client.get(BOOK_URL + "?search=The Little Prince")
         books = Book.objects.filter(title__icontains="The Little Prince")
         expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
 
         res = self.client.get(BOOK_URL + "?search=med")
         books = Book.objects.filter(title__icontains="med")
         expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
 
+        res = self.client.get(BOOK_URL + "?search=Prince Little")
+        self.assertEqual(
+            [self.book4.id], [book["id"] for book in res.data["results"]]
+        )
+
+    def test_search_books_with_search_parameters_author(self):
         res = self.client.get(BOOK_URL + "?search=Antoine")
-        self.assertEqual([], res.data)
+        expected_result = BookSerializer([self.book4], many=True).data
+        self.assertEqual(expected_result, res.data["results"])
 
-    def test_search_books_with_search_parameters_cover(self):
+        res = self.client.get(BOOK_URL + "?search=orwel")
+        expected_result = BookSerializer([self.book3], many=True).data
+        self.assertEqual(expected_result, res.data["results"])
+
+    def test_search_books_ignores_cover_and_inventory(self):
         res = self.client.get(BOOK_URL + "?search=hard")
-        books = Book.objects.filter(cover__icontains="hard")
-        expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual([], res.data["results"])
 
-        res = self.client.get(BOOK_URL + "?search=paper")
-        self.assertEqual([], res.data)
+        res = self.client.get(BOOK_URL + "?search=101")
+        self.assertEqual([], res.data["results"])
 
-    def test_search_books_with_search_parameters_inventory(self):
-        res = self.client.get(BOOK_URL + "?search=01")
-        books = Book.objects.filter(inventory__icontains="01")
-        expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+    def test_search_books_ranked_by_relevance(self):
+        Book.objects.create(
+            title="Essays",
+            author="George Orwell",
+            cover="Soft",
+            inventory=3,
+            daily_fee=Decimal("0.40"),
+        )
+        orwell_title = Book.objects.create(
+            title="Orwell's England",
+            author="George Orwell",
+            cover="Soft",
+            inventory=3,
+            daily_fee=Decimal("0.40"),
+        )
+
+        res = self.client.get(BOOK_URL + "?search=orwell")
 
-        res = self.client.get(BOOK_URL + "?search=22")
-        self.assertEqual([], res.data)
+        self.assertEqual(3, len(res.data["results"]))
+        self.assertEqual(orwell_title.id, res.data["results"][0]["id"])
+
+    def test_search_books_respects_explicit_ordering(self):
+        res = self.client.get(BOOK_URL + "?search=medicine&ordering=-id")
+        self.assertEqual(
+            [self.book2.id, self.book1.id],
+            [book["id"] for book in res.data["results"]],
+        )
 
     def test_search_books_with_search_parameters_mixed(self):
         res = self.client.get(BOOK_URL + "?search=2")
-        self.assertEqual(3, len(res.data))
+        self.assertEqual(2, len(res.data["results"]))
 
     def test_filter_books_with_custom_filter_id(self):
         res = self.client.get(BOOK_URL + "?book_id=1,3")
         books = Book.objects.filter(id__in=[1, 3])
         expected_result = BookSerializer(books, many=True).data
 
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
 
     def test_filter_books_with_custom_filter_author(self):
         res = self.client.get(BOOK_URL + "?author=saint")
         books = Book.objects.filter(author__icontains="saint")
         expected_result = BookSerializer(books, many=True).data
 
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
 
         res = self.client.get(BOOK_URL + "?author=saint,George Orwell")
         books = Book.objects.filter(
             Q(author__icontains="saint") | Q(author__icontains="George Orwell")
         )
         expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
-        self.assertEqual(2, len(res.data))
+        self.assertEqual(expected_result, res.data["results"])
+        self.assertEqual(2, len(res.data["results"]))
+
+    def test_filter_books_by_author_tolerates_typos(self):
+        res = self.client.get(BOOK_URL + "?author=Orwel")
+        self.assertEqual(
+            [self.book3.id], [book["id"] for book in res.data["results"]]
+        )
+
+        res = self.client.get(BOOK_URL + "?author=Seredyuk,Exupery")
+        self.assertEqual(
+            {self.book1.id, self.book2.id, self.book4.id},
+            {book["id"] for book in res.data["results"]},
+        )
+
+    def test_filter_books_by_author_ordered_by_similarity(self):
+        orwellian = Book.objects.create(
+            title="Orwell and Politics",
+            author="Georgie Orwellian",
+            cover="Soft",
+            inventory=1,
+            daily_fee=Decimal("0.40"),
+        )
+
+        res = self.client.get(BOOK_URL + "?author=George Orwell")
+
+        self.assertEqual(
+            [self.book3.id, orwellian.id],
+            [book["id"] for book in res.data["results"]],
+        )
+
+    def test_filter_books_by_title(self):
+        res = self.client.get(BOOK_URL + "?title=Animal Frm")
+        self.assertEqual(
+            [self.book3.id], [book["id"] for book in res.data["results"]]
+        )
+
+        res = self.client.get(BOOK_URL + "?title=little prince,animal farm")
+        self.assertEqual(
+            {self.book3.id, self.book4.id},
+            {book["id"] for book in res.data["results"]},
+        )
 
     def test_filter_books_with_custom_filter_daily_fee(self):
         res = self.client.get(BOOK_URL + "?daily_fee=1.32")
@@ -127,11 +195,11 @@ class UnauthenticatedUserTests(TestCase):
         books = Book.objects.filter(daily_fee=1.32)
         expected_result = BookSerializer(books, many=True).data
 
-        self.assertEqual(expected_result, res.data)
-        self.assertEqual(2, len(res.data))
+        self.assertEqual(expected_result, res.data["results"])
+        self.assertEqual(2, len(res.data["results"]))
 
         res = self.client.get(BOOK_URL + "?daily_fee=32")
-        self.assertEqual(0, len(res.data))
+        self.assertEqual(0, len(res.data["results"]))
 
     def test_filter_books_with_custom_filter_min_and_max_daily_fee(self):
         Book.objects.all().delete()
@@ -158,38 +226,38 @@ class UnauthenticatedUserTests(TestCase):
         )
 
         res = self.client.get(BOOK_URL + "?min_fee=4")
-        self.assertEqual(4, len(res.data))
+        self.assertEqual(4, len(res.data["results"]))
 
         res = self.client.get(BOOK_URL + "?min_fee=3")
-        self.assertEqual(5, len(res.data))
+        self.assertEqual(5, len(res.data["results"]))
 
         res = self.client.get(BOOK_URL + "?max_fee=3")
-        self.assertEqual(3, len(res.data))
+        self.assertEqual(3, len(res.data["results"]))
 
         res = self.client.get(BOOK_URL + "?max_fee=10")
-        self.assertEqual(7, len(res.data))
+        self.assertEqual(7, len(res.data["results"]))
 
         res = self.client.get(BOOK_URL + "?min_fee=3&max_fee=5")
-        self.assertEqual(3, len(res.data))
+        self.assertEqual(3, len(res.data["results"]))
 
         res = self.client.get(BOOK_URL + "?min_fee=7&max_fee=15")
-        self.assertEqual(1, len(res.data))
+        self.assertEqual(1, len(res.data["results"]))
 
         res = self.client.get(BOOK_URL + "?min_fee=8&max_fee=15")
-        self.assertEqual(0, len(res.data))
+        self.assertEqual(0, len(res.data["results"]))
 
     def test_filter_books_with_custom_filter_all_together(self):
         res = self.client.get(BOOK_URL + "?book_id=1,"
                                          "3&author=seredyuk&min_fee=0.7")
-        self.assertEqual(1, len(res.data))
+        self.assertEqual(1, len(res.data["results"]))
 
     def test_pagination_works(self):
         res_all = self.client.get(BOOK_URL)
 
-        books = Book.objects.all()
+        books = Book.objects.order_by("id")
         books_data = BookSerializer(books, many=True).data
 
-        self.assertEqual(res_all.data, books_data)
+        self.assertEqual(res_all.data["results"], books_data)
 
         res_page = self.client.get(BOOK_URL + "?limit=2")
 
@@ -227,7 +295,7 @@ class AuthenticatedUserTests(TestCase):
         res = self.client.get(BOOK_URL + "?ordering=-id")
         books = Book.objects.all().order_by("-id")
         expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
 
 
 class AdminUserTests(TestCase):
@@ -261,10 +329,10 @@ class AdminUserTests(TestCase):
         res = self.client.get(BOOK_URL + "?ordering=title")
         books = Book.objects.all().order_by("title")
         expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
 
     def test_admin_can_order_books_by_title_descending(self):
         res = self.client.get(BOOK_URL + "?ordering=-title")
         books = Book.objects.all().order_by("-title")
         expected_result = BookSerializer(books, many=True).data
-        self.assertEqual(expected_result, res.data)
+        self.assertEqual(expected_result, res.data["results"])
@@ -0,0 +1,281 @@
+import threading
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.models.signals import post_save
+from django.test import TestCase, TransactionTestCase
+
+from book.cache import get_catalog_generation
+from book.inventory import (
+    reconcile_inventory,
+    release_copies,
+    release_copy,
+    reserve_copies,
+    reserve_copy,
+)
+from book.models import Book
+from book.signals import new_book_available
+from borrowing.models import Borrowing
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Sample book",
+        "author": "Sample Author",
+        "cover": "Hard",
+        "inventory": 1,
+        "daily_fee": 1,
+    }
+    defaults.update(params)
+    return Book.objects.create(**defaults)
+
+
+class InventoryReservationTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+
+    def test_reserve_takes_one_copy(self):
+        book = sample_book(inventory=2)
+
+        self.assertTrue(reserve_copy(book.id))
+
+        book.refresh_from_db()
+        self.assertEqual(1, book.inventory)
+
+    def test_reserve_fails_without_copies_left(self):
+        book = sample_book(inventory=0)
+
+        with self.assertNumQueries(1):
+            self.assertFalse(reserve_copy(book.id))
+
+        book.refresh_from_db()
+        self.assertEqual(0, book.inventory)
+
+    def test_reserve_and_release_invalidate_catalog(self):
+        book = sample_book()
+        generation = get_catalog_generation()
+
+        reserve_copy(book.id)
+        self.assertGreater(get_catalog_generation(), generation)
+
+        generation = get_catalog_generation()
+        release_copy(book.id)
+        self.assertGreater(get_catalog_generation(), generation)
+
+        book.refresh_from_db()
+        self.assertEqual(1, book.inventory)
+
+    def test_inventory_cannot_go_negative(self):
+        book = sample_book(inventory=0)
+
+        # Raised by the "inventory >= 0" check PositiveIntegerField puts
+        # on the column, the model declares no constraint of its own.
+        with self.assertRaises(IntegrityError):
+            Book.objects.filter(pk=book.pk).update(inventory=-1)
+
+
+class InventoryConcurrencyTests(TransactionTestCase):
+    copies = 5
+    borrowers = 25
+
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+        self.book = sample_book(inventory=self.copies)
+
+    def test_concurrent_reservations_never_oversell(self):
+        barrier = threading.Barrier(self.borrowers)
+        results = []
+
+        def borrow():
+            try:
+                barrier.wait()
+                results.append(reserve_copy(self.book.id))
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=borrow) for _ in range(self.borrowers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.copies, results.count(True))
+        self.assertEqual(self.borrowers - self.copies, results.count(False))
+        self.assertEqual(0, self.book.inventory)
+
+
+class InventoryReconciliationTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpassword"
+        )
+        self.book = sample_book(inventory=3)
+        self.borrow(self.book)
+
+    def borrow(self, book, returned=False):
+        return Borrowing.objects.create(
+            book=book,
+            user=self.user,
+            expected_return_date=date.today() + timedelta(days=3),
+            actual_return_date=date.today() if returned else None,
+        )
+
+    def test_total_copies_follow_inventory_edits(self):
+        self.assertEqual(3, self.book.total_copies)
+
+        self.book.inventory = 5
+        self.book.save()
+        self.book.refresh_from_db()
+        self.assertEqual(5, self.book.total_copies)
+
+        self.assertTrue(reserve_copy(self.book.id))
+        self.book.refresh_from_db()
+        self.book.inventory += 1
+        self.book.save(update_fields=["inventory"])
+        self.book.refresh_from_db()
+        self.assertEqual(6, self.book.total_copies)
+
+    def test_reconcile_corrects_drift(self):
+        in_sync = sample_book(inventory=2)
+        self.borrow(in_sync, returned=True)
+        generation = get_catalog_generation()
+
+        with self.assertNumQueries(2):
+            discrepancies = reconcile_inventory()
+
+        self.assertEqual(
+            [
+                {
+                    "book": self.book.id,
+                    "inventory": 3,
+                    "expected": 2,
+                    "total_copies": 3,
+                    "open_borrowings": 1,
+                    "set_aside": 0,
+                }
+            ],
+            discrepancies,
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(2, self.book.inventory)
+        self.assertGreater(get_catalog_generation(), generation)
+        self.assertEqual([], reconcile_inventory())
+
+    def test_dry_run_changes_nothing(self):
+        with self.assertNumQueries(1):
+            discrepancies = reconcile_inventory(dry_run=True)
+
+        self.assertEqual(1, len(discrepancies))
+        self.book.refresh_from_db()
+        self.assertEqual(3, self.book.inventory)
+
+    def test_unknown_total_copies_are_counted(self):
+        Book.objects.filter(pk=self.book.pk).update(total_copies=None)
+
+        self.assertEqual([], reconcile_inventory())
+
+        self.book.refresh_from_db()
+        self.assertEqual((3, 4), (self.book.inventory, self.book.total_copies))
+
+    def test_command_reports_discrepancies(self):
+        out = StringIO()
+
+        call_command("reconcile_inventory", "--dry-run", stdout=out)
+
+        self.assertIn(
+            f"book {self.book.id}: inventory 3, expected 2", out.getvalue()
+        )
+        self.assertIn("1 discrepancies found", out.getvalue())
+
+
+class NextAvailableDateTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        self.user = get_user_model().objects.create_user(
+            email="reader@test.com", password="testpassword"
+        )
+        self.today = date.today()
+
+    def borrow(self, book, days):
+        expected = self.today + timedelta(days=days)
+        reserve_copy(book.id, expected)
+        return Borrowing.objects.create(
+            book=book, user=self.user, expected_return_date=expected
+        )
+
+    def test_taking_last_copy_predicts_earliest_return(self):
+        book = sample_book(inventory=2)
+
+        self.borrow(book, 5)
+        book.refresh_from_db()
+        self.assertIsNone(book.next_available_date)
+
+        self.borrow(book, 9)
+        book.refresh_from_db()
+        self.assertEqual(
+            self.today + timedelta(days=5), book.next_available_date
+        )
+
+    def test_prediction_adds_average_lateness(self):
+        book = sample_book(inventory=1)
+        Book.objects.filter(pk=book.pk).update(returned_count=2, late_days=3)
+
+        self.borrow(book, 5)
+
+        book.refresh_from_db()
+        self.assertEqual(
+            self.today + timedelta(days=7), book.next_available_date
+        )
+
+    def test_reserve_copies_predicts_per_book(self):
+        books = [sample_book(inventory=1), sample_book(inventory=2)]
+
+        reserve_copies(
+            [book.id for book in books],
+            [self.today + timedelta(days=3), self.today + timedelta(days=4)],
+        )
+
+        self.assertEqual(
+            [self.today + timedelta(days=3), None],
+            [
+                book.next_available_date
+                for book in Book.objects.filter(
+                    pk__in=[book.id for book in books]
+                ).order_by("id")
+            ],
+        )
+
+    def test_release_clears_prediction_and_records_lateness(self):
+        book = sample_book(inventory=1)
+        self.borrow(book, 5)
+
+        release_copies([book.id, book.id], [0, 3])
+
+        book.refresh_from_db()
+        self.assertIsNone(book.next_available_date)
+        self.assertEqual(
+            (2, 2, 3),
+            (book.inventory, book.returned_count, book.late_days),
+        )
+
+    def test_restocking_clears_prediction(self):
+        book = sample_book(inventory=1)
+        self.borrow(book, 5)
+        book.refresh_from_db()
+
+        book.inventory = 3
+        book.save(update_fields=["inventory"])
+
+        book.refresh_from_db()
+        self.assertIsNone(book.next_available_date)
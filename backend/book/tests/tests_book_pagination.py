@@ -0,0 +1,151 @@
+import base64
+import json
+from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from book.models import Book
+from book.signals import new_book_available
+
+BOOK_URL = reverse("book:book-list")
+
+
+class BookKeysetPaginationTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+        self.client = APIClient()
+
+        self.books = [
+            Book.objects.create(
+                title=f"Book {number}",
+                author="Test Author",
+                cover="Hard",
+                inventory=number,
+                daily_fee=Decimal("0.50") + Decimal(number % 3) / 10,
+            )
+            for number in range(7)
+        ]
+
+    def collect_pages(self, url):
+        ids = []
+        pages = 0
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(book["id"] for book in res.data["results"])
+            url = res.data["next"]
+            pages += 1
+        return ids, pages
+
+    def test_pages_cover_all_books_in_order(self):
+        ids, pages = self.collect_pages(BOOK_URL + "?page_size=3")
+
+        self.assertEqual([book.id for book in self.books], ids)
+        self.assertEqual(3, pages)
+
+    def test_pages_follow_ordering_with_ties(self):
+        ids, _ = self.collect_pages(
+            BOOK_URL + "?page_size=2&ordering=-daily_fee"
+        )
+
+        expected = Book.objects.order_by("-daily_fee", "id")
+        self.assertEqual([book.id for book in expected], ids)
+
+    def test_pages_follow_search_relevance(self):
+        ids, _ = self.collect_pages(BOOK_URL + "?page_size=2&search=book")
+        self.assertEqual(sorted(book.id for book in self.books), sorted(ids))
+
+    def test_page_does_not_count_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(BOOK_URL + "?page_size=3")
+
+        self.assertEqual(3, len(res.data["results"]))
+        self.assertNotIn("count", res.data)
+        for query in queries.captured_queries:
+            self.assertNotIn("COUNT(", query["sql"].upper())
+
+    def test_default_and_max_page_size(self):
+        for number in range(120):
+            Book.objects.create(
+                title=f"Extra {number}",
+                author="Test Author",
+                cover="Soft",
+                inventory=1,
+                daily_fee=Decimal("1.00"),
+            )
+
+        res = self.client.get(BOOK_URL + "?cursor=")
+        self.assertEqual(20, len(res.data["results"]))
+
+        res = self.client.get(BOOK_URL + "?page_size=1000")
+        self.assertEqual(100, len(res.data["results"]))
+
+    def test_invalid_cursor(self):
+        res = self.client.get(BOOK_URL + "?cursor=not-a-cursor")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def tampered_cursor(self, url, values):
+        cursor = parse_qs(urlparse(url).query)["cursor"][0]
+        payload = json.loads(base64.urlsafe_b64decode(cursor))
+        payload["values"] = values
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def test_cursor_with_wrong_values(self):
+        res = self.client.get(BOOK_URL + "?page_size=2&ordering=-daily_fee")
+        next_url = res.data["next"]
+
+        for values in (
+            [0.6],
+            [0.6, self.books[1].id, 1],
+            ["cheap", self.books[1].id],
+            [0.6, "first"],
+            [0.6, None],
+            [0.6, [self.books[1].id]],
+            {"daily_fee": 0.6},
+        ):
+            res = self.client.get(
+                BOOK_URL,
+                {
+                    "page_size": 2,
+                    "ordering": "-daily_fee",
+                    "cursor": self.tampered_cursor(next_url, values),
+                },
+            )
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_bound_to_ordering(self):
+        res = self.client.get(BOOK_URL + "?page_size=2&ordering=title")
+        next_url = res.data["next"].replace("ordering=title", "ordering=-id")
+
+        res = self.client.get(next_url)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_limit_is_capped(self):
+        for number in range(120):
+            Book.objects.create(
+                title=f"Extra {number}",
+                author="Test Author",
+                cover="Soft",
+                inventory=1,
+                daily_fee=Decimal("1.00"),
+            )
+
+        res = self.client.get(BOOK_URL + "?limit=1000")
+        self.assertEqual(100, len(res.data["results"]))
+
+    def test_limit_offset_still_supported(self):
+        res = self.client.get(BOOK_URL + "?limit=2&offset=2")
+        self.assertEqual(7, res.data["count"])
+        self.assertEqual(
+            [self.books[2].id, self.books[3].id],
+            [book["id"] for book in res.data["results"]],
+        )
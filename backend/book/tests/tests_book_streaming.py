@@ -0,0 +1,94 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from book.models import Book
+from book.signals import new_book_available
+from book.views import BookViewSet
+
+BOOK_URL = reverse("book:book-list")
+
+
+class BookStreamingTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+        self.client = APIClient()
+        for number in range(5):
+            Book.objects.create(
+                title=f"Book {number}",
+                author="Test Author",
+                cover="Hard",
+                inventory=number,
+                daily_fee="1.5",
+            )
+
+    @staticmethod
+    def read(response):
+        return b"".join(response.streaming_content)
+
+    def test_stream_parameter_returns_json_array(self):
+        res = self.client.get(BOOK_URL, {"stream": "1"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual("application/json", res["Content-Type"])
+        self.assertEqual(
+            self.client.get(BOOK_URL).json()["results"],
+            json.loads(self.read(res)),
+        )
+
+    def test_ndjson_accept_header_returns_one_book_per_line(self):
+        res = self.client.get(
+            BOOK_URL, {"ordering": "-id"}, HTTP_ACCEPT="application/x-ndjson"
+        )
+
+        self.assertTrue(res.streaming)
+        self.assertEqual("application/x-ndjson", res["Content-Type"])
+        lines = self.read(res).decode().splitlines()
+        self.assertEqual(
+            self.client.get(BOOK_URL, {"ordering": "-id"}).json()["results"],
+            [json.loads(line) for line in lines],
+        )
+
+    def test_stream_ignores_pagination_and_keeps_filters(self):
+        res = self.client.get(
+            BOOK_URL, {"stream": "1", "page_size": 2, "min_fee": 1}
+        )
+
+        self.assertEqual(5, len(json.loads(self.read(res))))
+
+    def test_stream_of_empty_list(self):
+        res = self.client.get(BOOK_URL, {"stream": "1", "title": "missing"})
+
+        self.assertEqual([], json.loads(self.read(res)))
+
+    def test_stream_in_small_chunks(self):
+        with mock.patch.object(BookViewSet, "stream_chunk_size", 2):
+            res = self.client.get(BOOK_URL, {"stream": "1"})
+            chunks = list(res.streaming_content)
+
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(5, len(json.loads(b"".join(chunks))))
+
+    def test_stream_with_serializer_fallback(self):
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            res = self.client.get(BOOK_URL, {"stream": "1"})
+            books = json.loads(self.read(res))
+
+        self.assertEqual(self.client.get(BOOK_URL).json()["results"], books)
+
+    def test_stream_is_not_cached_but_tagged(self):
+        res = self.client.get(BOOK_URL, {"stream": "1"})
+        self.read(res)
+
+        res = self.client.get(
+            BOOK_URL, {"stream": "1"}, HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from book.models import Book
+from book.serializers import BookSerializer
+from book.signals import new_book_available
+from library_service.serializers import ValuesPlan
+
+BOOK_URL = reverse("book:book-list")
+
+
+class BookValuesSerializationTests(TestCase):
+    def setUp(self):
+        post_save.disconnect(new_book_available, sender=Book)
+        cache.clear()
+        self.client = APIClient()
+        Book.objects.create(
+            title="The Little Prince",
+            author="Antoine de Saint-Exupery",
+            cover="Hard",
+            inventory=3,
+            daily_fee=Decimal("0.5"),
+            image="uploads/books/the-little-prince.jpg",
+        )
+        Book.objects.create(
+            title="Kobzar",
+            author="Taras Shevchenko",
+            cover="Soft",
+            inventory=0,
+            daily_fee=Decimal("12.30"),
+        )
+
+    def get_both(self, params=None):
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            expected = self.client.get(BOOK_URL, params).data
+        cache.clear()
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            actual = self.client.get(BOOK_URL, params).data
+        cache.clear()
+        return expected, actual
+
+    def test_plan_renders_like_serializer(self):
+        request = APIRequestFactory().get(BOOK_URL)
+        serializer = BookSerializer(context={"request": request})
+        queryset = Book.objects.order_by("id")
+
+        plan = ValuesPlan.compile(serializer)
+
+        self.assertEqual(
+            BookSerializer(
+                queryset, many=True, context={"request": request}
+            ).data,
+            plan.render(plan.values(queryset)),
+        )
+
+    def test_decimal_and_image_rendering(self):
+        _, actual = self.get_both()
+        books = actual["results"]
+
+        self.assertEqual("0.50", books[0]["daily_fee"])
+        self.assertEqual(
+            "http://testserver/media/uploads/books/the-little-prince.jpg",
+            books[0]["image"],
+        )
+        self.assertIsNone(books[1]["image"])
+
+    def test_list_parity(self):
+        expected, actual = self.get_both()
+
+        self.assertEqual(expected, actual)
+
+    def test_list_parity_with_filters_and_fields(self):
+        expected, actual = self.get_both(
+            {"search": "prince", "fields": "title,daily_fee"}
+        )
+
+        self.assertEqual(1, len(actual["results"]))
+        self.assertEqual(expected, actual)
+
+    def test_paginated_list_parity(self):
+        expected, actual = self.get_both({"page_size": 1, "ordering": "title"})
+
+        self.assertEqual(expected, actual)
+
+    def test_disabled_mode_has_no_plan(self):
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            self.assertIsNone(ValuesPlan.compile(BookSerializer()))
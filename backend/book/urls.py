@@ -1,12 +1,13 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from book.views import BookViewSet
+from book.views import AuthorViewSet, BookViewSet
 
 app_name = "book"
 
 
 router = routers.DefaultRouter()
+router.register("authors", AuthorViewSet)
 router.register("", BookViewSet)
 
 urlpatterns = [path("", include(router.urls))]
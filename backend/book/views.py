@@ -1,21 +1,54 @@
+from django.db.models import Count
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import mixins, status
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from book.filters import BookFilter
-from book.models import Book
-from book.serializers import BookSerializer, BookImageSerializer
-from schemas.book_schema_decorator import book_schema_view
+from book.autocomplete import book_autocomplete
+from book.cache import (
+    BookFragmentListMixin,
+    CatalogCacheMixin,
+    get_catalog_cache_stats,
+)
+from book.filters import BookFilter, BookOrderingFilter, BookSearchFilter
+from book.models import Author, Book
+from book.serializers import (
+    AuthorSerializer,
+    BookSerializer,
+    BookImageSerializer,
+)
+from library_service.serializers import DynamicFieldsViewMixin
+from library_service.streaming import StreamingListMixin
+from schemas.book_schema_decorator import (
+    author_schema_view,
+    book_schema_view,
+)
+
+
+@extend_schema(tags=["book"])
+@author_schema_view()
+class AuthorViewSet(
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    GenericViewSet,
+):
+    queryset = Author.objects.annotate(
+        books_count=Count("books")
+    ).order_by("name")
+    serializer_class = AuthorSerializer
+    permission_classes = []
 
 
 @extend_schema(tags=["book"])
 @book_schema_view()
 class BookViewSet(
+    CatalogCacheMixin,
+    StreamingListMixin,
+    DynamicFieldsViewMixin,
+    BookFragmentListMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -25,15 +58,19 @@ class BookViewSet(
 ):
     queryset = Book.objects.all()
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    search_fields = ["title", "cover", "inventory"]
+    filter_backends = [
+        DjangoFilterBackend,
+        BookSearchFilter,
+        BookOrderingFilter,
+    ]
     filterset_class = BookFilter
     ordering_fields = ["id", "title", "author", "inventory", "daily_fee"]
     ordering = ["id"]
     permission_classes = [IsAdminUser]
+    autocomplete_max_limit = 50
 
     def get_permissions(self):
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "autocomplete"]:
             return []
         return [permission() for permission in self.permission_classes]
 
@@ -61,5 +98,34 @@ class BookViewSet(
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(methods=["GET"], detail=False, url_path="autocomplete")
+    def autocomplete(self, request):
+        """Endpoint for title and author completions of a typed prefix"""
+        prefix = request.query_params.get("q", "")
+
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            return Response(
+                {"limit": "A valid integer is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = min(max(limit, 1), self.autocomplete_max_limit)
+
+        return Response(
+            book_autocomplete.complete(prefix, limit),
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="cache-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """Endpoint for hit/miss counters of the catalog response cache"""
+        return Response(get_catalog_cache_stats(), status=status.HTTP_200_OK)
+
 
 0
@@ -1,6 +1,87 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.http import HttpResponse
 
+from borrowing.filters import BorrowingFilter
 from borrowing.models import Borrowing
+from borrowing.views import export_borrows_to_excel
 
-admin.site.register(Borrowing)
 
+class BorrowingFilterSetListFilter(admin.ListFilter):
+    """
+    Filter the changelist with ``BorrowingFilter``.
+
+    Every parameter of the filterset is accepted in the changelist URL
+    (``?overdue=true&borrow_date_after=2025-01-01``), the sidebar offers
+    the ``overdue`` choices.
+    """
+
+    title = "overdue"
+    parameter_name = "overdue"
+    template = "admin/filter.html"
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.filter_params = {}
+        for name in BorrowingFilter.parameter_names():
+            if name in params:
+                value = params.pop(name)
+                self.filter_params[name] = (
+                    value[-1] if isinstance(value, list) else value
+                )
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        value = self.filter_params.get(self.parameter_name)
+        for lookup, title in ((None, "All"), ("true", "Yes"), ("false", "No")):
+            yield {
+                "selected": value == lookup,
+                "query_string": (
+                    changelist.get_query_string(
+                        remove=[self.parameter_name]
+                    )
+                    if lookup is None
+                    else changelist.get_query_string(
+                        {self.parameter_name: lookup}
+                    )
+                ),
+                "display": title,
+            }
+
+    def queryset(self, request, queryset):
+        filterset = BorrowingFilter(self.filter_params, queryset=queryset)
+        if not filterset.is_valid():
+            raise IncorrectLookupParameters(filterset.errors)
+        return filterset.qs
+
+    def expected_parameters(self):
+        return BorrowingFilter.parameter_names()
+
+
+@admin.register(Borrowing)
+class BorrowingAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "book",
+        "user",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+    )
+    list_select_related = ("book", "user")
+    list_filter = (BorrowingFilterSetListFilter,)
+    actions = ("export_to_excel",)
+
+    @admin.action(description="Export selected borrowings to Excel")
+    def export_to_excel(self, request, queryset):
+        response = HttpResponse(
+            export_borrows_to_excel(borrowings=queryset).read(),
+            content_type="application/vnd.openxmlformats-officedocument."
+            "spreadsheetml.sheet",
+        )
+        response["Content-Disposition"] = (
+            'attachment; filename="borrowings.xlsx"'
+        )
+        return response
@@ -0,0 +1,79 @@
+import calendar
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from borrowing.cache import bump_borrowings_version
+from borrowing.models import ArchivedBorrowing, Borrowing
+from payment.models import Payment
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book_id",
+    "user_id",
+)
+
+
+def archive_cutoff(months, today=None):
+    """Return the date ``months`` months before ``today``."""
+    today = today or date.today()
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    day = min(today.day, calendar.monthrange(year, month + 1)[1])
+    return date(year, month + 1, day)
+
+
+def _archive_batch(batch_size, before):
+    """Move one batch, return the ``(id, user_id)`` pairs moved."""
+    with transaction.atomic():
+        rows = list(
+            Borrowing.objects.filter(actual_return_date__lt=before)
+            .order_by("id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", "user_id")[:batch_size]
+        )
+        if not rows:
+            return rows
+
+        columns = ", ".join(ARCHIVED_COLUMNS)
+        source = connection.ops.quote_name(Borrowing._meta.db_table)
+        target = connection.ops.quote_name(ArchivedBorrowing._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {source} "
+                f"WHERE id = ANY(%s) RETURNING {columns}) "
+                f"INSERT INTO {target} ({columns}) "
+                f"SELECT {columns} FROM moved",
+                [[borrowing_id for borrowing_id, _ in rows]],
+            )
+        # The foreign keys are only checked at commit, once payments
+        # point at the archived rows.
+        Payment.objects.filter(
+            borrowing_id__in=[borrowing_id for borrowing_id, _ in rows]
+        ).update(archived_borrowing_id=F("borrowing_id"), borrowing=None)
+    return rows
+
+
+def archive_borrowings(before, batch_size=1000):
+    """
+    Move borrowings returned before ``before`` to ``ArchivedBorrowing``.
+
+    Each batch of ``batch_size`` borrowings is moved in its own short
+    transaction by one ``DELETE ... RETURNING`` feeding an ``INSERT``,
+    and their payments are relinked to the archived rows, so the
+    borrowing table only keeps open and recently returned borrowings.
+    Rows locked by a concurrent writer are skipped until the next run.
+    Returns the number of borrowings archived.
+    """
+    archived = 0
+    user_ids = set()
+    while rows := _archive_batch(batch_size, before):
+        archived += len(rows)
+        user_ids.update(user_id for _, user_id in rows)
+
+    for user_id in user_ids:
+        bump_borrowings_version(user_id)
+    return archived
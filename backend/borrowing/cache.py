@@ -0,0 +1,23 @@
+from library_service.caching import bump_version, get_version
+
+BORROWINGS_VERSION_KEY = "borrowing:version"
+
+
+def _user_version_key(user_id):
+    return f"{BORROWINGS_VERSION_KEY}:user:{user_id}"
+
+
+def get_borrowings_version(user_id=None):
+    """
+    Return the version of all borrowings, or of the borrowings of a user.
+
+    Staff views depend on every borrowing, user views only on their own.
+    """
+    if user_id is None:
+        return get_version(BORROWINGS_VERSION_KEY)
+    return get_version(_user_version_key(user_id))
+
+
+def bump_borrowings_version(user_id):
+    bump_version(BORROWINGS_VERSION_KEY)
+    bump_version(_user_version_key(user_id))
@@ -0,0 +1,68 @@
+from datetime import date
+
+import django_filters
+from django.db.models import Q
+
+from borrowing.models import Borrowing
+
+
+class BorrowingFilter(django_filters.FilterSet):
+    """
+    Filters of the borrowing list, the admin and the Excel exports.
+
+    Every filter is backed by an index: the date ranges by plain indexes
+    on the two dates, ``overdue`` and ``is_active`` by the partial index
+    on open borrowings, ``book`` and ``user_id`` by their foreign keys and
+    ``user_email`` by the trigram index on the user emails.
+    """
+
+    borrow_date = django_filters.DateFromToRangeFilter()
+    expected_return_date = django_filters.DateFromToRangeFilter()
+    is_active = django_filters.BooleanFilter(
+        field_name="actual_return_date", lookup_expr="isnull"
+    )
+    overdue = django_filters.BooleanFilter(method="filter_overdue")
+    book = django_filters.NumberFilter(field_name="book_id")
+    user_id = django_filters.NumberFilter(field_name="user_id")
+    user_email = django_filters.CharFilter(
+        field_name="user__email", lookup_expr="icontains"
+    )
+
+    class Meta:
+        model = Borrowing
+        fields = [
+            "borrow_date",
+            "expected_return_date",
+            "is_active",
+            "overdue",
+            "book",
+            "user_id",
+            "user_email",
+        ]
+
+    # Ignored for non-staff users, who only see their own borrowings
+    staff_filters = ("user_id", "user_email")
+
+    @staticmethod
+    def overdue_condition():
+        return Q(
+            actual_return_date__isnull=True,
+            expected_return_date__lt=date.today(),
+        )
+
+    def filter_overdue(self, queryset, name, value):
+        if value:
+            return queryset.filter(self.overdue_condition())
+        return queryset.exclude(self.overdue_condition())
+
+    @classmethod
+    def parameter_names(cls):
+        """Return the query parameters the filters read, with suffixes."""
+        names = []
+        for name, field in cls().form.fields.items():
+            suffixes = getattr(field.widget, "suffixes", None)
+            if suffixes:
+                names.extend(f"{name}_{suffix}" for suffix in suffixes)
+            else:
+                names.append(name)
+        return names
@@ -0,0 +1,132 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.utils import timezone
+
+from book.inventory import put_back_copies, set_aside_copies
+from borrowing.models import Hold
+from borrowing.tasks import send_hold_notifications
+
+
+def with_queue_position(holds):
+    """Annotate ``position``, 1 for the hold at the head of its queue."""
+    ahead = (
+        Hold.objects.filter(
+            book=OuterRef("book"), created_at__lte=OuterRef("created_at")
+        )
+        .values("book")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return holds.annotate(position=Subquery(ahead))
+
+
+def ready_holds(book_ids):
+    """
+    Give copies put back to the holds at the head of the queues of books.
+
+    ``book_ids`` holds one id per copy, a book returned twice readies its
+    two oldest waiting holds. A single ``UPDATE ... RETURNING`` ranks the
+    waiting holds of every book and marks the ones served ready until
+    ``HOLD_READY_DAYS`` from now; a hold readied by a concurrent return
+    in the meantime is skipped. The copies given are taken back off the
+    shelf by ``set_aside_copies``, so nobody else can borrow them before
+    the patron does. Returns the ``(book_id, user_id)`` pairs of the
+    readied holds.
+    """
+    copies = Counter(book_ids)
+    if not copies:
+        return []
+    table = connection.ops.quote_name(Hold._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET ready_until = %s "
+            "WHERE ready_until IS NULL AND id IN ("
+            "SELECT queue.id FROM ("
+            "SELECT id, book_id, row_number() OVER ("
+            "PARTITION BY book_id ORDER BY created_at, id"
+            f") AS position FROM {table} "
+            "WHERE book_id = ANY(%s) AND ready_until IS NULL"
+            ") AS queue "
+            "JOIN unnest(%s::bigint[], %s::integer[]) "
+            "AS returned (book_id, copies) USING (book_id) "
+            "WHERE queue.position <= returned.copies"
+            ") RETURNING book_id, user_id",
+            [
+                timezone.now() + timedelta(days=settings.HOLD_READY_DAYS),
+                list(copies),
+                list(copies),
+                list(copies.values()),
+            ],
+        )
+        holds = cursor.fetchall()
+    set_aside_copies(book_id for book_id, _ in holds)
+    return holds
+
+
+def notify_holds(book_ids):
+    """
+    Tell the next patrons waiting for books a copy is set aside for them.
+
+    Called by every return path right after the copies are put back, the
+    copies are given to holds by ``ready_holds`` and the Telegram and
+    email notifications queued once the transaction commits.
+    """
+    holds = ready_holds(book_ids)
+    if holds:
+        transaction.on_commit(lambda: send_hold_notifications.delay(holds))
+    return holds
+
+
+def pass_on_copies(book_ids):
+    """
+    Hand the copies set aside for holds that are gone to the next holds.
+
+    One id per copy. The copies go back on the shelf and straight to the
+    next waiting holds of their books, if any.
+    """
+    put_back_copies(book_ids)
+    return notify_holds(book_ids)
+
+
+def take_holds(user_id, book_ids, ready_only=False):
+    """
+    Remove the holds of a patron on books they are borrowing.
+
+    A single ``DELETE ... RETURNING``, waiting holds included unless
+    ``ready_only``. Returns the ids of the books a copy was set aside
+    for, which the patron borrows without taking one off the shelf.
+    """
+    table = connection.ops.quote_name(Hold._meta.db_table)
+    condition = " AND ready_until IS NOT NULL" if ready_only else ""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} "
+            f"WHERE user_id = %s AND book_id = ANY(%s){condition} "
+            "RETURNING book_id, ready_until IS NOT NULL",
+            [user_id, list(book_ids)],
+        )
+        return {book_id for book_id, ready in cursor.fetchall() if ready}
+
+
+def expire_holds(now=None):
+    """
+    Drop the ready holds whose patron did not come in time.
+
+    Their copies are passed on to the next holds or put back on the
+    shelf, in one transaction. Returns the number of holds expired.
+    """
+    table = connection.ops.quote_name(Hold._meta.db_table)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE ready_until < %s "
+                "RETURNING book_id",
+                [now or timezone.now()],
+            )
+            book_ids = [book_id for book_id, in cursor.fetchall()]
+        pass_on_copies(book_ids)
+    return len(book_ids)
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from borrowing.archive import archive_borrowings, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Move borrowings returned more than some months ago, with their "
+        "payments, to the archive table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.BORROWING_ARCHIVE_AFTER_MONTHS,
+            help="Archive borrowings returned this many months ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Borrowings moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        before = archive_cutoff(options["months"])
+        started = time.perf_counter()
+        archived = archive_borrowings(
+            before, batch_size=options["batch_size"]
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{archived} borrowings returned before {before} "
+                f"archived in {elapsed:.2f}s"
+            )
+        )
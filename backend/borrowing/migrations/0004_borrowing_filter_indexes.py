@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0007_deduplicate_authors"),
+        ("borrowing", "0003_borrowing_due_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["borrow_date"], name="borrowing_borrow_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["expected_return_date"], name="borrowing_expected_return_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0004_borrowing_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="borrowing",
+            name="accrued_fine",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+    ]
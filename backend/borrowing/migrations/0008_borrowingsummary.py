@@ -0,0 +1,107 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:35
+
+import datetime
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def create_summaries(apps, schema_editor):
+    """Summarize the users with open borrowings or pending payments."""
+    User = apps.get_model("user", "User")
+    Borrowing = apps.get_model("borrowing", "Borrowing")
+    Payment = apps.get_model("payment", "Payment")
+    BorrowingSummary = apps.get_model("borrowing", "BorrowingSummary")
+
+    def count(queryset):
+        return Coalesce(
+            Subquery(
+                queryset.values("user")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            Value(0),
+        )
+
+    def total(queryset):
+        return Coalesce(
+            Subquery(
+                queryset.values("status")
+                .annotate(total=Sum("money_to_pay"))
+                .values("total")
+            ),
+            Value(Decimal(0)),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        )
+
+    open_borrowings = Borrowing.objects.filter(
+        user=OuterRef("pk"), actual_return_date__isnull=True
+    )
+    pending = Payment.objects.filter(status="pending")
+    users = (
+        User.objects.annotate(
+            active=count(open_borrowings),
+            overdue=count(
+                open_borrowings.filter(
+                    expected_return_date__lt=datetime.date.today()
+                )
+            ),
+            pending=total(pending.filter(borrowing__user=OuterRef("pk")))
+            + total(
+                pending.filter(archived_borrowing__user=OuterRef("pk"))
+            ),
+        )
+        .filter(Q(active__gt=0) | Q(pending__gt=0))
+        .values_list("id", "active", "overdue", "pending")
+    )
+    BorrowingSummary.objects.bulk_create(
+        (
+            BorrowingSummary(
+                user_id=user_id,
+                active_count=active,
+                overdue_count=overdue,
+                pending_payments=pending,
+            )
+            for user_id, active, overdue, pending in users.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0007_hold"),
+        ("payment", "0003_payment_archived_borrowing"),
+        ("user", "0004_user_email_trigram_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BorrowingSummary",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="borrowing_summary",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("active_count", models.PositiveIntegerField(default=0)),
+                ("overdue_count", models.PositiveIntegerField(default=0)),
+                (
+                    "pending_payments",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("last_activity", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(create_summaries, migrations.RunPython.noop),
+    ]
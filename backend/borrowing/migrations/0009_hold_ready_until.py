@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("book", "0010_book_next_available_date"),
+        ("borrowing", "0008_borrowingsummary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hold",
+            name="ready_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="hold",
+            index=models.Index(
+                condition=models.Q(("ready_until__isnull", False)),
+                fields=["ready_until"],
+                name="hold_ready_until_idx",
+            ),
+        ),
+    ]
@@ -2,6 +2,16 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import (
+    Case,
+    DecimalField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Value,
+    When,
+)
+from django.db.models.functions import ExtractDay, Greatest
 
 from book.models import Book
 from payment.models import Payment
@@ -9,11 +19,96 @@ from payment.models import Payment
 
 FINE_MULTIPLIER = 2
 
+PAYMENT_MESSAGES = {
+    Payment.PaymentType.FINE: (
+        "The book is returned overdue. You need to pay a fine."
+    ),
+    Payment.PaymentType.PAYMENT: (
+        "The book is returned on time. Please pay the rental fee."
+    ),
+}
+
+
+def _days_until(date_now, field_name):
+    return ExtractDay(
+        ExpressionWrapper(
+            Value(date_now) - F(field_name), output_field=DurationField()
+        )
+    )
+
+
+def _money(expression):
+    return ExpressionWrapper(
+        expression,
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+class BorrowingQuerySet(models.QuerySet):
+    """Fees computed by the database, for whole querysets at once."""
+
+    @staticmethod
+    def _overdue_fine(date_now):
+        return Case(
+            When(
+                expected_return_date__lt=date_now,
+                then=_days_until(date_now, "expected_return_date")
+                * F("book__daily_fee")
+                * FINE_MULTIPLIER,
+            ),
+            default=Value(0),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+
+    def with_overdue_fine(self, date_now: datetime.date):
+        """
+        Annotate ``overdue_fine``, the fine accrued by ``date_now``.
+
+        Overdue days times the daily fee times ``FINE_MULTIPLIER``, for
+        open and returned borrowings alike.
+        """
+        return self.annotate(overdue_fine=self._overdue_fine(date_now))
+
+    def with_fees(self, date_now: datetime.date):
+        """
+        Annotate the fees of ``Borrowing`` computed for ``date_now``.
+
+        ``rental_fee``, ``late_fee``, ``total_payment`` and
+        ``payment_type`` are the values of the methods of the same names,
+        including the late fee being only charged once
+        ``actual_return_date`` is set.
+        """
+        rental_days = Greatest(_days_until(date_now, "borrow_date"), 1)
+        return self.annotate(
+            rental_fee=_money(rental_days * F("book__daily_fee")),
+            late_fee=Case(
+                When(
+                    actual_return_date__isnull=False,
+                    then=self._overdue_fine(date_now),
+                ),
+                default=Value(0),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ),
+            total_payment=_money(F("rental_fee") + F("late_fee")),
+            payment_type=Case(
+                When(
+                    expected_return_date__lt=date_now,
+                    then=Value(Payment.PaymentType.FINE),
+                ),
+                default=Value(Payment.PaymentType.PAYMENT),
+                output_field=models.CharField(),
+            ),
+        )
+
 
 class Borrowing(models.Model):
     borrow_date = models.DateField(auto_now_add=True)
     expected_return_date = models.DateField()
     actual_return_date = models.DateField(null=True, blank=True)
+    # Fine accrued so far by an open overdue borrowing, see accrue_fines
+    accrued_fine = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0
+    )
     book = models.ForeignKey(
         Book,
         on_delete=models.CASCADE,
@@ -25,6 +120,28 @@ class Borrowing(models.Model):
         related_name="borrowings"
     )
 
+    objects = BorrowingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["expected_return_date"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_due_idx",
+            ),
+            models.Index(
+                fields=["user", "expected_return_date"],
+                name="borrowing_user_due_idx",
+            ),
+            models.Index(
+                fields=["borrow_date"], name="borrowing_borrow_date_idx"
+            ),
+            models.Index(
+                fields=["expected_return_date"],
+                name="borrowing_expected_return_idx",
+            ),
+        ]
+
     def get_payment_type(self, date_now: datetime.date):
         """return payment type"""
         if date_now > self.expected_return_date:
@@ -33,9 +150,7 @@ class Borrowing(models.Model):
 
     def get_payment_message(self, date_now: datetime.date):
         """return payment message"""
-        if self.get_payment_type(date_now) == Payment.PaymentType.FINE:
-            return "The book is returned overdue. You need to pay a fine."
-        return "The book is returned on time. Please pay the rental fee."
+        return PAYMENT_MESSAGES[self.get_payment_type(date_now)]
 
     def get_total_rental_fee(self, date_now: datetime.date):
         """return total rental fee"""
@@ -44,6 +159,10 @@ class Borrowing(models.Model):
             return max(rental_days, 1) * self.book.daily_fee
         return self.book.daily_fee
 
+    def get_days_late(self, date_now: datetime.date):
+        """return days late of a return on date_now"""
+        return max((date_now - self.expected_return_date).days, 0)
+
     def get_late_fee(self, date_now: datetime.date):
         """return late fee"""
         if self.actual_return_date and self.expected_return_date:
@@ -60,3 +179,115 @@ class Borrowing(models.Model):
 
     def __str__(self) -> str:
         return f"Borrowing by {self.user} - Book: {self.book.title} on {self.borrow_date}"
+
+
+class ArchivedBorrowing(models.Model):
+    """
+    A borrowing returned long ago, moved out of the borrowing table.
+
+    Rows keep the id they had as a ``Borrowing``, and their payments are
+    linked through ``Payment.archived_borrowing``, see
+    ``borrowing.archive.archive_borrowings``.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField()
+    actual_return_date = models.DateField()
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name="archived_borrowings"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_borrowings"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "borrow_date"],
+                name="archived_user_borrow_date_idx",
+            ),
+            models.Index(
+                fields=["borrow_date"], name="archived_borrow_date_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return (
+            f"Archived borrowing {self.id} by {self.user_id} "
+            f"on {self.borrow_date}"
+        )
+
+
+class Hold(models.Model):
+    """
+    A patron waiting for a copy of an out-of-stock book.
+
+    Holds of a book form a FIFO queue ordered by ``created_at``. A
+    returned copy goes to the hold at the head of the queue: the copy is
+    set aside for its patron, who is notified and has until
+    ``ready_until`` to borrow it, see ``borrowing.holds.notify_holds``.
+    """
+
+    book = models.ForeignKey(
+        Book,
+        on_delete=models.CASCADE,
+        related_name="holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="holds"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set once a copy is set aside for the hold
+    ready_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "book"], name="hold_unique_user_book"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["book", "created_at"], name="hold_book_queue_idx"
+            ),
+            models.Index(
+                fields=["ready_until"],
+                condition=models.Q(ready_until__isnull=False),
+                name="hold_ready_until_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Hold by {self.user_id} on book {self.book_id}"
+
+
+class BorrowingSummary(models.Model):
+    """
+    Borrowing figures of a user, for the dashboard.
+
+    Refreshed by ``borrowing.summary.refresh_summaries`` on every borrow,
+    return and payment event, and nightly for borrowings falling overdue.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="borrowing_summary",
+    )
+    active_count = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    pending_payments = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0
+    )
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"Borrowing summary of {self.user_id}"
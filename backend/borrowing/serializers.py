@@ -1,9 +1,15 @@
 from datetime import datetime
 
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
-from borrowing.models import Borrowing
+from book.models import Book
+from borrowing.models import Borrowing, BorrowingSummary, Hold
+from borrowing.services import BookNotAvailable, create_borrowing
 from book.serializers import BookSerializer
+from library_service.serializers import DynamicFieldsModelSerializer
+from payment.models import Payment
 
 
 class BorrowingSerializer(serializers.ModelSerializer):
@@ -20,16 +26,175 @@ class BorrowingSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def create(self, validated_data):
+        try:
+            return create_borrowing(**validated_data)
+        except BookNotAvailable:
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "This book is not available"
+                    ]
+                }
+            )
 
-class BorrowingListSerializer(serializers.ModelSerializer):
+
+class BorrowingCheckoutItemSerializer(serializers.Serializer):
+    book = serializers.IntegerField(min_value=1)
+    expected_return_date = serializers.DateField()
+
+
+class BorrowingCheckoutSerializer(serializers.Serializer):
+    """
+    Several books borrowed at once, see ``services.checkout_books``.
+
+    All books are checked with one query. With ``all_or_nothing`` any
+    invalid item fails validation, otherwise the errors of each item are
+    left in ``item_errors`` and only the valid items are checked out.
+    """
+
+    max_items = 20
+
+    items = BorrowingCheckoutItemSerializer(
+        many=True, allow_empty=False, max_length=max_items
+    )
+    all_or_nothing = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        book_ids = {item["book"] for item in attrs["items"]}
+        existing = set(
+            Book.objects.filter(pk__in=book_ids).values_list("pk", flat=True)
+        )
+        today = datetime.now().date()
+
+        seen = set()
+        item_errors = []
+        for item in attrs["items"]:
+            errors = []
+            if item["book"] not in existing:
+                errors.append("Book does not exist")
+            elif item["book"] in seen:
+                errors.append("Duplicate book")
+            if item["expected_return_date"] < today:
+                errors.append("Invalid return date")
+            seen.add(item["book"])
+            item_errors.append(errors)
+
+        if attrs["all_or_nothing"] and any(item_errors):
+            raise serializers.ValidationError(
+                {
+                    "items": [
+                        {api_settings.NON_FIELD_ERRORS_KEY: errors}
+                        if errors else {}
+                        for errors in item_errors
+                    ]
+                }
+            )
+        attrs["item_errors"] = item_errors
+        return attrs
+
+
+class BorrowingCheckInSerializer(serializers.Serializer):
+    max_borrowings = 500
+
+    borrowings = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=max_borrowings,
+    )
+
+
+class BorrowingQuoteSerializer(serializers.Serializer):
+    """Fees of a borrowing annotated by ``BorrowingQuerySet.with_fees``."""
+
+    row_fields = (
+        "id",
+        "payment_type",
+        "rental_fee",
+        "late_fee",
+        "total_payment",
+    )
+
+    borrowing = serializers.IntegerField(source="id")
+    payment_type = serializers.ChoiceField(
+        choices=Payment.PaymentType.choices
+    )
+    rental_fee = serializers.DecimalField(max_digits=10, decimal_places=2)
+    late_fee = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total_payment = serializers.DecimalField(
+        max_digits=10, decimal_places=2
+    )
+
+
+class BorrowingLiabilitiesSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    open_borrowings = serializers.IntegerField()
+    rental_fees = serializers.DecimalField(max_digits=12, decimal_places=2)
+    overdue_fines = serializers.DecimalField(
+        max_digits=12, decimal_places=2
+    )
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class BorrowingListSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Borrowing
-        fields = ("id", "borrow_date", "expected_return_date", "book")
+        fields = (
+            "id",
+            "borrow_date",
+            "expected_return_date",
+            "accrued_fine",
+            "book",
+        )
+        expandable_fields = {"book": BookSerializer}
 
 
-class BorrowingRetrieveSerializer(serializers.ModelSerializer):
+class BorrowingRetrieveSerializer(DynamicFieldsModelSerializer):
     book = BookSerializer(many=False, read_only=True)
 
     class Meta:
         model = Borrowing
-        fields = ("id", "borrow_date", "expected_return_date", "actual_return_date", "book")
+        fields = (
+            "id",
+            "borrow_date",
+            "expected_return_date",
+            "actual_return_date",
+            "accrued_fine",
+            "book",
+        )
+
+
+class HoldSerializer(serializers.ModelSerializer):
+    position = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Hold
+        fields = ("id", "book", "created_at", "ready_until", "position")
+        read_only_fields = ("created_at", "ready_until")
+
+    def validate_book(self, book):
+        if book.inventory > 0:
+            raise serializers.ValidationError(
+                "This book is available, borrow it instead"
+            )
+        return book
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"book": ["You already have a hold on this book"]}
+            )
+
+
+class BorrowingSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BorrowingSummary
+        fields = (
+            "active_count",
+            "overdue_count",
+            "pending_payments",
+            "last_activity",
+        )
@@ -0,0 +1,150 @@
+from django.db import transaction
+
+from book.inventory import release_copies, reserve_copies, reserve_copy
+from borrowing.cache import bump_borrowings_version
+from borrowing.holds import notify_holds, take_holds
+from borrowing.models import Borrowing, Hold
+from borrowing.summary import refresh_summaries
+from borrowing.tasks import send_checkout_notification
+from payment.models import Payment
+
+
+class BookNotAvailable(Exception):
+    """No copy left of the book, or of the books given as ``args``."""
+
+
+def create_borrowing(user, book, expected_return_date):
+    """
+    Borrow a copy of ``book`` for ``user`` in a single transaction.
+
+    A hold of the user on the book is removed first: if a copy was set
+    aside for it, that copy is the one borrowed. Otherwise a copy is
+    reserved with one conditional ``UPDATE``. The borrowing is inserted
+    right after, the book and the user are the instances passed in and
+    are never fetched again. Notifications are queued by the
+    ``post_save`` signal once the transaction commits, with ids only.
+    Raises ``BookNotAvailable`` when no copy is left.
+    """
+    with transaction.atomic():
+        if not take_holds(user.id, [book.id]) and not reserve_copy(
+            book.id, expected_return_date
+        ):
+            raise BookNotAvailable
+        return Borrowing.objects.create(
+            user=user, book=book, expected_return_date=expected_return_date
+        )
+
+
+def checkout_books(user, items, partial=False):
+    """
+    Borrow several books for ``user`` at once.
+
+    ``items`` are dicts with distinct ``book`` ids and their
+    ``expected_return_date``. The copies set aside for ready holds of the
+    user are taken first, then one statement reserves a copy of every
+    other book and one ``bulk_create`` inserts the borrowings, followed
+    by a single combined notification after commit. Holds of the user on
+    the borrowed books are removed. Without ``partial`` the
+    checkout is all or nothing and raises ``BookNotAvailable`` with the
+    ids of the missing books; with it, those books are skipped. Returns
+    the created borrowings.
+    """
+    with transaction.atomic():
+        ready = take_holds(
+            user.id, [item["book"] for item in items], ready_only=True
+        )
+        others = [item for item in items if item["book"] not in ready]
+        reserved = ready | reserve_copies(
+            [item["book"] for item in others],
+            [item["expected_return_date"] for item in others],
+        )
+        missing = [
+            item["book"] for item in items if item["book"] not in reserved
+        ]
+        if missing and not partial:
+            raise BookNotAvailable(*missing)
+
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                user=user,
+                book_id=item["book"],
+                expected_return_date=item["expected_return_date"],
+            )
+            for item in items
+            if item["book"] in reserved
+        )
+        if borrowings:
+            Hold.objects.filter(
+                user=user,
+                book_id__in=[borrowing.book_id for borrowing in borrowings],
+            ).delete()
+            bump_borrowings_version(user.id)
+            refresh_summaries([user.id])
+            borrowing_ids = [borrowing.id for borrowing in borrowings]
+            transaction.on_commit(
+                lambda: send_checkout_notification.delay(borrowing_ids)
+            )
+    return borrowings
+
+
+def check_in_borrowings(borrowing_ids, return_date):
+    """
+    Return a pile of borrowings at the desk.
+
+    The open borrowings among ``borrowing_ids`` are locked with one query
+    and their fees computed in the same pass. They are marked returned
+    with one ``UPDATE``, their copies put back by ``release_copies`` and
+    offered to the patrons holding them by ``notify_holds``, and a pending
+    payment per borrowing is created with one ``bulk_create``. Their
+    Stripe sessions are left empty, the caller opens them once the
+    transaction commits with ``payment.tasks.create_payment_sessions``.
+    Borrowings already returned or unknown are ignored. Returns the
+    created payments, with their ``borrowing`` set.
+    """
+    with transaction.atomic():
+        borrowings = list(
+            Borrowing.objects.filter(
+                pk__in=borrowing_ids, actual_return_date__isnull=True
+            )
+            .select_related("book")
+            .only(
+                "borrow_date",
+                "expected_return_date",
+                "actual_return_date",
+                "book_id",
+                "user_id",
+                "book__daily_fee",
+            )
+            .select_for_update(of=("self",))
+            .order_by("id")
+        )
+        if not borrowings:
+            return []
+
+        payments = []
+        for borrowing in borrowings:
+            borrowing.actual_return_date = return_date
+            payments.append(
+                Payment(
+                    borrowing=borrowing,
+                    status=Payment.PaymentStatus.PENDING,
+                    type=borrowing.get_payment_type(return_date),
+                    money_to_pay=borrowing.get_total_payment(return_date),
+                )
+            )
+
+        Borrowing.objects.filter(
+            pk__in=[borrowing.id for borrowing in borrowings]
+        ).update(actual_return_date=return_date)
+        book_ids = [borrowing.book_id for borrowing in borrowings]
+        release_copies(
+            book_ids,
+            [borrowing.get_days_late(return_date) for borrowing in borrowings],
+        )
+        notify_holds(book_ids)
+        Payment.objects.bulk_create(payments)
+        user_ids = {borrowing.user_id for borrowing in borrowings}
+        refresh_summaries(user_ids)
+        for user_id in user_ids:
+            bump_borrowings_version(user_id)
+    return payments
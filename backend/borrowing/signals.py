@@ -1,38 +1,90 @@
 from datetime import datetime
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from book.inventory import release_copy
+from borrowing.cache import bump_borrowings_version
+from borrowing.holds import notify_holds
 from borrowing.models import Borrowing
-from borrowing.tasks import send_notification_to_telegram
+from borrowing.summary import refresh_summaries
+from borrowing.tasks import send_borrow_creation_notification
 from payment.models import Payment
 
 
 @receiver(post_save, sender=Borrowing)
 def send_borrow_creation(sender, instance, created, **kwargs):
     if created:
+        borrowing_id = instance.pk
+        transaction.on_commit(
+            lambda: send_borrow_creation_notification.delay(borrowing_id)
+        )
 
-        message = (f"New borrowing created:\n\n"
-                   f"User: {instance.user.email}\n\n"
-                   f"Book: {instance.book.title}\n"
-                   f"Author: {instance.book.author}\n\n"
-                   f"Borrowing date: {instance.borrow_date}\n"
-                   f"Expected return date: {instance.expected_return_date}"
-                   )
-        send_notification_to_telegram.delay(message)
+
+@receiver(post_save, sender=Borrowing)
+@receiver(post_delete, sender=Borrowing)
+def invalidate_borrowings_version(sender, instance, **kwargs):
+    bump_borrowings_version(instance.user_id)
+
+
+@receiver(post_save, sender=Borrowing)
+def refresh_borrowing_summary(sender, instance, **kwargs):
+    refresh_summaries([instance.user_id])
+
+
+def get_payment_user_id(payment):
+    if payment.borrowing_id is not None:
+        return payment.borrowing.user_id
+    return payment.archived_borrowing.user_id
 
 
 def change_borrowing_status(instance):
-    instance.actual_return_date = datetime.now().date()
-    instance.save()
-    book = instance.book
-    book.inventory += 1
-    book.save()
+    """
+    Mark a borrowing returned and put its copy back, only once.
+
+    The copy is offered to the next patron holding the book.
+
+    The return date is set by a conditional update, so a payment saved as
+    paid twice (or concurrently) does not release the copy twice.
+    """
+    return_date = datetime.now().date()
+    with transaction.atomic():
+        returned = Borrowing.objects.filter(
+            pk=instance.pk, actual_return_date__isnull=True
+        ).update(actual_return_date=return_date)
+        if returned:
+            release_copy(
+                instance.book_id, instance.get_days_late(return_date)
+            )
+            notify_holds([instance.book_id])
+            bump_borrowings_version(instance.user_id)
+    if returned:
+        instance.actual_return_date = return_date
 
 
 @receiver(post_save, sender=Payment)
 def borrowing_paid(sender, instance, created, **kwargs):
+    # Archived borrowings are returned already
+    if instance.borrowing_id is None:
+        return
     if not created and instance.status == "paid":
-            print("change status")
-            borrowing = instance.borrowing
-            change_borrowing_status(borrowing)
+        change_borrowing_status(instance.borrowing)
+
+
+# Connected after borrowing_paid, so a paid return is counted as well
+@receiver(post_save, sender=Payment)
+def refresh_payment_summary(sender, instance, **kwargs):
+    refresh_summaries([get_payment_user_id(instance)])
+
+
+@receiver(post_delete, sender=Borrowing)
+@receiver(post_delete, sender=Payment)
+def refresh_summary_after_delete(sender, instance, **kwargs):
+    # Deleted along with their user perhaps, only refreshed after commit
+    user_id = (
+        instance.user_id
+        if sender is Borrowing
+        else get_payment_user_id(instance)
+    )
+    transaction.on_commit(lambda: refresh_summaries([user_id]))
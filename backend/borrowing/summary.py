@@ -0,0 +1,80 @@
+from datetime import date
+
+from django.db import connection
+from django.utils import timezone
+
+from borrowing.models import ArchivedBorrowing, Borrowing, BorrowingSummary
+from payment.models import Payment
+
+
+def _summary_sql():
+    user = BorrowingSummary._meta.get_field("user").related_model
+    summary, borrowing, archived, payment, users = (
+        connection.ops.quote_name(model._meta.db_table)
+        for model in (
+            BorrowingSummary, Borrowing, ArchivedBorrowing, Payment, user
+        )
+    )
+    open_borrowings = (
+        f"FROM {borrowing} WHERE user_id = person.id "
+        "AND actual_return_date IS NULL"
+    )
+    return (
+        f"INSERT INTO {summary} (user_id, active_count, overdue_count, "
+        "pending_payments, last_activity) "
+        f"SELECT person.id, (SELECT COUNT(*) {open_borrowings}), "
+        f"(SELECT COUNT(*) {open_borrowings} "
+        "AND expected_return_date < %(today)s), "
+        "COALESCE(("
+        f"SELECT SUM(payment.money_to_pay) FROM {payment} AS payment "
+        f"JOIN {borrowing} AS borrowing "
+        "ON borrowing.id = payment.borrowing_id "
+        "WHERE borrowing.user_id = person.id "
+        "AND payment.status = %(pending)s"
+        "), 0) + COALESCE(("
+        f"SELECT SUM(payment.money_to_pay) FROM {payment} AS payment "
+        f"JOIN {archived} AS archived "
+        "ON archived.id = payment.archived_borrowing_id "
+        "WHERE archived.user_id = person.id "
+        "AND payment.status = %(pending)s"
+        "), 0), %(now)s "
+        f"FROM {users} AS person WHERE person.id = ANY(%(user_ids)s) "
+        "ON CONFLICT (user_id) DO UPDATE SET "
+        "active_count = EXCLUDED.active_count, "
+        "overdue_count = EXCLUDED.overdue_count, "
+        "pending_payments = EXCLUDED.pending_payments, "
+        "last_activity = COALESCE("
+        f"EXCLUDED.last_activity, {summary}.last_activity)"
+    )
+
+
+def refresh_summaries(user_ids, activity=True):
+    """
+    Recompute the ``BorrowingSummary`` rows of some users.
+
+    A single ``INSERT ... ON CONFLICT DO UPDATE`` counts the open and
+    overdue borrowings of every user and sums their pending payments,
+    live and archived, all through indexes on the user and the payment
+    foreign keys. Users deleted in the meantime are skipped. Called with
+    the users touched by each borrow, return and payment; ``activity``
+    also stamps their ``last_activity``.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _summary_sql(),
+            {
+                "user_ids": user_ids,
+                "today": date.today(),
+                "pending": Payment.PaymentStatus.PENDING,
+                "now": timezone.now() if activity else None,
+            },
+        )
+
+
+def get_summary(user):
+    """Return the summary of ``user``, empty if they never borrowed."""
+    summary = BorrowingSummary.objects.filter(user=user).first()
+    return summary or BorrowingSummary(user=user)
@@ -1,16 +1,22 @@
 import asyncio
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from itertools import islice
 
 from celery import shared_task
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, send_mass_mail
+from django.db.models import Count, F, Sum
 from dotenv import load_dotenv
 from telegram import Bot
 
+from book.models import Book
+from borrowing.archive import archive_borrowings, archive_cutoff
+from borrowing.cache import bump_borrowings_version
+from borrowing.filters import BorrowingFilter
 from borrowing.models import Borrowing
-from borrowing.views import export_borrows_to_excel
+from borrowing.summary import refresh_summaries
 
 load_dotenv()
 token = os.getenv("TELEGRAM_TOKEN")
@@ -20,14 +26,15 @@ chat_id = os.getenv("TELEGRAM_CHAT_ID")
 @shared_task
 def morning_borrow_update():
     sum_of_all_borrows = Borrowing.objects.count()
-    sum_of_overdue_borrows = Borrowing.objects.filter(
-        expected_return_date__lt=datetime.now()
-    ).count()
+    overdue = Borrowing.objects.filter(
+        BorrowingFilter.overdue_condition()
+    ).aggregate(count=Count("id"), fines=Sum("accrued_fine"))
 
     if sum_of_all_borrows > 0:
         message = (
             f"Today we have {sum_of_all_borrows} borrowings.\n\n"
-            f"Total overdue {sum_of_overdue_borrows} books.\n\n"
+            f"Total overdue {overdue['count']} books.\n"
+            f"Accrued fines: {overdue['fines'] or 0} USD.\n\n"
             "Details report was send on corporate email."
         )
     else:
@@ -43,12 +50,15 @@ def morning_borrow_update():
 
 @shared_task
 def send_borrows_to_email():
+    # Imported here: the views depend on this module through the services.
+    from borrowing.views import export_borrows_to_excel
+
     sum_of_all_borrows = Borrowing.objects.count()
     sum_of_overdue_borrows = Borrowing.objects.filter(
-        expected_return_date__lt=datetime.now()
+        BorrowingFilter.overdue_condition()
     ).count()
 
-    detailed_borrows_document = export_borrows_to_excel()
+    detailed_borrows_document = export_borrows_to_excel({"is_active": True})
     email = EmailMessage(
         subject=f"Borrowing-daily-report-"
                 f"{datetime.now().strftime('%Y-%m-%d')}",
@@ -57,9 +67,8 @@ def send_borrows_to_email():
         "Here are the key details:\n"
         f"Total number of borrowings: {sum_of_all_borrows}.\n"
         f"Number of overdue borrowings: {sum_of_overdue_borrows}\n"
-        "This report includes all relevant data regarding borrowings,\n"
-        "including borrow date, "
-        "expected return date, and actual return date.\n"
+        "This report includes all borrowings not returned yet,\n"
+        "with their borrow date and expected return date.\n"
         "If you have any questions or need further information,\n"
         "please don't hesitate to reach out.",
         from_email=settings.EMAIL_HOST_USER,
@@ -84,6 +93,96 @@ def send_notification_to_telegram(message):
 
     asyncio.run(send())
 
+
+@shared_task
+def send_borrow_creation_notification(borrowing_id):
+    borrowing = Borrowing.objects.select_related("user", "book").get(
+        pk=borrowing_id
+    )
+    message = (
+        f"New borrowing created:\n\n"
+        f"User: {borrowing.user.email}\n\n"
+        f"Book: {borrowing.book.title}\n"
+        f"Author: {borrowing.book.author}\n\n"
+        f"Borrowing date: {borrowing.borrow_date}\n"
+        f"Expected return date: {borrowing.expected_return_date}"
+    )
+    send_notification_to_telegram(message)
+    return "Success"
+
+
+@shared_task
+def send_checkout_notification(borrowing_ids):
+    borrowings = Borrowing.objects.select_related("user", "book").filter(
+        pk__in=borrowing_ids
+    ).order_by("id")
+    if not borrowings:
+        return "Success"
+    books = "\n".join(
+        f"- {borrowing.book.title} ({borrowing.book.author}), "
+        f"return by {borrowing.expected_return_date}"
+        for borrowing in borrowings
+    )
+    message = (
+        f"New checkout of {len(borrowings)} books:\n\n"
+        f"User: {borrowings[0].user.email}\n\n"
+        f"{books}\n\n"
+        f"Borrowing date: {borrowings[0].borrow_date}"
+    )
+    send_notification_to_telegram(message)
+    return "Success"
+
+@shared_task
+def send_hold_notifications(holds):
+    """
+    Tell patrons whose hold is ready that a copy is set aside for them.
+
+    ``holds`` are ``(book_id, user_id)`` pairs, each patron gets a
+    Telegram message if their chat is known and an email.
+    """
+    books = Book.objects.in_bulk({book_id for book_id, _ in holds})
+    users = get_user_model().objects.in_bulk(
+        {user_id for _, user_id in holds}
+    )
+    messages = []
+    for book_id, user_id in holds:
+        if book_id not in books or user_id not in users:
+            continue
+        book = books[book_id]
+        messages.append(
+            (
+                users[user_id],
+                f"The book you are waiting for is available:\n\n"
+                f"Book: {book.title}\n"
+                f"Author: {book.author}\n\n"
+                "A copy is kept for you for "
+                f"{settings.HOLD_READY_DAYS} days, borrow it before then.",
+            )
+        )
+
+    send_mass_mail(
+        [
+            (
+                "A book you are waiting for is available",
+                text,
+                settings.EMAIL_HOST_USER,
+                [user.email],
+            )
+            for user, text in messages
+        ]
+    )
+
+    async def send():
+        bot = Bot(token=token)
+        for user, text in messages:
+            if user.tg_chat:
+                await bot.send_message(chat_id=user.tg_chat, text=text)
+
+    if any(user.tg_chat for user, _ in messages):
+        asyncio.run(send())
+    return f"Notified {len(messages)} holds"
+
+
 @shared_task
 def send_user_almost_overdue_borrowing_notification():
     User = get_user_model()
@@ -92,6 +191,7 @@ def send_user_almost_overdue_borrowing_notification():
 
     for user_id in user_ids:
         borrowings = Borrowing.objects.filter(
+            actual_return_date__isnull=True,
             expected_return_date__lte=one_day_ahead_expected_return_date,
             expected_return_date__gt=datetime.now(),
             user__tg_chat=user_id,
@@ -113,4 +213,65 @@ def send_user_almost_overdue_borrowing_notification():
 
     asyncio.run(send())
 
-    return "Success"
\ No newline at end of file
+    return "Success"
+
+
+@shared_task
+def accrue_fines(batch_size=1000):
+    """
+    Store the fine accrued so far by every open overdue borrowing.
+
+    The fines are computed by the database in a single query (see
+    ``BorrowingQuerySet.with_overdue_fine``), only the changed ones are read
+    back and written with ``bulk_update`` in batches of ``batch_size``.
+    Borrowings no longer overdue are reset with one ``UPDATE``, and the
+    overdue counts of the users concerned refreshed.
+    """
+    fines = (
+        Borrowing.objects.filter(BorrowingFilter.overdue_condition())
+        .with_overdue_fine(date.today())
+        .exclude(accrued_fine=F("overdue_fine"))
+        .values_list("id", "user_id", "overdue_fine")
+        .iterator(chunk_size=batch_size)
+    )
+    user_ids = set()
+    updated = 0
+    while batch := list(islice(fines, batch_size)):
+        Borrowing.objects.bulk_update(
+            [
+                Borrowing(id=borrowing_id, accrued_fine=fine)
+                for borrowing_id, _, fine in batch
+            ],
+            ["accrued_fine"],
+        )
+        user_ids.update(user_id for _, user_id, _ in batch)
+        updated += len(batch)
+
+    cleared = Borrowing.objects.exclude(
+        BorrowingFilter.overdue_condition()
+    ).exclude(accrued_fine=0)
+    user_ids.update(cleared.values_list("user_id", flat=True))
+    updated += cleared.update(accrued_fine=0)
+
+    # Borrowings falling overdue change fines, so their users are here
+    refresh_summaries(user_ids, activity=False)
+    for user_id in user_ids:
+        bump_borrowings_version(user_id)
+    return f"Updated {updated} accrued fines"
+
+
+@shared_task
+def archive_returned_borrowings(batch_size=1000):
+    """Archive borrowings returned ``BORROWING_ARCHIVE_AFTER_MONTHS`` ago."""
+    before = archive_cutoff(settings.BORROWING_ARCHIVE_AFTER_MONTHS)
+    archived = archive_borrowings(before, batch_size=batch_size)
+    return f"Archived {archived} borrowings returned before {before}"
+
+
+@shared_task
+def expire_ready_holds():
+    """Pass on the copies of ready holds not borrowed in time."""
+    # Imported here: the holds module queues tasks from this one.
+    from borrowing.holds import expire_holds
+
+    return f"Expired {expire_holds()} holds"
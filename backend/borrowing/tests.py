@@ -1,19 +1,47 @@
 import json
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
+import pandas as pd
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.status import (
     HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
     HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
     HTTP_401_UNAUTHORIZED,
     HTTP_403_FORBIDDEN,
+    HTTP_422_UNPROCESSABLE_ENTITY,
 )
 from rest_framework.test import APIClient
 
+from book.inventory import find_inventory_drift
 from book.models import Book
-from borrowing.models import Borrowing
+from borrowing.archive import archive_borrowings, archive_cutoff
+from borrowing.holds import expire_holds
+from borrowing.models import ArchivedBorrowing, Borrowing, Hold
+from borrowing.services import (
+    BookNotAvailable,
+    check_in_borrowings,
+    create_borrowing,
+)
+from borrowing.tasks import accrue_fines, send_hold_notifications
+from borrowing.views import export_borrows_to_excel
+from library_bot.user_interface.borrowings import get_borrows_list
+from library_service.pagination import KeysetPagination
 from payment.models import Payment
 
 
@@ -78,7 +106,7 @@ class TestBorrowingForUser(TestCase):
 
         response = self.client.get(BORROWING_LIST_URL)
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(parse_response(response)), 1)
+        self.assertEqual(len(parse_response(response)["results"]), 1)
 
     def test_borrowing_with_filter_is_active(self):
         self.client.force_authenticate(self.user1)
@@ -97,10 +125,10 @@ class TestBorrowingForUser(TestCase):
         response = self.client.get(f"{BORROWING_LIST_URL}?is_active=false")
 
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(parse_response(response)), 0)
+        self.assertEqual(len(parse_response(response)["results"]), 0)
 
         response = self.client.get(f"{BORROWING_LIST_URL}?is_active=true")
-        self.assertEqual(len(parse_response(response)), 1)
+        self.assertEqual(len(parse_response(response)["results"]), 1)
 
 
     def test_retrieve_borrowing(self):
@@ -252,7 +280,7 @@ class TestBorrowingForAdmin(TestCase):
         self.client.force_authenticate(self.admin_user)
         response = self.client.get(BORROWING_LIST_URL)
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(parse_response(response)), 2)
+        self.assertEqual(len(parse_response(response)["results"]), 2)
 
     def test_borrowing_list_with_filter_user_id(self):
         self.client.force_authenticate(self.user1)
@@ -271,7 +299,7 @@ class TestBorrowingForAdmin(TestCase):
         response = self.client.get(f"{BORROWING_LIST_URL}?user_id=3")
 
         self.assertEqual(response.status_code, HTTP_200_OK)
-        self.assertEqual(len(parse_response(response)), 1)
+        self.assertEqual(len(parse_response(response)["results"]), 1)
 
     def test_borrowing_retrieve_other_user(self):
         self.client.force_authenticate(self.user1)
@@ -285,4 +313,1670 @@ class TestBorrowingForAdmin(TestCase):
             args=[Borrowing.objects.last().id]
         )
         response = self.client.get(url)
-        self.assertEqual(response.status_code, HTTP_200_OK)
\ No newline at end of file
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+
+class TestBorrowingConditionalGet(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=10,
+            daily_fee=10,
+        )
+        self.user1 = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.user2 = get_user_model().objects.create_user(
+            email="user2@test.com", password="testpassword"
+        )
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@test.com", password="testpassword", is_staff=True
+        )
+        self.borrowing = Borrowing.objects.create(
+            book=self.book,
+            user=self.user1,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+        self.detail_url = reverse(
+            "borrowing:borrowings-detail", args=[self.borrowing.id]
+        )
+
+    def test_unchanged_list_returns_not_modified(self):
+        self.client.force_authenticate(self.user1)
+        etag = self.client.get(BORROWING_LIST_URL)["ETag"]
+
+        response = self.client.get(
+            BORROWING_LIST_URL, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_unchanged_detail_returns_not_modified(self):
+        self.client.force_authenticate(self.user1)
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_own_borrowing_changes_etag(self):
+        self.client.force_authenticate(self.user1)
+        list_etag = self.client.get(BORROWING_LIST_URL)["ETag"]
+        detail_etag = self.client.get(self.detail_url)["ETag"]
+
+        self.borrowing.actual_return_date = date.today()
+        self.borrowing.save()
+
+        response = self.client.get(
+            BORROWING_LIST_URL, HTTP_IF_NONE_MATCH=list_etag
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        response = self.client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=detail_etag
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+    def test_other_user_borrowing_keeps_etag(self):
+        self.client.force_authenticate(self.user1)
+        etag = self.client.get(BORROWING_LIST_URL)["ETag"]
+
+        Borrowing.objects.create(
+            book=self.book,
+            user=self.user2,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+
+        response = self.client.get(
+            BORROWING_LIST_URL, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_staff_list_changes_with_any_borrowing(self):
+        self.client.force_authenticate(self.admin_user)
+        etag = self.client.get(BORROWING_LIST_URL)["ETag"]
+
+        Borrowing.objects.create(
+            book=self.book,
+            user=self.user2,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+
+        response = self.client.get(
+            BORROWING_LIST_URL, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(len(parse_response(response)["results"]), 2)
+
+    def test_book_edit_changes_expanded_list_etag(self):
+        self.client.force_authenticate(self.user1)
+        url = f"{BORROWING_LIST_URL}?expand=book"
+        etag = self.client.get(url)["ETag"]
+
+        self.book.title = "test2"
+        self.book.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(
+            "test2", parse_response(response)["results"][0]["book"]["title"]
+        )
+
+    def test_etag_is_not_shared_between_users(self):
+        self.client.force_authenticate(self.user1)
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.client.force_authenticate(self.admin_user)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+
+class TestBorrowingKeysetPagination(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=10,
+            daily_fee=10,
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@test.com", password="testpassword", is_staff=True
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                book=self.book,
+                user=self.user,
+                expected_return_date=date.today() + timedelta(days=days),
+            )
+            for days in range(5)
+        ]
+
+    def test_staff_pages_through_borrowings(self):
+        self.client.force_authenticate(self.admin_user)
+        url = f"{BORROWING_LIST_URL}?page_size=2"
+        ids = []
+        while url:
+            response = parse_response(self.client.get(url))
+            self.assertLessEqual(len(response["results"]), 2)
+            ids.extend(borrowing["id"] for borrowing in response["results"])
+            url = response["next"]
+
+        self.assertEqual(
+            [borrowing.id for borrowing in self.borrowings], ids
+        )
+
+    def test_pagination_combined_with_filters(self):
+        self.borrowings[0].actual_return_date = date.today()
+        self.borrowings[0].save()
+        self.client.force_authenticate(self.user)
+
+        response = parse_response(
+            self.client.get(f"{BORROWING_LIST_URL}?is_active=true&cursor=")
+        )
+
+        self.assertEqual(4, len(response["results"]))
+        self.assertIsNone(response["next"])
+
+    def test_list_without_pagination_parameters_is_paged(self):
+        self.client.force_authenticate(self.admin_user)
+        with mock.patch.object(KeysetPagination, "page_size", 2):
+            response = parse_response(self.client.get(BORROWING_LIST_URL))
+
+        self.assertEqual(
+            [borrowing.id for borrowing in self.borrowings[:2]],
+            [borrowing["id"] for borrowing in response["results"]],
+        )
+        self.assertIn("cursor=", response["next"])
+
+    def test_page_size_is_capped(self):
+        self.client.force_authenticate(self.admin_user)
+        with mock.patch.object(KeysetPagination, "max_page_size", 3):
+            response = parse_response(
+                self.client.get(BORROWING_LIST_URL, {"page_size": 1000})
+            )
+
+        self.assertEqual(3, len(response["results"]))
+
+
+class TestBorrowingDynamicFields(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=10,
+            daily_fee=10,
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.borrowing = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+        self.detail_url = reverse(
+            "borrowing:borrowings-detail", args=[self.borrowing.id]
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_returns_book_id_by_default(self):
+        response = parse_response(self.client.get(BORROWING_LIST_URL))
+
+        self.assertEqual(self.book.id, response["results"][0]["book"])
+
+    def test_list_expands_book(self):
+        response = parse_response(
+            self.client.get(BORROWING_LIST_URL, {"expand": "book"})
+        )
+
+        book = response["results"][0]["book"]
+        self.assertEqual(self.book.id, book["id"])
+        self.assertEqual("test1", book["title"])
+
+    def test_list_expands_book_in_one_query(self):
+        Borrowing.objects.create(
+            book=Book.objects.create(
+                title="test2",
+                author="test2",
+                cover="Soft",
+                inventory=1,
+                daily_fee=1,
+            ),
+            user=self.user,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+
+        with self.assertNumQueries(1):
+            self.client.get(
+                BORROWING_LIST_URL, {"expand": "book", "fields": "id,book"}
+            )
+
+    def test_list_returns_only_requested_fields(self):
+        response = parse_response(
+            self.client.get(BORROWING_LIST_URL, {"fields": "id"})
+        )
+
+        self.assertEqual([{"id": self.borrowing.id}], response["results"])
+
+    def test_detail_returns_only_requested_fields(self):
+        response = parse_response(
+            self.client.get(
+                self.detail_url, {"fields": "id,actual_return_date"}
+            )
+        )
+
+        self.assertEqual(
+            {"id": self.borrowing.id, "actual_return_date": None}, response
+        )
+
+    def test_detail_still_checks_owner_with_narrow_fields(self):
+        other_user = get_user_model().objects.create_user(
+            email="user2@test.com", password="testpassword"
+        )
+        self.client.force_authenticate(other_user)
+
+        response = self.client.get(self.detail_url, {"fields": "id"})
+
+        self.assertEqual(HTTP_403_FORBIDDEN, response.status_code)
+
+
+class TestBorrowingValuesSerialization(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        for number in range(3):
+            Borrowing.objects.create(
+                book=Book.objects.create(
+                    title=f"test{number}",
+                    author="test",
+                    cover="Hard",
+                    inventory=10,
+                    daily_fee="1.5",
+                    image="uploads/books/test.jpg" if number else None,
+                ),
+                user=self.user,
+                expected_return_date=date.today() + timedelta(days=number),
+            )
+        self.client.force_authenticate(self.user)
+
+    def assert_parity(self, params=None):
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            expected = parse_response(
+                self.client.get(BORROWING_LIST_URL, params)
+            )
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            actual = parse_response(
+                self.client.get(BORROWING_LIST_URL, params)
+            )
+        self.assertEqual(expected, actual)
+        return actual
+
+    def test_list_parity(self):
+        response = self.assert_parity()
+
+        self.assertEqual(
+            date.today().isoformat(), response["results"][0]["borrow_date"]
+        )
+
+    def test_expanded_list_parity(self):
+        response = self.assert_parity({"expand": "book"})
+
+        book = response["results"][0]["book"]
+        self.assertEqual("1.50", book["daily_fee"])
+        self.assertIsNone(book["image"])
+
+    def test_paginated_list_parity(self):
+        response = self.assert_parity({"page_size": 2, "expand": "book"})
+
+        self.assertIsNotNone(response["next"])
+
+
+class TestBorrowingStreaming(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=10,
+            daily_fee=10,
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.admin_user = get_user_model().objects.create_user(
+            email="admin@test.com", password="testpassword", is_staff=True
+        )
+        for days in range(3):
+            Borrowing.objects.create(
+                book=self.book,
+                user=self.user if days else self.admin_user,
+                expected_return_date=date.today() + timedelta(days=days),
+            )
+
+    @staticmethod
+    def read(response):
+        return b"".join(response.streaming_content)
+
+    def test_staff_streams_all_borrowings(self):
+        self.client.force_authenticate(self.admin_user)
+
+        response = self.client.get(BORROWING_LIST_URL, {"stream": "1"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            parse_response(self.client.get(BORROWING_LIST_URL))["results"],
+            json.loads(self.read(response)),
+        )
+
+    def test_user_streams_own_borrowings_as_ndjson(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(
+            BORROWING_LIST_URL,
+            {"expand": "book"},
+            HTTP_ACCEPT="application/x-ndjson",
+        )
+
+        self.assertEqual("application/x-ndjson", response["Content-Type"])
+        lines = self.read(response).decode().splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertEqual("test1", json.loads(lines[0])["book"]["title"])
+
+    def test_create_still_answers_with_ndjson_accept_header(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.post(
+            BORROWING_LIST_URL,
+            {
+                "book": self.book.id,
+                "expected_return_date": date.today() + timedelta(days=3),
+            },
+            HTTP_ACCEPT="application/x-ndjson",
+        )
+
+        self.assertEqual(HTTP_201_CREATED, response.status_code)
+        self.assertEqual(
+            self.book.id, json.loads(response.content)["book"]
+        )
+
+
+class TestBorrowingConcurrency(TransactionTestCase):
+    copies = 3
+    borrowers = 12
+
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=self.copies,
+            daily_fee=10,
+        )
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f"user{number}@test.com", password="testpassword"
+            )
+            for number in range(self.borrowers)
+        ]
+
+    def test_concurrent_checkouts_do_not_oversell(self):
+        barrier = threading.Barrier(self.borrowers)
+        statuses = []
+
+        def checkout(user):
+            try:
+                client = APIClient()
+                client.force_authenticate(user)
+                barrier.wait()
+                response = client.post(
+                    BORROWING_LIST_URL,
+                    {
+                        "book": self.book.id,
+                        "expected_return_date": date.today()
+                        + timedelta(days=3),
+                    },
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=checkout, args=[user])
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.copies, statuses.count(HTTP_201_CREATED))
+        self.assertEqual(
+            self.borrowers - self.copies, statuses.count(HTTP_400_BAD_REQUEST)
+        )
+        self.assertEqual(0, self.book.inventory)
+        self.assertEqual(self.copies, Borrowing.objects.count())
+
+
+class TestBorrowingReturnInventory(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=0,
+            daily_fee=10,
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.borrowing = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=date.today() + timedelta(days=3),
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            session_url="https://checkout.stripe.com/test",
+            session_id="cs_test",
+            money_to_pay=10,
+        )
+
+    def test_paid_payment_returns_the_copy_once(self):
+        self.payment.status = Payment.PaymentStatus.PAID
+        self.payment.save()
+        self.payment.save()
+
+        self.book.refresh_from_db()
+        self.borrowing.refresh_from_db()
+        self.assertEqual(1, self.book.inventory)
+        self.assertEqual(date.today(), self.borrowing.actual_return_date)
+
+    def test_sold_out_book_cannot_be_borrowed(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post(
+            BORROWING_LIST_URL,
+            {
+                "book": self.book.id,
+                "expected_return_date": date.today() + timedelta(days=3),
+            },
+        )
+
+        self.assertEqual(HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(1, Borrowing.objects.count())
+
+
+class TestBorrowingCreationPipeline(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=2,
+            daily_fee=10,
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.data = {
+            "book": self.book.id,
+            "expected_return_date": date.today() + timedelta(days=3),
+        }
+
+    def test_create_borrowing_query_count(self):
+        # Book lookup, savepoint, inventory UPDATE, hold DELETE, INSERT,
+        # summary upsert, release.
+        with self.assertNumQueries(7):
+            response = self.client.post(BORROWING_LIST_URL, self.data)
+
+        self.assertEqual(HTTP_201_CREATED, response.status_code)
+        self.book.refresh_from_db()
+        self.assertEqual(1, self.book.inventory)
+
+    def test_notification_is_queued_after_commit_with_id(self):
+        with mock.patch(
+            "borrowing.signals.send_borrow_creation_notification"
+        ) as task:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.post(BORROWING_LIST_URL, self.data)
+                task.delay.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+
+        task.delay.assert_called_once_with(response.data["id"])
+
+    def test_unavailable_book_rolls_back(self):
+        self.book.inventory = 0
+        self.book.save()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            borrowing_count = Borrowing.objects.count()
+            with self.assertRaises(BookNotAvailable):
+                create_borrowing(
+                    self.user, self.book, self.data["expected_return_date"]
+                )
+
+        self.assertEqual(borrowing_count, Borrowing.objects.count())
+        self.assertEqual([], callbacks)
+
+
+BORROWING_CHECKOUT_URL = reverse("borrowing:borrowings-checkout")
+
+
+class TestBorrowingCheckout(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.books = [
+            Book.objects.create(
+                title=f"test{number}",
+                author=f"test{number}",
+                cover="Hard",
+                inventory=1,
+                daily_fee=10,
+            )
+            for number in range(5)
+        ]
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.return_date = date.today() + timedelta(days=7)
+
+    def checkout(self, books, **extra):
+        return self.client.post(
+            BORROWING_CHECKOUT_URL,
+            {
+                "items": [
+                    {
+                        "book": book.id,
+                        "expected_return_date": self.return_date,
+                    }
+                    for book in books
+                ],
+                **extra,
+            },
+            format="json",
+        )
+
+    def test_checkout_borrows_every_book(self):
+        # Book lookup, savepoint, ready hold DELETE, one UPDATE, one
+        # INSERT, hold DELETE, summary upsert, release.
+        with self.assertNumQueries(8):
+            response = self.checkout(self.books)
+
+        self.assertEqual(HTTP_201_CREATED, response.status_code)
+        self.assertEqual(
+            ["borrowed"] * 5,
+            [result["status"] for result in response.data["results"]],
+        )
+        self.assertEqual(
+            [book.id for book in self.books],
+            list(
+                Borrowing.objects.filter(user=self.user)
+                .order_by("id")
+                .values_list("book", flat=True)
+            ),
+        )
+        self.assertFalse(Book.objects.filter(inventory__gt=0).exists())
+
+    def test_checkout_queues_one_notification(self):
+        with mock.patch(
+            "borrowing.services.send_checkout_notification"
+        ) as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.checkout(self.books[:3])
+
+        task.delay.assert_called_once_with(
+            [
+                result["borrowing"]["id"]
+                for result in response.data["results"]
+            ]
+        )
+
+    def test_all_or_nothing_checkout_rolls_back(self):
+        self.books[2].inventory = 0
+        self.books[2].save()
+
+        response = self.checkout(self.books)
+
+        self.assertEqual(HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual({}, response.data["items"][0])
+        self.assertIn("non_field_errors", response.data["items"][2])
+        self.assertEqual(0, Borrowing.objects.count())
+        self.assertEqual(4, Book.objects.filter(inventory=1).count())
+
+    def test_partial_checkout_reports_each_item(self):
+        self.books[2].inventory = 0
+        self.books[2].save()
+        books = self.books[:3] + [self.books[0]]
+
+        response = self.checkout(books, all_or_nothing=False)
+
+        self.assertEqual(HTTP_201_CREATED, response.status_code)
+        self.assertEqual(
+            ["borrowed", "borrowed", "failed", "failed"],
+            [result["status"] for result in response.data["results"]],
+        )
+        self.assertEqual(
+            ["Duplicate book"], response.data["results"][3]["errors"]
+        )
+        self.assertEqual(2, Borrowing.objects.count())
+
+    def test_checkout_validates_items(self):
+        missing = Book(id=self.books[-1].id + 100)
+        self.return_date = date.today() - timedelta(days=1)
+
+        response = self.checkout([self.books[0], missing])
+
+        self.assertEqual(HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(
+            ["Invalid return date"],
+            response.data["items"][0]["non_field_errors"],
+        )
+        self.assertEqual(
+            ["Book does not exist", "Invalid return date"],
+            response.data["items"][1]["non_field_errors"],
+        )
+        self.assertEqual(0, Borrowing.objects.count())
+
+
+BORROWING_CHECK_IN_URL = reverse("borrowing:borrowings-check-in")
+
+
+class TestBorrowingCheckIn(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book1 = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=0,
+            daily_fee=2,
+        )
+        self.book2 = Book.objects.create(
+            title="test2",
+            author="test2",
+            cover="Hard",
+            inventory=0,
+            daily_fee=3,
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="testpassword"
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                book=book,
+                user=self.user,
+                expected_return_date=date.today() + timedelta(days=3),
+            )
+            for book in (self.book1, self.book1, self.book2)
+        ]
+        Borrowing.objects.filter(pk=self.borrowings[2].pk).update(
+            borrow_date=date.today() - timedelta(days=10),
+            expected_return_date=date.today() - timedelta(days=4),
+        )
+
+    def check_in(self, borrowing_ids):
+        return self.client.post(
+            BORROWING_CHECK_IN_URL,
+            {"borrowings": borrowing_ids},
+            format="json",
+        )
+
+    def test_check_in_returns_every_borrowing(self):
+        self.client.force_authenticate(self.admin)
+        borrowing_ids = [borrowing.id for borrowing in self.borrowings]
+
+        # Savepoint, locking SELECT, UPDATE of the borrowings, one book
+        # UPDATE, hold DELETE, INSERT, summary upsert, release.
+        with self.assertNumQueries(8):
+            response = self.check_in(borrowing_ids)
+
+        self.assertEqual(HTTP_200_OK, response.status_code)
+        self.assertEqual([], response.data["skipped"])
+        self.assertEqual(
+            [
+                ("payment", 2.0),
+                ("payment", 2.0),
+                ("fine", 3 * 10 + 3 * 4 * 2),
+            ],
+            [
+                (item["payment_type"], item["total_payment"])
+                for item in response.data["returned"]
+            ],
+        )
+        self.book1.refresh_from_db()
+        self.book2.refresh_from_db()
+        self.assertEqual(2, self.book1.inventory)
+        self.assertEqual(1, self.book2.inventory)
+        self.assertFalse(
+            Borrowing.objects.filter(actual_return_date__isnull=True).exists()
+        )
+        self.assertEqual(
+            3,
+            Payment.objects.filter(
+                status=Payment.PaymentStatus.PENDING
+            ).count(),
+        )
+
+    def test_check_in_opens_stripe_sessions_afterwards(self):
+        self.client.force_authenticate(self.admin)
+
+        with mock.patch(
+            "borrowing.views.create_payment_sessions"
+        ) as create_payment_sessions:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.check_in([self.borrowings[0].id])
+
+        payment = Payment.objects.get()
+        self.assertIsNone(payment.session_id)
+        self.assertEqual(
+            [payment.id],
+            create_payment_sessions.delay.call_args.args[0],
+        )
+        self.assertEqual(
+            payment.id, response.data["returned"][0]["payment"]
+        )
+
+    def test_check_in_skips_returned_and_unknown_borrowings(self):
+        self.client.force_authenticate(self.admin)
+        self.check_in([self.borrowings[0].id])
+
+        response = self.check_in([self.borrowings[0].id, 999999])
+
+        self.assertEqual(HTTP_200_OK, response.status_code)
+        self.assertEqual([], response.data["returned"])
+        self.assertEqual(
+            [self.borrowings[0].id, 999999], response.data["skipped"]
+        )
+        self.book1.refresh_from_db()
+        self.assertEqual(1, self.book1.inventory)
+        self.assertEqual(1, Payment.objects.count())
+
+    def test_check_in_is_admin_only(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.check_in([self.borrowings[0].id])
+
+        self.assertEqual(HTTP_403_FORBIDDEN, response.status_code)
+        self.assertIsNone(
+            Borrowing.objects.get(pk=self.borrowings[0].pk).actual_return_date
+        )
+
+
+class TestBorrowingIdempotency(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=5,
+            daily_fee=10,
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.data = {
+            "book": self.book.id,
+            "expected_return_date": date.today() + timedelta(days=3),
+        }
+
+    def post(self, url, data=None, key="retry-key"):
+        return self.client.post(
+            url, data, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retried_borrowing_is_created_once(self):
+        first = self.post(BORROWING_LIST_URL, self.data)
+        with self.assertNumQueries(0):
+            retry = self.post(BORROWING_LIST_URL, self.data)
+
+        self.assertEqual(HTTP_201_CREATED, retry.status_code)
+        self.assertEqual(first.data, retry.data)
+        self.assertEqual("true", retry["Idempotent-Replayed"])
+        self.assertEqual(1, Borrowing.objects.count())
+        self.book.refresh_from_db()
+        self.assertEqual(4, self.book.inventory)
+
+    def test_keys_are_independent(self):
+        self.post(BORROWING_LIST_URL, self.data, key="first")
+        response = self.post(BORROWING_LIST_URL, self.data, key="second")
+
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(2, Borrowing.objects.count())
+
+    def test_keys_are_scoped_to_the_user(self):
+        self.post(BORROWING_LIST_URL, self.data)
+        other = get_user_model().objects.create_user(
+            email="user2@test.com", password="testpassword"
+        )
+        self.client.force_authenticate(other)
+
+        response = self.post(BORROWING_LIST_URL, self.data)
+
+        self.assertEqual(HTTP_201_CREATED, response.status_code)
+        self.assertEqual(2, Borrowing.objects.count())
+
+    def test_key_reused_with_other_body_is_rejected(self):
+        self.post(BORROWING_LIST_URL, self.data)
+        self.data["expected_return_date"] += timedelta(days=1)
+
+        response = self.post(BORROWING_LIST_URL, self.data)
+
+        self.assertEqual(HTTP_422_UNPROCESSABLE_ENTITY, response.status_code)
+        self.assertEqual(1, Borrowing.objects.count())
+
+    def test_retried_return_creates_one_payment(self):
+        borrowing = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=self.data["expected_return_date"],
+        )
+        url = reverse("borrowing:borrowings-return", args=[borrowing.id])
+
+        def create_session(borrowing, request, date_now):
+            return Payment.objects.create(
+                borrowing=borrowing,
+                session_url="https://checkout.stripe.com/test",
+                session_id="cs_test",
+                money_to_pay=borrowing.get_total_payment(date_now),
+            )
+
+        with mock.patch(
+            "borrowing.views.create_stripe_session",
+            side_effect=create_session,
+        ) as create_stripe_session:
+            first = self.post(url)
+            retry = self.post(url)
+
+        create_stripe_session.assert_called_once()
+        self.assertEqual(first.data, retry.data)
+        self.assertEqual(1, Payment.objects.count())
+
+    @override_settings(IDEMPOTENCY_KEY_TTL=0)
+    def test_expired_key_runs_the_view_again(self):
+        self.post(BORROWING_LIST_URL, self.data)
+        self.post(BORROWING_LIST_URL, self.data)
+
+        self.assertEqual(2, Borrowing.objects.count())
+
+
+class TestBorrowingFilters(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book1 = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=10,
+            daily_fee=10,
+        )
+        self.book2 = Book.objects.create(
+            title="test2",
+            author="test2",
+            cover="Hard",
+            inventory=10,
+            daily_fee=10,
+        )
+        self.user1 = get_user_model().objects.create_user(
+            email="alice@test.com", password="testpassword"
+        )
+        self.user2 = get_user_model().objects.create_user(
+            email="bob@test.com", password="testpassword"
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="testpassword"
+        )
+        today = date.today()
+        self.overdue = Borrowing.objects.create(
+            book=self.book1,
+            user=self.user1,
+            expected_return_date=today - timedelta(days=2),
+        )
+        Borrowing.objects.filter(pk=self.overdue.pk).update(
+            borrow_date=today - timedelta(days=20)
+        )
+        self.active = Borrowing.objects.create(
+            book=self.book2,
+            user=self.user1,
+            expected_return_date=today + timedelta(days=5),
+        )
+        self.returned = Borrowing.objects.create(
+            book=self.book1,
+            user=self.user2,
+            expected_return_date=today - timedelta(days=1),
+            actual_return_date=today - timedelta(days=3),
+        )
+
+    def get_ids(self, **params):
+        response = self.client.get(BORROWING_LIST_URL, params)
+        self.assertEqual(HTTP_200_OK, response.status_code)
+        return [
+            borrowing["id"]
+            for borrowing in parse_response(response)["results"]
+        ]
+
+    def test_staff_filters(self):
+        self.client.force_authenticate(self.admin)
+        today = date.today()
+
+        self.assertEqual([self.overdue.id], self.get_ids(overdue="true"))
+        self.assertEqual(
+            [self.active.id, self.returned.id],
+            self.get_ids(overdue="false"),
+        )
+        self.assertEqual(
+            [self.overdue.id, self.returned.id],
+            self.get_ids(book=self.book1.id),
+        )
+        self.assertEqual(
+            [self.returned.id], self.get_ids(user_email="BOB@")
+        )
+        self.assertEqual(
+            [self.active.id, self.returned.id],
+            self.get_ids(borrow_date_after=today - timedelta(days=7)),
+        )
+        self.assertEqual(
+            [self.overdue.id, self.returned.id],
+            self.get_ids(expected_return_date_before=today),
+        )
+        self.assertEqual(
+            [self.active.id],
+            self.get_ids(
+                is_active="true", expected_return_date_after=today
+            ),
+        )
+
+    def test_user_filters_are_staff_only(self):
+        self.client.force_authenticate(self.user2)
+
+        self.assertEqual(
+            [self.returned.id], self.get_ids(user_email="alice")
+        )
+        self.assertEqual(
+            [self.returned.id], self.get_ids(user_id=self.user1.id)
+        )
+
+    def test_invalid_filter_value(self):
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.get(
+            BORROWING_LIST_URL, {"borrow_date_after": "yesterday"}
+        )
+
+        self.assertEqual(HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertIn("borrow_date", parse_response(response))
+
+    def test_admin_changelist_uses_filters(self):
+        self.client.force_login(self.admin)
+        url = reverse("admin:borrowing_borrowing_changelist")
+
+        response = self.client.get(url, {"overdue": "true"})
+
+        self.assertEqual(HTTP_200_OK, response.status_code)
+        self.assertEqual(
+            [self.overdue.id],
+            [borrowing.id for borrowing in response.context["cl"].result_list],
+        )
+
+    def test_admin_exports_selected_borrowings(self):
+        self.client.force_login(self.admin)
+        url = reverse("admin:borrowing_borrowing_changelist")
+
+        response = self.client.post(
+            url,
+            {
+                "action": "export_to_excel",
+                "_selected_action": [self.active.id, self.returned.id],
+            },
+        )
+
+        self.assertEqual(HTTP_200_OK, response.status_code)
+        rows = pd.read_excel(BytesIO(response.content))
+        self.assertEqual(
+            [self.active.id, self.returned.id], list(rows["borrow_id"])
+        )
+
+
+class TestAccrueFines(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=10,
+            daily_fee="1.50",
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        today = date.today()
+        self.overdue = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=today - timedelta(days=4),
+        )
+        self.due = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=today + timedelta(days=4),
+        )
+        self.returned = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=today - timedelta(days=4),
+            actual_return_date=today,
+            accrued_fine=12,
+        )
+
+    def test_overdue_fine_annotation_matches_model(self):
+        today = date.today()
+        borrowings = Borrowing.objects.with_overdue_fine(
+            today
+        ).select_related("book")
+
+        for borrowing in borrowings:
+            borrowing.actual_return_date = today
+            self.assertEqual(
+                borrowing.get_late_fee(today), borrowing.overdue_fine
+            )
+
+    def test_accrue_fines(self):
+        accrue_fines(batch_size=1)
+
+        fines = dict(Borrowing.objects.values_list("id", "accrued_fine"))
+        self.assertEqual(
+            {
+                self.overdue.id: Decimal("12.00"),
+                self.due.id: Decimal("0.00"),
+                self.returned.id: Decimal("0.00"),
+            },
+            fines,
+        )
+
+    def test_accrue_fines_only_writes_changes(self):
+        accrue_fines()
+
+        # Changed fines, users of the stale ones and their reset.
+        with self.assertNumQueries(3):
+            accrue_fines()
+
+    def test_accrued_fine_is_listed(self):
+        accrue_fines()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(BORROWING_LIST_URL, {"overdue": "true"})
+
+        self.assertEqual(
+            "12.00", parse_response(response)["results"][0]["accrued_fine"]
+        )
+
+
+BORROWING_QUOTE_URL = reverse("borrowing:borrowings-quote")
+BORROWING_LIABILITIES_URL = reverse("borrowing:borrowings-liabilities")
+
+
+class TestBorrowingFees(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword"
+        )
+        self.other = get_user_model().objects.create_user(
+            email="user2@test.com", password="testpassword"
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="testpassword"
+        )
+        today = date.today()
+        self.borrowings = []
+        for number, fee in enumerate(("0.99", "1.50", "7.25")):
+            book = Book.objects.create(
+                title=f"test{number}",
+                author=f"test{number}",
+                cover="Hard",
+                inventory=10,
+                daily_fee=fee,
+            )
+            for borrowed, due, returned in (
+                (0, 5, None),
+                (10, 4, None),
+                (10, -3, None),
+                (3, -1, 1),
+                (20, -10, 2),
+                (0, 0, 0),
+            ):
+                borrowing = Borrowing.objects.create(
+                    book=book,
+                    user=self.user if number < 2 else self.other,
+                    expected_return_date=today + timedelta(days=due),
+                )
+                Borrowing.objects.filter(pk=borrowing.pk).update(
+                    borrow_date=today - timedelta(days=borrowed),
+                    actual_return_date=(
+                        None if returned is None
+                        else today - timedelta(days=returned)
+                    ),
+                )
+                self.borrowings.append(borrowing)
+
+    def test_fee_annotations_match_model_methods(self):
+        today = date.today()
+        for date_now in (today, today + timedelta(days=2)):
+            borrowings = Borrowing.objects.with_fees(
+                date_now
+            ).select_related("book")
+            with self.assertNumQueries(1):
+                borrowings = list(borrowings)
+
+            self.assertEqual(len(self.borrowings), len(borrowings))
+            for borrowing in borrowings:
+                self.assertEqual(
+                    (
+                        borrowing.get_total_rental_fee(date_now),
+                        borrowing.get_late_fee(date_now),
+                        borrowing.get_total_payment(date_now),
+                        borrowing.get_payment_type(date_now),
+                    ),
+                    (
+                        borrowing.rental_fee,
+                        borrowing.late_fee,
+                        borrowing.total_payment,
+                        borrowing.payment_type,
+                    ),
+                )
+
+    def test_quote_open_borrowings_of_user(self):
+        self.client.force_authenticate(self.user)
+        today = date.today()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(BORROWING_QUOTE_URL)
+
+        self.assertEqual(HTTP_200_OK, response.status_code)
+        expected = [
+            borrowing
+            for borrowing in Borrowing.objects.select_related("book")
+            .filter(user=self.user, actual_return_date__isnull=True)
+            .order_by("id")
+        ]
+        self.assertEqual(
+            [
+                {
+                    "borrowing": borrowing.id,
+                    "payment_type": borrowing.get_payment_type(today),
+                    "rental_fee": str(borrowing.get_total_rental_fee(today)),
+                    "late_fee": str(
+                        Decimal(borrowing.get_late_fee(today)).quantize(
+                            Decimal("0.01")
+                        )
+                    ),
+                    "total_payment": str(borrowing.get_total_payment(today)),
+                }
+                for borrowing in expected
+            ],
+            response.data["results"],
+        )
+        self.assertEqual(
+            str(
+                sum(
+                    borrowing.get_total_payment(today)
+                    for borrowing in expected
+                )
+            ),
+            response.data["total_payment"],
+        )
+
+    def test_quote_selected_borrowings(self):
+        other_borrowing = self.borrowings[-6]
+        own_borrowing = self.borrowings[0]
+        ids = f"{own_borrowing.id},{other_borrowing.id}"
+
+        self.client.force_authenticate(self.user)
+        response = self.client.get(BORROWING_QUOTE_URL, {"borrowings": ids})
+        self.assertEqual(
+            [own_borrowing.id],
+            [quote["borrowing"] for quote in response.data["results"]],
+        )
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(BORROWING_QUOTE_URL, {"borrowings": ids})
+        self.assertEqual(
+            [own_borrowing.id, other_borrowing.id],
+            [quote["borrowing"] for quote in response.data["results"]],
+        )
+
+        response = self.client.get(BORROWING_QUOTE_URL, {"borrowings": "1,a"})
+        self.assertEqual(HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_liabilities(self):
+        today = date.today()
+        open_borrowings = list(
+            Borrowing.objects.select_related("book").filter(
+                actual_return_date__isnull=True
+            )
+        )
+        rental_fees = sum(
+            borrowing.get_total_rental_fee(today)
+            for borrowing in open_borrowings
+        )
+        fines = 0
+        for borrowing in open_borrowings:
+            borrowing.actual_return_date = today
+            fines += borrowing.get_late_fee(today)
+
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(1):
+            response = self.client.get(BORROWING_LIABILITIES_URL)
+
+        self.assertEqual(
+            {
+                "date": str(today),
+                "open_borrowings": len(open_borrowings),
+                "rental_fees": f"{rental_fees:.2f}",
+                "overdue_fines": f"{fines:.2f}",
+                "total": f"{rental_fees + fines:.2f}",
+            },
+            response.data,
+        )
+
+    def test_liabilities_are_admin_only(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(BORROWING_LIABILITIES_URL)
+
+        self.assertEqual(HTTP_403_FORBIDDEN, response.status_code)
+
+
+class TestBorrowingArchive(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=10,
+            daily_fee="1.50",
+        )
+        self.user = get_user_model().objects.create_user(
+            email="user1@test.com", password="testpassword", tg_chat=42
+        )
+        today = date.today()
+        self.old = [
+            Borrowing.objects.create(
+                book=self.book,
+                user=self.user,
+                expected_return_date=today - timedelta(days=400),
+                actual_return_date=today - timedelta(days=days),
+            )
+            for days in (400, 390)
+        ]
+        Borrowing.objects.filter(
+            pk__in=[borrowing.pk for borrowing in self.old]
+        ).update(borrow_date=today - timedelta(days=410))
+        self.recent = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=today - timedelta(days=2),
+            actual_return_date=today - timedelta(days=1),
+        )
+        self.active = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=today + timedelta(days=4),
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.old[0],
+            session_url="https://example.com",
+            session_id="session",
+            money_to_pay="15.00",
+        )
+        self.cutoff = today - timedelta(days=30)
+
+    def test_archive_cutoff(self):
+        self.assertEqual(
+            date(2025, 2, 28), archive_cutoff(1, today=date(2025, 3, 31))
+        )
+        self.assertEqual(
+            date(2024, 12, 15), archive_cutoff(3, today=date(2025, 3, 15))
+        )
+
+    def test_archive_moves_old_returned_borrowings(self):
+        archived = archive_borrowings(self.cutoff, batch_size=1)
+
+        self.assertEqual(2, archived)
+        self.assertEqual(
+            {self.recent.id, self.active.id},
+            set(Borrowing.objects.values_list("id", flat=True)),
+        )
+        archived_borrowing = ArchivedBorrowing.objects.get(pk=self.old[0].pk)
+        self.assertEqual(
+            self.old[0].actual_return_date,
+            archived_borrowing.actual_return_date,
+        )
+        self.assertEqual(self.user, archived_borrowing.user)
+
+    def test_archive_relinks_payments(self):
+        archive_borrowings(self.cutoff)
+
+        self.payment.refresh_from_db()
+        self.assertIsNone(self.payment.borrowing_id)
+        self.assertEqual(self.old[0].id, self.payment.archived_borrowing_id)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse("payment:payment-list"))
+        self.assertEqual(
+            [self.old[0].id],
+            [
+                item["archived_borrowing"]
+                for item in response.data["results"]
+            ],
+        )
+
+    def test_paying_archived_payment(self):
+        archive_borrowings(self.cutoff)
+        self.payment.refresh_from_db()
+
+        self.payment.status = Payment.PaymentStatus.PAID
+        self.payment.save()
+
+        self.payment.refresh_from_db()
+        self.assertEqual(Payment.PaymentStatus.PAID, self.payment.status)
+        self.assertEqual(self.old[0].id, self.payment.archived_borrowing_id)
+
+    def test_archive_twice_moves_nothing(self):
+        archive_borrowings(self.cutoff)
+
+        self.assertEqual(0, archive_borrowings(self.cutoff))
+
+    def test_export_reads_archive(self):
+        archive_borrowings(self.cutoff)
+
+        everything = pd.read_excel(export_borrows_to_excel())
+        active = pd.read_excel(export_borrows_to_excel({"is_active": True}))
+
+        self.assertEqual(
+            sorted(
+                borrowing.id
+                for borrowing in [*self.old, self.recent, self.active]
+            ),
+            list(everything["borrow_id"]),
+        )
+        self.assertEqual([self.active.id], list(active["borrow_id"]))
+
+    def test_bot_archive_reads_archive(self):
+        archive_borrowings(self.cutoff)
+
+        borrowings = async_to_sync(get_borrows_list)(self.user.tg_chat)
+
+        self.assertEqual(
+            [self.old[0].id, self.old[1].id, self.recent.id],
+            [borrowing.id for borrowing in borrowings],
+        )
+
+    def test_archive_command(self):
+        out = StringIO()
+        call_command("archive_borrowings", "--months", "1", stdout=out)
+
+        self.assertIn("2 borrowings returned before", out.getvalue())
+        self.assertEqual(2, ArchivedBorrowing.objects.count())
+
+
+BORROWING_HOLDS_URL = reverse("borrowing:borrowings-holds")
+
+
+class TestBorrowingHolds(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="test1",
+            author="test1",
+            cover="Hard",
+            inventory=0,
+            daily_fee=2,
+        )
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f"user{number}@test.com", password="testpassword"
+            )
+            for number in range(3)
+        ]
+        self.borrowings = [
+            Borrowing.objects.create(
+                book=self.book,
+                user=self.users[0],
+                expected_return_date=date.today() + timedelta(days=3),
+            )
+            for _ in range(2)
+        ]
+        self.holds = [
+            Hold.objects.create(book=self.book, user=user)
+            for user in self.users[1:]
+        ]
+
+    def place_hold(self, user, book):
+        self.client.force_authenticate(user)
+        return self.client.post(BORROWING_HOLDS_URL, {"book": book.id})
+
+    def check_in(self, borrowings):
+        with mock.patch("borrowing.holds.send_hold_notifications") as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                check_in_borrowings(
+                    [borrowing.id for borrowing in borrowings], date.today()
+                )
+        return task
+
+    def test_place_hold_joins_end_of_queue(self):
+        response = self.place_hold(self.users[0], self.book)
+
+        self.assertEqual(HTTP_201_CREATED, response.status_code)
+        self.assertEqual(3, response.data["position"])
+
+    def test_list_holds_with_position(self):
+        self.client.force_authenticate(self.users[2])
+
+        response = self.client.get(BORROWING_HOLDS_URL)
+
+        self.assertEqual(
+            [(self.holds[1].id, 2)],
+            [(hold["id"], hold["position"]) for hold in response.data],
+        )
+
+    def test_hold_on_available_book_is_rejected(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=1)
+
+        response = self.place_hold(self.users[0], self.book)
+
+        self.assertEqual(HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_second_hold_on_same_book_is_rejected(self):
+        response = self.place_hold(self.users[1], self.book)
+
+        self.assertEqual(HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(2, Hold.objects.count())
+
+    def test_cancel_hold(self):
+        url = reverse(
+            "borrowing:borrowings-hold-detail", args=[self.holds[0].id]
+        )
+        self.client.force_authenticate(self.users[2])
+        self.assertEqual(
+            HTTP_404_NOT_FOUND, self.client.delete(url).status_code
+        )
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.delete(url)
+
+        self.assertEqual(HTTP_204_NO_CONTENT, response.status_code)
+        self.assertFalse(Hold.objects.filter(pk=self.holds[0].id).exists())
+
+    def test_return_notifies_head_of_queue(self):
+        task = self.check_in(self.borrowings[:1])
+
+        task.delay.assert_called_once_with(
+            [(self.book.id, self.users[1].id)]
+        )
+        self.assertEqual(
+            [self.holds[0].id],
+            list(
+                Hold.objects.filter(ready_until__isnull=False).values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(0, self.book.inventory)
+
+    def test_return_of_two_copies_notifies_two_holds(self):
+        Book.objects.filter(pk=self.book.pk).update(total_copies=2)
+
+        task = self.check_in(self.borrowings)
+
+        task.delay.assert_called_once()
+        self.assertEqual(
+            [
+                (self.book.id, self.users[1].id),
+                (self.book.id, self.users[2].id),
+            ],
+            sorted(task.delay.call_args.args[0]),
+        )
+        self.assertFalse(Hold.objects.filter(ready_until=None).exists())
+        self.assertEqual([], list(find_inventory_drift()))
+
+    def test_paid_return_notifies_head_of_queue(self):
+        payment = Payment.objects.create(
+            borrowing=self.borrowings[0],
+            session_url="https://example.com",
+            session_id="session",
+            money_to_pay="2.00",
+        )
+
+        with mock.patch("borrowing.holds.send_hold_notifications") as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                payment.status = Payment.PaymentStatus.PAID
+                payment.save()
+
+        task.delay.assert_called_once_with(
+            [(self.book.id, self.users[1].id)]
+        )
+
+    def test_borrowing_serves_own_hold(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=1)
+        self.book.refresh_from_db()
+
+        create_borrowing(
+            self.users[1], self.book, date.today() + timedelta(days=3)
+        )
+
+        self.assertEqual(
+            [self.holds[1].id], list(Hold.objects.values_list("id", flat=True))
+        )
+
+    def test_copy_set_aside_for_head_of_queue(self):
+        self.check_in(self.borrowings[:1])
+        expected_return_date = date.today() + timedelta(days=3)
+
+        with self.assertRaises(BookNotAvailable):
+            create_borrowing(self.users[0], self.book, expected_return_date)
+        with self.assertRaises(BookNotAvailable):
+            create_borrowing(self.users[2], self.book, expected_return_date)
+
+        create_borrowing(self.users[1], self.book, expected_return_date)
+
+        self.book.refresh_from_db()
+        self.assertEqual(0, self.book.inventory)
+        self.assertEqual(
+            [self.holds[1].id], list(Hold.objects.values_list("id", flat=True))
+        )
+
+    def test_checkout_takes_copy_set_aside(self):
+        self.check_in(self.borrowings[:1])
+        self.client.force_authenticate(self.users[1])
+
+        response = self.client.post(
+            reverse("borrowing:borrowings-checkout"),
+            {
+                "items": [
+                    {
+                        "book": self.book.id,
+                        "expected_return_date": date.today()
+                        + timedelta(days=3),
+                    }
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(HTTP_201_CREATED, response.status_code)
+        self.assertFalse(Hold.objects.filter(user=self.users[1]).exists())
+        self.book.refresh_from_db()
+        self.assertEqual(0, self.book.inventory)
+
+    def test_expired_hold_passes_copy_on(self):
+        self.check_in(self.borrowings[:1])
+        Hold.objects.filter(pk=self.holds[0].pk).update(
+            ready_until=timezone.now() - timedelta(minutes=1)
+        )
+
+        with mock.patch("borrowing.holds.send_hold_notifications") as task:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(1, expire_holds())
+
+        task.delay.assert_called_once_with(
+            [(self.book.id, self.users[2].id)]
+        )
+        self.assertEqual(
+            [self.holds[1].id],
+            list(
+                Hold.objects.filter(ready_until__isnull=False).values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(0, self.book.inventory)
+
+    def test_cancelled_ready_hold_goes_back_on_shelf(self):
+        Hold.objects.filter(pk=self.holds[1].pk).delete()
+        self.check_in(self.borrowings[:1])
+        self.client.force_authenticate(self.users[1])
+
+        response = self.client.delete(
+            reverse(
+                "borrowing:borrowings-hold-detail", args=[self.holds[0].id]
+            )
+        )
+
+        self.assertEqual(HTTP_204_NO_CONTENT, response.status_code)
+        self.book.refresh_from_db()
+        self.assertEqual(1, self.book.inventory)
+
+    def test_hold_notification_email(self):
+        send_hold_notifications([(self.book.id, self.users[1].id)])
+
+        self.assertEqual(1, len(mail.outbox))
+        self.assertEqual([self.users[1].email], mail.outbox[0].to)
+        self.assertIn("test1", mail.outbox[0].body)
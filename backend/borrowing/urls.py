@@ -2,12 +2,32 @@ from django.urls import path
 
 from borrowing.views import (
     borrowing_list,
+    borrowing_checkout,
+    borrowing_check_in,
+    borrowing_quote,
+    borrowing_liabilities,
+    borrowing_holds,
+    borrowing_hold_detail,
     borrowing_detail,
     borrowing_return,
 )
 
 urlpatterns = [
     path("", borrowing_list, name="borrowings-list"),
+    path("checkout/", borrowing_checkout, name="borrowings-checkout"),
+    path("check-in/", borrowing_check_in, name="borrowings-check-in"),
+    path("quote/", borrowing_quote, name="borrowings-quote"),
+    path(
+        "liabilities/",
+        borrowing_liabilities,
+        name="borrowings-liabilities",
+    ),
+    path("holds/", borrowing_holds, name="borrowings-holds"),
+    path(
+        "holds/<int:pk>/",
+        borrowing_hold_detail,
+        name="borrowings-hold-detail",
+    ),
     path("<int:pk>/", borrowing_detail, name="borrowings-detail"),
     path("<int:pk>/return/", borrowing_return, name="borrowings-return"),
 ]
@@ -1,89 +1,395 @@
 from datetime import datetime
+from decimal import Decimal
 from io import BytesIO
 
 import pandas as pd
 
-from django.db.models import QuerySet
+from django.db import transaction
+from django.db.models import Count, Sum
 from django.shortcuts import get_object_or_404
+from django_filters.utils import translate_validation
 from django.db.models import F
 
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import (
+    api_view,
+    permission_classes,
+    renderer_classes,
+)
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT,
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND, HTTP_403_FORBIDDEN
 )
 
-from book.models import Book
-from borrowing.models import Borrowing
+from book.cache import get_catalog_generation
+from borrowing.cache import get_borrowings_version
+from borrowing.filters import BorrowingFilter
+from borrowing.holds import pass_on_copies, with_queue_position
+from borrowing.models import (
+    PAYMENT_MESSAGES,
+    ArchivedBorrowing,
+    Borrowing,
+    Hold,
+)
 from borrowing.serializers import (
     BorrowingSerializer,
+    BorrowingCheckInSerializer,
+    BorrowingCheckoutSerializer,
+    BorrowingLiabilitiesSerializer,
     BorrowingListSerializer,
+    BorrowingQuoteSerializer,
     BorrowingRetrieveSerializer,
+    HoldSerializer,
+)
+from borrowing.services import (
+    BookNotAvailable,
+    check_in_borrowings,
+    checkout_books,
+)
+from library_service.caching import conditional_response
+from library_service.idempotency import idempotent
+from library_service.pagination import KeysetPagination
+from library_service.serializers import (
+    ValuesPlan,
+    get_dynamic_fields_kwargs,
+)
+from library_service.streaming import (
+    STREAMING_RENDERER_CLASSES,
+    is_stream_request,
+    stream_list_response,
 )
-from payment.utils import create_stripe_session
+from payment.tasks import create_payment_sessions
+from payment.utils import create_stripe_session, get_checkout_urls
 from schemas.borrowing_schema_decorator import (
     borrowing_list_get_schema,
     borrowing_list_post_schema,
+    borrowing_checkout_schema,
+    borrowing_check_in_schema,
+    borrowing_quote_schema,
+    borrowing_liabilities_schema,
+    borrowing_holds_get_schema,
+    borrowing_holds_post_schema,
+    borrowing_hold_delete_schema,
     borrowing_detail_get_schema,
     borrowing_detail_return_post_schema,
 )
 
 
-def _filtering_borrowing_list(borrowings: QuerySet, is_active: str) -> QuerySet:
-    if is_active == "true":
-        borrowings = borrowings.filter(actual_return_date__isnull=True)
-    if is_active == "false":
-        borrowings = borrowings.filter(actual_return_date__isnull=False)
-
-    return borrowings
-
-
 @borrowing_list_get_schema()
 @borrowing_list_post_schema()
 @api_view(["GET", "POST"])
 @permission_classes([IsAuthenticated, ])
+@renderer_classes(STREAMING_RENDERER_CLASSES)
+@idempotent
 def borrowing_list(request):
     if request.method == "GET":
-        borrowing = Borrowing.objects.all()
-        user_id = request.GET.get("user_id")
-        is_active = request.GET.get("is_active")
-        if request.user.is_staff:
-            if user_id:
-                borrowing = borrowing.filter(user__id=user_id)
-            if is_active:
-                borrowing = _filtering_borrowing_list(borrowing, is_active)
-
-        else:
+        borrowing = Borrowing.objects.order_by("id")
+        filters = request.query_params
+        if not request.user.is_staff:
             borrowing = borrowing.filter(user__id=request.user.id)
-            if is_active:
-                borrowing = _filtering_borrowing_list(borrowing, is_active)
+            filters = filters.copy()
+            for name in BorrowingFilter.staff_filters:
+                filters.pop(name, None)
 
-        serializer = BorrowingListSerializer(borrowing, many=True)
-        return Response(serializer.data, status=HTTP_200_OK)
+        filterset = BorrowingFilter(filters, queryset=borrowing)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        borrowing = filterset.qs
+
+        version = get_borrowings_version(
+            None if request.user.is_staff else request.user.id
+        )
+        serializer_kwargs = get_dynamic_fields_kwargs(request)
+        borrowing = BorrowingListSerializer(
+            **serializer_kwargs
+        ).optimize_queryset(borrowing)
+        etag_parts = [version, request.user.id, request.user.is_staff]
+        # Expanded books go stale with the catalog, not the borrowings
+        if any(
+            name.split(".")[0] == "book"
+            for name in serializer_kwargs.get("expand") or ()
+        ):
+            etag_parts.append(get_catalog_generation())
+
+        def get_response():
+            if is_stream_request(request):
+                return stream_list_response(
+                    request,
+                    borrowing,
+                    BorrowingListSerializer(**serializer_kwargs),
+                )
+
+            paginator = KeysetPagination()
+            plan = ValuesPlan.compile(
+                BorrowingListSerializer(**serializer_kwargs)
+            )
+            if plan is not None:
+                rows = plan.values(borrowing)
+                page = paginator.paginate_queryset(rows, request)
+                if page is not None:
+                    return paginator.get_paginated_response(plan.render(page))
+                return Response(plan.render(rows), status=HTTP_200_OK)
+
+            page = paginator.paginate_queryset(borrowing, request)
+            if page is not None:
+                serializer = BorrowingListSerializer(
+                    page, many=True, **serializer_kwargs
+                )
+                return paginator.get_paginated_response(serializer.data)
+
+            serializer = BorrowingListSerializer(
+                borrowing, many=True, **serializer_kwargs
+            )
+            return Response(serializer.data, status=HTTP_200_OK)
+
+        return conditional_response(request, etag_parts, get_response)
 
     if request.method == "POST":
         serializer = BorrowingSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save(user=request.user)
 
-        book = Book.objects.get(id=serializer.data.get("book"))
-        book.inventory -= 1
-        book.save()
-
         return Response(serializer.data, status=HTTP_201_CREATED)
 
 
+@borrowing_checkout_schema()
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, ])
+@idempotent
+def borrowing_checkout(request):
+    serializer = BorrowingCheckoutSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    items = serializer.validated_data["items"]
+    item_errors = serializer.validated_data["item_errors"]
+
+    valid_items = [
+        item for item, errors in zip(items, item_errors) if not errors
+    ]
+    try:
+        borrowings = checkout_books(
+            request.user,
+            valid_items,
+            partial=not serializer.validated_data["all_or_nothing"],
+        )
+    except BookNotAvailable as error:
+        return Response(
+            {
+                "items": [
+                    {
+                        api_settings.NON_FIELD_ERRORS_KEY: [
+                            "This book is not available"
+                        ]
+                    }
+                    if item["book"] in error.args else {}
+                    for item in items
+                ]
+            },
+            status=HTTP_400_BAD_REQUEST,
+        )
+
+    borrowed = {borrowing.book_id: borrowing for borrowing in borrowings}
+    results = []
+    for item, errors in zip(items, item_errors):
+        if not errors and item["book"] not in borrowed:
+            errors = ["This book is not available"]
+        if errors:
+            results.append(
+                {"book": item["book"], "status": "failed", "errors": errors}
+            )
+        else:
+            results.append(
+                {
+                    "book": item["book"],
+                    "status": "borrowed",
+                    "borrowing": BorrowingSerializer(
+                        borrowed[item["book"]]
+                    ).data,
+                }
+            )
+
+    return Response(
+        {"results": results},
+        status=HTTP_201_CREATED if borrowings else HTTP_400_BAD_REQUEST,
+    )
+
+
+@borrowing_check_in_schema()
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def borrowing_check_in(request):
+    serializer = BorrowingCheckInSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    borrowing_ids = serializer.validated_data["borrowings"]
+
+    payments = check_in_borrowings(borrowing_ids, datetime.now().date())
+    if payments:
+        payment_ids = [payment.id for payment in payments]
+        success_url, cancel_url = get_checkout_urls(request)
+        transaction.on_commit(
+            lambda: create_payment_sessions.delay(
+                payment_ids, success_url, cancel_url
+            )
+        )
+
+    returned = {payment.borrowing_id for payment in payments}
+    return Response(
+        {
+            "returned": [
+                {
+                    "borrowing": payment.borrowing_id,
+                    "payment": payment.id,
+                    "payment_type": payment.type,
+                    "total_payment": float(payment.money_to_pay),
+                }
+                for payment in payments
+            ],
+            "skipped": [
+                borrowing_id
+                for borrowing_id in dict.fromkeys(borrowing_ids)
+                if borrowing_id not in returned
+            ],
+        },
+        status=HTTP_200_OK,
+    )
+
+
+QUOTE_MAX_BORROWINGS = 500
+
+
+@borrowing_quote_schema()
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, ])
+def borrowing_quote(request):
+    today = datetime.now().date()
+    borrowings = Borrowing.objects.filter(actual_return_date__isnull=True)
+
+    ids = request.query_params.get("borrowings")
+    if ids:
+        try:
+            ids = [int(pk) for pk in ids.split(",") if pk.strip()]
+        except ValueError:
+            raise ValidationError(
+                {"borrowings": ["A comma separated list of ids is expected"]}
+            )
+        if len(ids) > QUOTE_MAX_BORROWINGS:
+            raise ValidationError(
+                {
+                    "borrowings": [
+                        f"At most {QUOTE_MAX_BORROWINGS} borrowings can "
+                        "be quoted at once"
+                    ]
+                }
+            )
+        borrowings = borrowings.filter(pk__in=ids)
+    if not ids or not request.user.is_staff:
+        borrowings = borrowings.filter(user_id=request.user.id)
+
+    quotes = BorrowingQuoteSerializer(
+        borrowings.with_fees(today)
+        .order_by("id")
+        .values(*BorrowingQuoteSerializer.row_fields),
+        many=True,
+    ).data
+    return Response(
+        {
+            "date": today,
+            "results": quotes,
+            "total_payment": str(
+                sum(
+                    (Decimal(quote["total_payment"]) for quote in quotes),
+                    Decimal("0.00"),
+                )
+            ),
+        },
+        status=HTTP_200_OK,
+    )
+
+
+@borrowing_liabilities_schema()
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def borrowing_liabilities(request):
+    today = datetime.now().date()
+    liabilities = (
+        Borrowing.objects.filter(actual_return_date__isnull=True)
+        .with_fees(today)
+        .with_overdue_fine(today)
+        .aggregate(
+            open_borrowings=Count("id"),
+            rental_fees=Sum("rental_fee", default=Decimal("0.00")),
+            overdue_fines=Sum("overdue_fine", default=Decimal("0.00")),
+        )
+    )
+    liabilities["total"] = (
+        liabilities["rental_fees"] + liabilities["overdue_fines"]
+    )
+    serializer = BorrowingLiabilitiesSerializer(
+        {"date": today, **liabilities}
+    )
+    return Response(serializer.data, status=HTTP_200_OK)
+
+
+@borrowing_holds_get_schema()
+@borrowing_holds_post_schema()
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+@idempotent
+def borrowing_holds(request):
+    if request.method == "GET":
+        holds = with_queue_position(
+            Hold.objects.filter(user=request.user)
+        ).order_by("created_at", "id")
+        return Response(HoldSerializer(holds, many=True).data)
+
+    serializer = HoldSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    hold = serializer.save(user=request.user)
+    hold = with_queue_position(Hold.objects.filter(pk=hold.pk)).get()
+    return Response(HoldSerializer(hold).data, status=HTTP_201_CREATED)
+
+
+@borrowing_hold_delete_schema()
+@api_view(["DELETE"])
+@permission_classes([IsAuthenticated])
+def borrowing_hold_detail(request, pk):
+    hold = get_object_or_404(Hold, pk=pk, user=request.user)
+    with transaction.atomic():
+        hold.delete()
+        if hold.ready_until is not None:
+            pass_on_copies([hold.book_id])
+    return Response(status=HTTP_204_NO_CONTENT)
+
+
 @borrowing_detail_get_schema()
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, ])
 def borrowing_detail(request, pk):
-    borrowing = Borrowing.objects.get(pk=pk)
-    if request.user == borrowing.user or request.user.is_staff:
-        serializer = BorrowingRetrieveSerializer(borrowing)
-        return Response(serializer.data, status=HTTP_200_OK)
+    serializer_kwargs = get_dynamic_fields_kwargs(request)
+    borrowing = (
+        BorrowingRetrieveSerializer(**serializer_kwargs)
+        .optimize_queryset(Borrowing.objects.all(), extra_fields=["user"])
+        .get(pk=pk)
+    )
+    if request.user.id == borrowing.user_id or request.user.is_staff:
+        version = get_borrowings_version(borrowing.user_id)
+
+        def get_response():
+            serializer = BorrowingRetrieveSerializer(
+                borrowing, **serializer_kwargs
+            )
+            return Response(serializer.data, status=HTTP_200_OK)
+
+        return conditional_response(
+            request,
+            [version, get_catalog_generation(), request.user.id],
+            get_response,
+        )
     return Response(
         {"message": "You can`t see this information"},
         status=HTTP_403_FORBIDDEN
@@ -93,10 +399,13 @@ def borrowing_detail(request, pk):
 @borrowing_detail_return_post_schema()
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent
 def borrowing_return(request, pk):
-    borrowing = get_object_or_404(Borrowing, pk=pk)
+    borrowing = get_object_or_404(
+        Borrowing.objects.select_related("book"), pk=pk
+    )
 
-    if request.user != borrowing.user:
+    if request.user.id != borrowing.user_id:
         return Response(
             {"error": "You can`t do this"},
             HTTP_403_FORBIDDEN
@@ -105,10 +414,9 @@ def borrowing_return(request, pk):
     if borrowing.actual_return_date is None:
 
         payment = create_stripe_session(borrowing, request, datetime.now().date())
-        message = borrowing.get_payment_message(datetime.now().date())
 
         return Response({
-            "message": message,
+            "message": PAYMENT_MESSAGES[payment.type],
             "payment_url": payment.session_url,
             "payment_type": payment.type,
             "total_payment": float(payment.money_to_pay)
@@ -121,20 +429,44 @@ def borrowing_return(request, pk):
         )
 
 
-def export_borrows_to_excel():
-    borrowings = (
-        Borrowing.objects.select_related("book", "user")
-        .values(
-            "borrow_date",
-            "expected_return_date",
-            "actual_return_date",
-        )
-        .annotate(
-            borrow_id=F("id"),
-            title=F("book__title"),
-            first_name=F("user__first_name"),
-        )
+def _export_rows(filters, queryset):
+    filterset = BorrowingFilter(filters, queryset=queryset)
+    rows = filterset.qs.values(
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+    ).annotate(
+        borrow_id=F("id"),
+        title=F("book__title"),
+        first_name=F("user__first_name"),
     )
+    return filterset, rows
+
+
+def export_borrows_to_excel(filters=None, borrowings=None):
+    """
+    Write borrowings to an Excel file.
+
+    ``filters`` are ``BorrowingFilter`` parameters applied to
+    ``borrowings`` (all borrowings by default), so only the rows asked
+    for are read. By default archived borrowings are included as well,
+    unless only active borrowings are asked for.
+    """
+    archived = None
+    if borrowings is None:
+        borrowings = Borrowing.objects.all()
+        archived = ArchivedBorrowing.objects.all()
+    filterset, borrowings = _export_rows(filters, borrowings)
+
+    active_only = (
+        filterset.is_bound
+        and filterset.form.cleaned_data.get("is_active") is True
+    )
+    if archived is not None and not active_only:
+        borrowings = borrowings.union(
+            _export_rows(filters, archived)[1], all=True
+        )
+    borrowings = borrowings.order_by("borrow_id")
 
     df = pd.DataFrame(list(borrowings))
 
@@ -1,3 +1,4 @@
+from datetime import date
 from uuid import uuid4
 
 from asgiref.sync import sync_to_async
@@ -10,6 +11,7 @@ from telegram import (
 )
 from telegram.ext import ContextTypes
 
+from book.autocomplete import book_autocomplete
 from book.models import Book
 
 (
@@ -21,6 +23,17 @@ from book.models import Book
     FAQ,
     RANDOM_BOOK) = range(7)
 
+INLINE_SEARCH_LIMIT = 20
+
+
+def get_availability(book):
+    if book.inventory > 0:
+        return "Available now"
+    if book.next_available_date is None:
+        return "Not available"
+    # An overdue copy is expected back any day now
+    return f"Expected back: {max(book.next_available_date, date.today())}"
+
 
 async def show_book_search_hint(
     update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -40,8 +53,13 @@ async def show_book_search_hint(
     return START_ROUTES
 
 
-async def get_books():
-    return await sync_to_async(lambda: list(Book.objects.all()))()
+async def get_books(query):
+    def search():
+        book_ids = book_autocomplete.book_ids(query, INLINE_SEARCH_LIMIT)
+        books = Book.objects.in_bulk(book_ids)
+        return [books[book_id] for book_id in book_ids if book_id in books]
+
+    return await sync_to_async(search)()
 
 
 async def inline_book_search(
@@ -55,10 +73,7 @@ async def inline_book_search(
         if not query:
             return
 
-        book_list = await get_books()
-        filtered_books = [
-            book for book in book_list if query.lower() in book.title.lower()
-        ]
+        filtered_books = await get_books(query)
         print(f"Filtered books: {filtered_books}")
 
         if not filtered_books:
@@ -82,6 +97,7 @@ async def inline_book_search(
                     input_message_content=InputTextMessageContent(
                         f"Book: {book.title}\n"
                         f"Author: {book.author}\n"
+                        f"{get_availability(book)}\n"
                         "Description: Lorem ipsum dolor sit amet, consectetuer"
                     ),
                 )
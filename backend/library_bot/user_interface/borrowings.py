@@ -5,7 +5,7 @@ from asgiref.sync import sync_to_async
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CallbackContext
 
-from borrowing.models import Borrowing
+from borrowing.models import ArchivedBorrowing, Borrowing
 from library_bot.user_interface.buttons import send_back_button
 
 (
@@ -48,7 +48,9 @@ async def my_borrowings(update: Update, context: CallbackContext) -> None:
 async def get_overdue_borrow(user_id):
     return await sync_to_async(
         lambda: Borrowing.objects.filter(
-            expected_return_date__lte=datetime.now(), user__tg_chat=user_id
+            actual_return_date__isnull=True,
+            expected_return_date__lte=datetime.now(),
+            user__tg_chat=user_id,
         )
         .select_related("book")
         .first()
@@ -78,13 +80,20 @@ async def active_borrow(update: Update, context: CallbackContext) -> None:
 
 
 async def get_borrows_list(user_id):
-    return await sync_to_async(
-        lambda: list(
-            Borrowing.objects.filter(
-                expected_return_date__lt=datetime.now(), user__tg_chat=user_id
-            ).select_related("book")
-        )
-    )()
+    def get_list():
+        borrowings = []
+        for model in (ArchivedBorrowing, Borrowing):
+            borrowings.extend(
+                model.objects.filter(
+                    expected_return_date__lt=datetime.now(),
+                    user__tg_chat=user_id,
+                )
+                .select_related("book")
+                .order_by("borrow_date", "id")
+            )
+        return borrowings
+
+    return await sync_to_async(get_list)()
 
 
 async def get_borrowing_archive(
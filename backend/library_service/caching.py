@@ -0,0 +1,73 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def increment(key, delta=1):
+    """Atomically increment a counter in the cache, creating it if needed."""
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key, delta)
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(key):
+    """
+    Invalidate everything derived from a version counter.
+
+    The version is bumped right away and once more after the current
+    transaction commits, so data cached or tagged by a read that raced
+    the uncommitted write does not outlive it.
+    """
+    increment(key)
+    transaction.on_commit(lambda: increment(key))
+
+
+def request_fingerprint(request, *parts):
+    """
+    Hash a request into a short stable string.
+
+    The query string is normalized (parameters and their values sorted),
+    and the host is included because some payloads carry absolute URLs.
+    """
+    query = sorted(
+        (name, sorted(values))
+        for name, values in request.query_params.lists()
+    )
+    url = request.build_absolute_uri(request.path)
+    return hashlib.sha256(repr((url, query, parts)).encode()).hexdigest()
+
+
+def conditional_response(request, etag_parts, get_response):
+    """
+    Answer a GET with ``304 Not Modified`` when the client copy is current.
+
+    ``etag_parts`` must change whenever the response would, typically a
+    version counter plus whatever else the response depends on. The
+    response is only built by ``get_response`` if the client has no
+    valid copy, and is tagged with a strong ETag either way.
+    """
+    etag = quote_etag(
+        request_fingerprint(
+            request, request.accepted_media_type, *etag_parts
+        )[:32]
+    )
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = get_response()
+    if response.status_code in (200, 304):
+        response["ETag"] = etag
+    return response
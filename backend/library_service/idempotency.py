@@ -0,0 +1,110 @@
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from rest_framework.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_409_CONFLICT,
+    HTTP_422_UNPROCESSABLE_ENTITY,
+)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def _request_fingerprint(request):
+    content = b"%s\n%s" % (
+        request.content_type.encode(), request.body
+    )
+    return hashlib.sha256(content).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            {
+                "error": f"This {IDEMPOTENCY_HEADER} was already used "
+                "with a different request"
+            },
+            status=HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    response = Response(stored["data"], status=stored["status"])
+    response[REPLAYED_HEADER] = "true"
+    return response
+
+
+def idempotent(view):
+    """
+    Honour the ``Idempotency-Key`` header on the ``POST`` of an API view.
+
+    The first response to a key is stored in the cache for
+    ``IDEMPOTENCY_KEY_TTL`` seconds and replayed to retries of the same
+    request without running the view again, so a client retrying on a
+    timeout neither borrows twice nor opens a second Stripe session.
+    Keys are scoped to the user and the path. Reusing a key with another
+    body is rejected, and so is a retry sent while the first request is
+    still running. Server errors are not stored, the request can be
+    retried.
+
+    Apply it below ``@api_view`` so the request is already authenticated.
+    """
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if request.method != "POST" or key is None:
+            return view(request, *args, **kwargs)
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return Response(
+                {
+                    "error": f"{IDEMPOTENCY_HEADER} must be 1 to "
+                    f"{IDEMPOTENCY_KEY_MAX_LENGTH} characters long"
+                },
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        scope = hashlib.sha256(
+            repr((request.user.pk, request.path, key)).encode()
+        ).hexdigest()
+        cache_key = f"idempotency:{scope}"
+        lock_key = f"{cache_key}:lock"
+        fingerprint = _request_fingerprint(request)
+
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return _replay(stored, fingerprint)
+
+        if not cache.add(
+            lock_key, fingerprint, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT
+        ):
+            return Response(
+                {
+                    "error": f"A request with this {IDEMPOTENCY_HEADER} "
+                    "is still in progress"
+                },
+                status=HTTP_409_CONFLICT,
+            )
+        try:
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code < 500:
+                cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": response.data,
+                    },
+                    timeout=settings.IDEMPOTENCY_KEY_TTL,
+                )
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
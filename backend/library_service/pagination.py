@@ -0,0 +1,214 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Keyset (cursor) pagination on ``(ordering fields, id)``.
+
+    Lists are paged this way by default, 20 rows per page and at most
+    100. Requests passing ``limit`` or ``offset`` get the limit/offset
+    behaviour instead, with the same default and cap. A page is fetched
+    with a ``WHERE (ordering fields, id) > (last row values)`` condition
+    and one extra row to detect the next page, so deep pages cost the
+    same as the first one and no ``COUNT(*)`` is ever run.
+
+    The ordering is taken from the queryset, so it follows the
+    ``ordering`` parameter. Ordering fields must not be nullable and their
+    values must round-trip exactly through JSON (cast ``real``
+    annotations to double precision).
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = "The pagination cursor value."
+    page_size_query_param = "page_size"
+    page_size_query_description = "Number of results to return per page."
+    page_size = 20
+    max_page_size = 100
+    max_limit = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def is_keyset_request(self, request):
+        return not (
+            self.limit_query_param in request.query_params
+            or self.offset_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(
+                request.query_params[self.page_size_query_param]
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    @staticmethod
+    def get_keyset_ordering(queryset):
+        ordering = list(queryset.query.order_by) or ["pk"]
+        for field in ordering:
+            if not isinstance(field, str):
+                raise ImproperlyConfigured(
+                    "KeysetPagination only supports ordering by field names."
+                )
+        if not {"pk", "-pk", "id", "-id"} & set(ordering):
+            ordering.append("pk")
+        return ordering
+
+    @staticmethod
+    def get_row_value(row, field):
+        if isinstance(row, dict):
+            return row[field.lstrip("-")]
+        value = row
+        for attr in field.lstrip("-").split("__"):
+            value = getattr(value, attr)
+        return value
+
+    def encode_cursor(self, ordering, values):
+        payload = json.dumps(
+            {"ordering": ordering, "values": values}, cls=DjangoJSONEncoder
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def get_ordering_field(queryset, name):
+        """Return the model field or annotation output field of ``name``."""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        model = queryset.model
+        *path, name = name.split("__")
+        for part in path:
+            model = model._meta.get_field(part).related_model
+        return model._meta.pk if name == "pk" else model._meta.get_field(name)
+
+    def decode_cursor(self, request, ordering, queryset):
+        """
+        Return the ordering values of the ``cursor`` parameter.
+
+        Each value is converted by the field it orders on, so a tampered
+        cursor is rejected with a 404 instead of reaching the database.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = payload["values"]
+            if payload["ordering"] != ordering:
+                raise ValueError
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError
+            decoded = []
+            for field, value in zip(ordering, values):
+                if value is None or isinstance(value, (list, dict)):
+                    raise ValueError
+                field = self.get_ordering_field(queryset, field.lstrip("-"))
+                decoded.append(field.to_python(value))
+        except (
+            TypeError, KeyError, ValueError, ValidationError, binascii.Error
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return decoded
+
+    @staticmethod
+    def get_keyset_condition(ordering, values):
+        """Build ``(f1, f2, ...) > (v1, v2, ...)`` honouring directions."""
+        condition = Q()
+        for position, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            clause = Q(**{f"{name}__{lookup}": values[position]})
+            for previous, value in zip(ordering[:position], values):
+                clause &= Q(**{previous.lstrip("-"): value})
+            condition |= clause
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.is_keyset_request(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_keyset_ordering(queryset)
+        values = self.decode_cursor(request, ordering, queryset)
+
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(
+                self.get_keyset_condition(ordering, values)
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        page = rows[:self.page_size]
+        self.next_cursor = None
+        if len(rows) > self.page_size:
+            self.next_cursor = self.encode_cursor(
+                ordering,
+                [self.get_row_value(page[-1], field) for field in ordering],
+            )
+        return page
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(
+            url, self.page_size_query_param, self.page_size
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "oneOf": [
+                super().get_paginated_response_schema(schema),
+                {
+                    "type": "object",
+                    "required": ["results"],
+                    "properties": {
+                        "next": {
+                            "type": "string",
+                            "nullable": True,
+                            "format": "uri",
+                        },
+                        "results": schema,
+                    },
+                },
+            ]
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.page_size_query_description,
+                "schema": {"type": "integer"},
+            },
+        ]
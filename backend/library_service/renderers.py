@@ -0,0 +1,111 @@
+import json
+import uuid
+from collections.abc import Sequence
+from functools import cached_property
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def dumps_json(item):
+    """Encode like ``JSONRenderer`` with the default settings."""
+    return json.dumps(
+        item,
+        cls=JSONEncoder,
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(",", ":") if api_settings.COMPACT_JSON else None,
+    ).encode()
+
+
+class JSONFragments(Sequence):
+    """
+    A sequence of already encoded JSON objects.
+
+    ``FragmentJSONRenderer`` writes the fragments as they are, so the
+    usual JSON response never decodes them. Everything else (tests, the
+    browsable API, ``Response.data`` readers) sees the list of decoded
+    objects, parsed on first access. Only the bytes are pickled, which
+    keeps response cache entries small.
+    """
+
+    def __init__(self, fragments):
+        self.fragments = list(fragments)
+
+    @cached_property
+    def items(self):
+        return [json.loads(fragment) for fragment in self.fragments]
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def __eq__(self, other):
+        if isinstance(other, JSONFragments):
+            other = other.items
+        return self.items == other
+
+    def __repr__(self):
+        return f"JSONFragments({self.fragments!r})"
+
+    def __getstate__(self):
+        return {"fragments": self.fragments}
+
+    def tolist(self):
+        """Return the decoded objects, as ``JSONEncoder`` expects."""
+        return list(self.items)
+
+    def render(self):
+        return b"[" + b",".join(self.fragments) + b"]"
+
+
+class FragmentJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that splices ``JSONFragments`` in as raw bytes.
+
+    Fragments are found as the whole response or as one of the values of
+    a response dict (the ``results`` of a paginated response). Indented
+    output is rendered the usual way.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if isinstance(data, JSONFragments):
+            return data.render()
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if isinstance(value, JSONFragments):
+                    placeholder = f"fragments-{uuid.uuid4().hex}"
+                    content = super().render(
+                        {**data, key: placeholder},
+                        accepted_media_type,
+                        renderer_context,
+                    )
+                    return content.replace(
+                        dumps_json(placeholder), value.render(), 1
+                    )
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline delimited JSON, one object per line."""
+
+    media_type = NDJSON_MEDIA_TYPE
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, JSONFragments):
+            return b"".join(fragment + b"\n" for fragment in data.fragments)
+        items = data if isinstance(data, list) else [data]
+        return b"".join(dumps_json(item) + b"\n" for item in items)
@@ -0,0 +1,274 @@
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def _split_param(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def get_dynamic_fields_kwargs(request):
+    """Read the ``?fields=`` and ``?expand=`` parameters of a request."""
+    if request is None or request.method != "GET":
+        return {}
+    return {
+        "fields": _split_param(request, "fields"),
+        "expand": _split_param(request, "expand"),
+    }
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets and on-demand expansion for model serializers.
+
+    ``fields`` keeps only the listed top-level fields. ``expand`` replaces
+    the relations declared in ``Meta.expandable_fields`` (name to
+    serializer class) with their nested representation; dotted names
+    such as ``borrowing.book`` are passed down to the nested serializer.
+
+    ``optimize_queryset`` narrows a queryset to what the selected fields
+    read: ``only()`` the needed columns and ``select_related()`` the
+    nested relations, so the database work shrinks with the payload.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        expand = set(expand or ())
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        for name, serializer_class in expandable.items():
+            nested_expand = {
+                item.split(".", 1)[1]
+                for item in expand
+                if item.startswith(f"{name}.")
+            }
+            if name in expand or nested_expand:
+                self.fields[name] = serializer_class(
+                    read_only=True, expand=nested_expand
+                )
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def get_loaded_fields(self, prefix=""):
+        """Return ``(only, select_related)`` lookups for the current fields."""
+        only = [prefix + self.Meta.model._meta.pk.name]
+        related = []
+        for field in self.fields.values():
+            if field.source == "*":
+                continue
+            lookup = prefix + field.source.replace(".", "__")
+            only.append(lookup)
+            if isinstance(field, DynamicFieldsMixin):
+                related.append(lookup)
+                nested_only, nested_related = field.get_loaded_fields(
+                    f"{lookup}__"
+                )
+                only.extend(nested_only)
+                related.extend(nested_related)
+        return only, related
+
+    def optimize_queryset(self, queryset, extra_fields=()):
+        only, related = self.get_loaded_fields()
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only, *extra_fields)
+
+
+class DynamicFieldsModelSerializer(
+    DynamicFieldsMixin, serializers.ModelSerializer
+):
+    pass
+
+
+class DynamicFieldsViewMixin:
+    """
+    Apply ``?fields=`` and ``?expand=`` to a generic view.
+
+    The parameters reach the serializer through ``get_serializer`` and
+    the filtered queryset of ``GET`` requests is narrowed to the fields
+    the serializer will actually read.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if issubclass(self.get_serializer_class(), DynamicFieldsMixin):
+            kwargs = {**get_dynamic_fields_kwargs(self.request), **kwargs}
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method == "GET":
+            serializer = self.get_serializer()
+            if isinstance(serializer, DynamicFieldsMixin):
+                queryset = serializer.optimize_queryset(queryset)
+        return queryset
+
+
+class ValuesPlan:
+    """
+    Render a read-only serializer straight from ``queryset.values()`` rows.
+
+    The serializer fields are compiled once into a flat plan of
+    ``(name, lookup, convert)`` steps, so each row costs a dict lookup and
+    at most one converter call per field instead of a serializer pass
+    with attribute access on model instances. Converters are the bound
+    ``to_representation`` of the original fields (or the identity where
+    that is what the field does to a ``values()`` value), and file fields
+    build the same URL as ``FileField``, so the output is identical.
+
+    ``compile`` returns ``None`` when the mode is disabled with the
+    ``FAST_LIST_SERIALIZATION`` setting or a field has no plan (method
+    fields, many-to-many, ...); callers then use the serializer.
+    """
+
+    identity_fields = (
+        serializers.BooleanField,
+        serializers.CharField,
+        serializers.IntegerField,
+    )
+    converted_fields = (
+        serializers.ChoiceField,
+        serializers.DateField,
+        serializers.DateTimeField,
+        serializers.DecimalField,
+        serializers.FloatField,
+        serializers.UUIDField,
+    )
+
+    class Unsupported(Exception):
+        pass
+
+    def __init__(self, serializer):
+        self.request = serializer.context.get("request")
+        self.lookups = []
+        self.steps = self._compile(serializer, "")
+
+    @classmethod
+    def compile(cls, serializer):
+        if not settings.FAST_LIST_SERIALIZATION:
+            return None
+        try:
+            return cls(serializer)
+        except cls.Unsupported:
+            return None
+
+    def _add_lookup(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return lookup
+
+    def _compile(self, serializer, prefix):
+        model = serializer.Meta.model
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or "." in field.source:
+                raise self.Unsupported(name)
+            lookup = prefix + field.source
+
+            if isinstance(field, serializers.ModelSerializer):
+                pk_lookup = self._add_lookup(
+                    f"{lookup}__{field.Meta.model._meta.pk.name}"
+                )
+                nested = self._compile(field, f"{lookup}__")
+                steps.append((name, pk_lookup, nested))
+            else:
+                steps.append(
+                    (
+                        name,
+                        self._add_lookup(lookup),
+                        self._get_converter(model, field),
+                    )
+                )
+        return steps
+
+    def _get_converter(self, model, field):
+        if isinstance(field, PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                raise self.Unsupported(field.field_name)
+            return None
+        if isinstance(field, serializers.FileField):
+            return self._get_file_converter(model, field)
+        if isinstance(field, self.converted_fields):
+            return field.to_representation
+        if isinstance(field, self.identity_fields):
+            return None
+        raise self.Unsupported(field.field_name)
+
+    def _get_file_converter(self, model, field):
+        storage = model._meta.get_field(field.source).storage
+        use_url = getattr(
+            field, "use_url", api_settings.UPLOADED_FILES_USE_URL
+        )
+        request = self.request
+
+        def convert(name):
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            if request is not None:
+                return request.build_absolute_uri(url)
+            return url
+
+        return convert
+
+    def values(self, queryset):
+        """Return ``queryset.values()`` with the plan and ordering lookups."""
+        ordering = [
+            field.lstrip("-")
+            for field in queryset.query.order_by
+            if isinstance(field, str)
+        ]
+        lookups = self.lookups + [
+            field for field in ordering + ["pk"] if field not in self.lookups
+        ]
+        return queryset.values(*lookups)
+
+    def _render(self, steps, row):
+        data = {}
+        for name, lookup, convert in steps:
+            value = row[lookup]
+            if value is None:
+                data[name] = None
+            elif convert is None:
+                data[name] = value
+            elif isinstance(convert, list):
+                data[name] = self._render(convert, row)
+            else:
+                data[name] = convert(value)
+        return data
+
+    def render_row(self, row):
+        return self._render(self.steps, row)
+
+    def render(self, rows):
+        return [self._render(self.steps, row) for row in rows]
+
+
+class ValuesListMixin:
+    """
+    Serve ``list`` from ``ValuesPlan`` when the serializer allows it.
+
+    Filtering, pagination and the response format are those of
+    ``ListModelMixin``, only the serialization is replaced.
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = ValuesPlan.compile(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(queryset))
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_filters",
     "rest_framework",
     "library_service",
@@ -153,12 +154,51 @@ CELERY_TIMEZONE = os.environ.get("CELERY_TIMEZONE")
 CELERY_TASK_TRACK_STARTED = os.environ.get("CELERY_TASK_TRACK_STARTED")
 CELERY_TASK_TIME_LIMIT = 30 * 60
 
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+BOOK_CATALOG_CACHE_TIMEOUT = 15 * 60
+
+# Responses to POSTs sent with an Idempotency-Key are replayed for this long
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# Borrowings returned longer ago than this are moved to the archive table
+BORROWING_ARCHIVE_AFTER_MONTHS = int(
+    os.environ.get("BORROWING_ARCHIVE_AFTER_MONTHS", 12)
+)
+
+# A copy returned for a hold is kept for its patron this many days
+HOLD_READY_DAYS = int(os.environ.get("HOLD_READY_DAYS", 3))
+
+# Serialize large read-only lists from queryset.values() rows
+FAST_LIST_SERIALIZATION = (
+    os.environ.get("FAST_LIST_SERIALIZATION", "true").lower() == "true"
+)
+
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY")
 STRIPE_PUBLISHABLE_KEY = os.environ.get("STRIPE_PUBLISHABLE_KEY")
 
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
-    "PAGE_SIZE": None,
+    "DEFAULT_PAGINATION_CLASS": "library_service.pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
+    "DEFAULT_RENDERER_CLASSES": [
+        "library_service.renderers.FragmentJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -0,0 +1,88 @@
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+
+from library_service.renderers import (
+    NDJSON_MEDIA_TYPE,
+    NDJSONRenderer,
+    dumps_json,
+)
+from library_service.serializers import ValuesPlan
+
+
+STREAMING_RENDERER_CLASSES = [
+    *api_settings.DEFAULT_RENDERER_CLASSES,
+    NDJSONRenderer,
+]
+
+
+def is_stream_request(request):
+    """Stream for ``?stream=1`` or ``Accept: application/x-ndjson``."""
+    return (
+        request.query_params.get("stream") in ("1", "true")
+        or request.accepted_media_type == NDJSON_MEDIA_TYPE
+    )
+
+
+def _encode_stream(items, ndjson, batch_size):
+    """Yield the items as NDJSON lines or one JSON array, in batches."""
+    if not ndjson:
+        yield b"["
+    batch = []
+    for position, item in enumerate(items):
+        if ndjson:
+            batch.append(dumps_json(item) + b"\n")
+        else:
+            batch.append((b"," if position else b"") + dumps_json(item))
+        if len(batch) >= batch_size:
+            yield b"".join(batch)
+            batch = []
+    if batch:
+        yield b"".join(batch)
+    if not ndjson:
+        yield b"]"
+
+
+def stream_list_response(request, queryset, serializer, chunk_size=1000):
+    """
+    Stream ``queryset`` through ``serializer`` without materializing it.
+
+    Rows are read with ``.iterator(chunk_size=...)`` (a server-side cursor
+    on PostgreSQL) and written out in batches of ``chunk_size`` items, so
+    memory stays flat whatever the size of the list. Rows are rendered by
+    a ``ValuesPlan`` when the serializer has one.
+    """
+    plan = ValuesPlan.compile(serializer)
+    if plan is not None:
+        rows = plan.values(queryset).iterator(chunk_size=chunk_size)
+        items = (plan.render_row(row) for row in rows)
+    else:
+        rows = queryset.iterator(chunk_size=chunk_size)
+        items = (serializer.to_representation(row) for row in rows)
+
+    ndjson = request.accepted_media_type == NDJSON_MEDIA_TYPE
+    return StreamingHttpResponse(
+        _encode_stream(items, ndjson, chunk_size),
+        content_type=NDJSON_MEDIA_TYPE if ndjson else "application/json",
+    )
+
+
+class StreamingListMixin:
+    """
+    Stream ``list`` responses on request, see ``is_stream_request``.
+
+    Streamed lists are filtered like the regular ones but not paginated.
+    """
+
+    renderer_classes = STREAMING_RENDERER_CLASSES
+    stream_chunk_size = 1000
+
+    def list(self, request, *args, **kwargs):
+        if not is_stream_request(request):
+            return super().list(request, *args, **kwargs)
+
+        return stream_list_response(
+            request,
+            self.filter_queryset(self.get_queryset()),
+            self.get_serializer(),
+            self.stream_chunk_size,
+        )
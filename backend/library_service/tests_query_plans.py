@@ -0,0 +1,195 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from book.filters import BookFilter
+from book.models import Book
+from borrowing.filters import BorrowingFilter
+from borrowing.models import Borrowing
+from payment.models import Payment
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    Fail when a hot query shape can only be answered by a sequential scan.
+
+    Sequential scans are disabled for the session, so the planner picks
+    them only when no index can serve the query: the plans stay stable
+    whatever the size of the seeded tables.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{number}@test.com", tg_chat=number)
+            for number in range(20)
+        )
+        # Enough other users and borrowings for the email trigram index
+        # to beat walking every borrowing
+        patrons = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"patron{number}@library.org")
+            for number in range(2000)
+        )
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author=f"Author {number % 30}",
+                cover="Hard",
+                inventory=number % 5,
+                daily_fee=number % 17,
+            )
+            for number in range(300)
+        )
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                book=book,
+                user=users[number % len(users)],
+                expected_return_date=today + timedelta(days=number % 60 - 30),
+                actual_return_date=today if number % 3 else None,
+            )
+            for number, book in enumerate(books)
+        )
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                book=books[number % len(books)],
+                user=patrons[number % len(patrons)],
+                expected_return_date=today - timedelta(days=30),
+                actual_return_date=today - timedelta(days=30),
+            )
+            for number in range(4000)
+        )
+        Payment.objects.bulk_create(
+            Payment(
+                borrowing=borrowing,
+                session_url="https://checkout.stripe.com/test",
+                session_id=f"cs_test_{borrowing.id}",
+                money_to_pay=1,
+            )
+            for borrowing in borrowings
+        )
+        with connection.cursor() as cursor:
+            for model in (Book, Borrowing, Payment, get_user_model()):
+                cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+            # Bulk inserted rows wait in the GIN pending list, which the
+            # planner costs as a scan of its own
+            cursor.execute(
+                "SELECT gin_clean_pending_list('user_email_upper_trgm_idx')"
+            )
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+
+    def assertNoSeqScan(self, queryset, model):
+        plan = queryset.explain()
+        self.assertNotIn(
+            f"Seq Scan on {model._meta.db_table}",
+            plan,
+            msg=f"\n{queryset.query}\n{plan}",
+        )
+        return plan
+
+    def test_payment_by_session_id(self):
+        self.assertNoSeqScan(
+            Payment.objects.filter(session_id="cs_test_1"), Payment
+        )
+
+    def test_overdue_borrowings(self):
+        plan = self.assertNoSeqScan(
+            Borrowing.objects.filter(
+                actual_return_date__isnull=True,
+                expected_return_date__lt=date.today(),
+            ),
+            Borrowing,
+        )
+        self.assertIn("borrowing_active_due_idx", plan)
+
+    def test_borrowings_due_tomorrow(self):
+        self.assertNoSeqScan(
+            Borrowing.objects.filter(
+                actual_return_date__isnull=True,
+                expected_return_date__lte=date.today() + timedelta(days=1),
+                expected_return_date__gt=date.today(),
+            ),
+            Borrowing,
+        )
+
+    def test_active_borrowings_of_user(self):
+        self.assertNoSeqScan(
+            Borrowing.objects.filter(
+                actual_return_date__isnull=True, user_id=1
+            ).order_by("id"),
+            Borrowing,
+        )
+
+    def test_overdue_borrowings_of_bot_user(self):
+        plan = self.assertNoSeqScan(
+            Borrowing.objects.filter(
+                expected_return_date__lt=date.today(), user__tg_chat=1
+            ).select_related("book"),
+            Borrowing,
+        )
+        self.assertIn(
+            f"{get_user_model()._meta.db_table}_tg_chat_key", plan
+        )
+
+    def test_books_ordered_by_daily_fee(self):
+        self.assertNoSeqScan(
+            Book.objects.order_by("daily_fee", "id")[:20], Book
+        )
+
+    def test_books_in_fee_range(self):
+        self.assertNoSeqScan(
+            Book.objects.filter(daily_fee__gte=3, daily_fee__lte=5), Book
+        )
+
+    def test_books_ordered_by_title(self):
+        self.assertNoSeqScan(Book.objects.order_by("title", "id")[:20], Book)
+
+    def test_books_ordered_by_author(self):
+        self.assertNoSeqScan(
+            Book.objects.order_by("-author", "-id")[:20], Book
+        )
+
+    def test_books_by_title_substring(self):
+        self.assertNoSeqScan(
+            Book.objects.filter(title__icontains="ok 1"), Book
+        )
+
+    def test_books_filtered_by_title_and_author(self):
+        queryset = BookFilter(
+            {"title": "book 1,bok 2", "author": "autor 3"},
+            queryset=Book.objects.all(),
+        ).qs
+
+        self.assertNoSeqScan(queryset, Book)
+
+    def test_borrowings_in_date_ranges(self):
+        today = date.today()
+        for filters in (
+            {"borrow_date_after": today - timedelta(days=7)},
+            {
+                "expected_return_date_after": today,
+                "expected_return_date_before": today + timedelta(days=7),
+            },
+        ):
+            queryset = BorrowingFilter(
+                filters, queryset=Borrowing.objects.all()
+            ).qs
+
+            self.assertNoSeqScan(queryset, Borrowing)
+
+    def test_borrowings_by_user_email(self):
+        queryset = BorrowingFilter(
+            {"user_email": "user1@"}, queryset=Borrowing.objects.all()
+        ).qs
+
+        plan = self.assertNoSeqScan(queryset, get_user_model())
+        self.assertIn("user_email_upper_trgm_idx", plan)
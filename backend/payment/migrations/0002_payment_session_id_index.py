@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0003_borrowing_due_indexes"),
+        ("payment", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(fields=["session_id"], name="payment_session_id_idx"),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0006_archivedborrowing"),
+        ("payment", "0002_payment_session_id_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payment",
+            name="archived_borrowing",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="payments",
+                to="borrowing.archivedborrowing",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="borrowing",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="payments",
+                to="borrowing.borrowing",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("borrowing__isnull", False),
+                    ("archived_borrowing__isnull", False),
+                    _connector="XOR",
+                ),
+                name="payment_single_borrowing",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:14
+
+from django.db import migrations, models
+
+
+def clear_empty_sessions(apps, schema_editor):
+    """Desk payments were created with empty session fields."""
+    Payment = apps.get_model("payment", "Payment")
+    Payment.objects.filter(session_id="").update(
+        session_id=None, session_url=None
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0003_payment_archived_borrowing"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="payment",
+            name="session_id",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="session_url",
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+        migrations.RunPython(
+            clear_empty_sessions, migrations.RunPython.noop
+        ),
+    ]
@@ -21,14 +21,42 @@ class Payment(models.Model):
         default=PaymentType.PAYMENT
     )
     borrowing = models.ForeignKey(
-        "borrowing.Borrowing", related_name="payments", on_delete=models.CASCADE
+        "borrowing.Borrowing",
+        related_name="payments",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
     )
-    session_url = models.URLField(max_length=500)
-    session_id = models.CharField(max_length=255)
+    # Set instead of borrowing once the borrowing is archived
+    archived_borrowing = models.ForeignKey(
+        "borrowing.ArchivedBorrowing",
+        related_name="payments",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    # Empty until the Stripe session of a desk payment is opened
+    session_url = models.URLField(max_length=500, null=True, blank=True)
+    session_id = models.CharField(max_length=255, null=True, blank=True)
     money_to_pay = models.DecimalField(max_digits=10, decimal_places=2)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["session_id"], name="payment_session_id_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(borrowing__isnull=False)
+                    ^ models.Q(archived_borrowing__isnull=False)
+                ),
+                name="payment_single_borrowing",
+            ),
+        ]
+
     def __str__(self):
         return (
-            f"Payment {self.id} for Borrowing {self.borrowing_id}: "
+            f"Payment {self.id} for Borrowing "
+            f"{self.borrowing_id or self.archived_borrowing_id}: "
             f"{self.type} - {self.status} ({self.money_to_pay} USD)"
         )
@@ -1,12 +1,9 @@
-from rest_framework import serializers
-
 from borrowing.serializers import BorrowingListSerializer
+from library_service.serializers import DynamicFieldsModelSerializer
 from payment.models import Payment
 
 
-class PaymentSerializer(serializers.ModelSerializer):
-    borrowing = BorrowingListSerializer()
-
+class PaymentSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Payment
         fields = (
@@ -14,7 +11,9 @@ class PaymentSerializer(serializers.ModelSerializer):
             "status",
             "type",
             "borrowing",
+            "archived_borrowing",
             "session_url",
             "session_id",
             "money_to_pay"
         )
+        expandable_fields = {"borrowing": BorrowingListSerializer}
@@ -0,0 +1,34 @@
+from celery import shared_task
+
+from payment.models import Payment
+from payment.utils import open_checkout_session
+
+
+@shared_task
+def create_payment_sessions(payment_ids, success_url, cancel_url):
+    """
+    Open the Stripe sessions of payments created without one.
+
+    Desk check-ins create their payments in bulk inside the return
+    transaction, their sessions are opened here afterwards so patrons
+    can pay them online. Payments paid or given a session meanwhile are
+    left alone.
+    """
+    payments = Payment.objects.filter(
+        pk__in=payment_ids,
+        borrowing__isnull=False,
+        session_id__isnull=True,
+        status=Payment.PaymentStatus.PENDING,
+    ).select_related("borrowing__book").order_by("id")
+    for payment in payments:
+        session = open_checkout_session(
+            payment.borrowing,
+            payment.type,
+            payment.money_to_pay,
+            success_url,
+            cancel_url,
+        )
+        Payment.objects.filter(pk=payment.pk, session_id__isnull=True).update(
+            session_id=session.id, session_url=session.url
+        )
+    return len(payments)
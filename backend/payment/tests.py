@@ -1,3 +1,233 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.models import Book
+from borrowing.models import Borrowing
+from payment.models import Payment
+from payment.tasks import create_payment_sessions
+
+PAYMENT_URL = reverse("payment:payment-list")
+PAYMENT_SUCCESS_URL = reverse("payment:payment-success")
+
+
+class PaymentKeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpassword"
+        )
+        book = Book.objects.create(
+            title="test",
+            author="test",
+            cover="Hard",
+            inventory=10,
+            daily_fee=1,
+        )
+        borrowing = Borrowing.objects.create(
+            book=book,
+            user=self.user,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+        self.payments = [
+            Payment.objects.create(
+                borrowing=borrowing,
+                session_url="https://checkout.stripe.com/test",
+                session_id=f"cs_test_{number}",
+                money_to_pay=1,
+            )
+            for number in range(3)
+        ]
+        self.client.force_authenticate(self.user)
+
+    def test_pages_through_payments(self):
+        res = self.client.get(PAYMENT_URL + "?page_size=2")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [payment.id for payment in self.payments[:2]],
+            [payment["id"] for payment in res.data["results"]],
+        )
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual(
+            [self.payments[2].id],
+            [payment["id"] for payment in res.data["results"]],
+        )
+        self.assertIsNone(res.data["next"])
+
+
+class PaymentDynamicFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpassword"
+        )
+        self.book = Book.objects.create(
+            title="test",
+            author="test",
+            cover="Hard",
+            inventory=10,
+            daily_fee=1,
+        )
+        self.borrowing = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            session_url="https://checkout.stripe.com/test",
+            session_id="cs_test",
+            money_to_pay=1,
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_fields_drop_nested_borrowing(self):
+        res = self.client.get(PAYMENT_URL, {"fields": "id,status"})
+
+        self.assertEqual(
+            [{"id": self.payment.id, "status": "pending"}],
+            res.data["results"],
+        )
+
+    def test_borrowing_id_by_default(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(PAYMENT_URL)
+
+        self.assertEqual(
+            self.borrowing.id, res.data["results"][0]["borrowing"]
+        )
+
+    def test_expand_borrowing(self):
+        res = self.client.get(PAYMENT_URL, {"expand": "borrowing"})
+
+        borrowing = res.data["results"][0]["borrowing"]
+        self.assertEqual(self.borrowing.id, borrowing["id"])
+        self.assertEqual(self.book.id, borrowing["book"])
+
+    def test_expand_borrowing_book(self):
+        res = self.client.get(
+            PAYMENT_URL, {"expand": "borrowing.book", "fields": "borrowing"}
+        )
+
+        self.assertEqual(
+            "test", res.data["results"][0]["borrowing"]["book"]["title"]
+        )
+
+    def test_expand_borrowing_book_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(PAYMENT_URL, {"expand": "borrowing.book"})
+
+
+class PaymentValuesSerializationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpassword"
+        )
+        book = Book.objects.create(
+            title="test",
+            author="test",
+            cover="Hard",
+            inventory=10,
+            daily_fee=1,
+        )
+        borrowing = Borrowing.objects.create(
+            book=book,
+            user=self.user,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+        for number in range(3):
+            Payment.objects.create(
+                borrowing=borrowing,
+                session_url="https://checkout.stripe.com/test",
+                session_id=f"cs_test_{number}",
+                money_to_pay=Decimal("10.5") * number,
+            )
+        self.client.force_authenticate(self.user)
+
+    def assert_parity(self, params=None):
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            expected = self.client.get(PAYMENT_URL, params).data
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            actual = self.client.get(PAYMENT_URL, params).data
+        self.assertEqual(expected, actual)
+        return actual
+
+    def test_list_parity(self):
+        response = self.assert_parity()
+
+        self.assertEqual("21.00", response["results"][2]["money_to_pay"])
+
+    def test_expanded_list_parity(self):
+        self.assert_parity({"expand": "borrowing.book"})
+
+    def test_paginated_list_parity(self):
+        self.assert_parity({"page_size": 2})
+
+
+class DeskPaymentSessionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpassword"
+        )
+        book = Book.objects.create(
+            title="test",
+            author="test",
+            cover="Hard",
+            inventory=10,
+            daily_fee=1,
+        )
+        borrowing = Borrowing.objects.create(
+            book=book,
+            user=self.user,
+            expected_return_date=date.today() + timedelta(days=7),
+        )
+        self.payments = Payment.objects.bulk_create(
+            Payment(borrowing=borrowing, money_to_pay=2) for _ in range(2)
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_success_view_rejects_missing_session_id(self):
+        for params in ({}, {"session_id": ""}):
+            res = self.client.get(PAYMENT_SUCCESS_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sessions_are_opened_for_desk_payments(self):
+        sessions = [
+            SimpleNamespace(id=f"cs_desk_{number}", url=f"https://s/{number}")
+            for number in range(2)
+        ]
+        with mock.patch(
+            "payment.tasks.open_checkout_session", side_effect=sessions
+        ) as open_checkout_session:
+            opened = create_payment_sessions(
+                [payment.id for payment in self.payments],
+                "https://test/success",
+                "https://test/cancel",
+            )
+            create_payment_sessions(
+                [payment.id for payment in self.payments],
+                "https://test/success",
+                "https://test/cancel",
+            )
+
+        self.assertEqual(2, opened)
+        self.assertEqual(2, open_checkout_session.call_count)
+        self.assertEqual(
+            ["cs_desk_0", "cs_desk_1"],
+            list(
+                Payment.objects.order_by("id").values_list(
+                    "session_id", flat=True
+                )
+            ),
+        )
@@ -11,16 +11,17 @@ from payment.models import Payment
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
-@transaction.atomic
-def create_stripe_session(borrowing: Borrowing, request, date_now: datetime.date) -> Payment:
-    payment_type = borrowing.get_payment_type(date_now)
-    total_payment = borrowing.get_total_payment(date_now)
-    total_price = int(total_payment * 100)
-
+def get_checkout_urls(request):
+    """Return the Stripe success and cancel URLs for this host."""
     success_url = request.build_absolute_uri(reverse("payment:payment-success")) + "?session_id={CHECKOUT_SESSION_ID}"
     cancel_url = request.build_absolute_uri(reverse("payment:payment-cancel"))
+    return success_url, cancel_url
+
 
-    session = stripe.checkout.Session.create(
+def open_checkout_session(
+    borrowing: Borrowing, payment_type, total_payment, success_url, cancel_url
+):
+    return stripe.checkout.Session.create(
         payment_method_types=["card"],
         line_items=[{
             "price_data": {
@@ -28,7 +29,7 @@ def create_stripe_session(borrowing: Borrowing, request, date_now: datetime.date
                 "product_data": {
                     "name": f"{borrowing.book.title} ({payment_type}: {total_payment}$)"
                 },
-                "unit_amount": total_price,
+                "unit_amount": int(total_payment * 100),
             },
             "quantity": 1
         }],
@@ -37,6 +38,16 @@ def create_stripe_session(borrowing: Borrowing, request, date_now: datetime.date
         cancel_url=cancel_url,
     )
 
+
+@transaction.atomic
+def create_stripe_session(borrowing: Borrowing, request, date_now: datetime.date) -> Payment:
+    payment_type = borrowing.get_payment_type(date_now)
+    total_payment = borrowing.get_total_payment(date_now)
+
+    session = open_checkout_session(
+        borrowing, payment_type, total_payment, *get_checkout_urls(request)
+    )
+
     payment = Payment.objects.create(
         borrowing=borrowing,
         status=Payment.PaymentStatus.PENDING,
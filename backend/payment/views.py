@@ -1,5 +1,6 @@
 import stripe
 
+from django.db.models import Q
 from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import api_view
@@ -7,6 +8,10 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from library_service.serializers import (
+    DynamicFieldsViewMixin,
+    ValuesListMixin,
+)
 from payment.models import Payment
 from payment.serializers import PaymentSerializer
 from schemas.payment_schema_decorator import payment_schema_view, payment_success_view_schema, \
@@ -16,9 +21,11 @@ from schemas.payment_schema_decorator import payment_schema_view, payment_succes
 @extend_schema(tags=["payments"])
 @payment_schema_view()
 class PaymentViewSet(
+    DynamicFieldsViewMixin,
+    ValuesListMixin,
     mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
-    queryset = Payment.objects.select_related("borrowing")
+    queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = (IsAuthenticated,)
 
@@ -26,14 +33,18 @@ class PaymentViewSet(
         user = self.request.user
 
         if user.is_staff:
-            return Payment.objects.select_related("borrowing")
-        return Payment.objects.select_related().filter(borrowing_id__user=user)
+            return Payment.objects.order_by("id")
+        return Payment.objects.filter(
+            Q(borrowing__user=user) | Q(archived_borrowing__user=user)
+        ).order_by("id")
 
 
 @payment_success_view_schema()
 @api_view(["GET"])
 def payment_success_view(request):
     session_id = request.GET.get("session_id")
+    if not session_id:
+        return Response({"error": "Missing session_id"}, status=status.HTTP_400_BAD_REQUEST)
     payment = get_object_or_404(Payment, session_id=session_id)
 
     session = stripe.checkout.Session.retrieve(session_id)
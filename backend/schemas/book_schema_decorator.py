@@ -1,6 +1,13 @@
-from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiExample
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema_view,
+    extend_schema,
+    OpenApiExample,
+    OpenApiParameter,
+)
 
 from schemas.book_schema_parameters import book_filter_list_schema
+from schemas.dynamic_fields_schema_parameters import dynamic_fields_schema
 
 
 def book_schema_view():
@@ -8,7 +15,8 @@ def book_schema_view():
         list=extend_schema(
             summary="Get list of books with filters",
             description="Retrieve a list of books with optional filtering, searching, and sorting.",
-            parameters=book_filter_list_schema["parameters"],
+            parameters=book_filter_list_schema["parameters"]
+            + dynamic_fields_schema["parameters"],
         ),
         create=extend_schema(
             summary="Create a new book",
@@ -17,6 +25,7 @@ def book_schema_view():
         retrieve=extend_schema(
             summary="Retrieve a book",
             description="Retrieve a specific book by its ID.",
+            parameters=dynamic_fields_schema["parameters"],
         ),
         update=extend_schema(
             summary="Update a book",
@@ -42,6 +51,7 @@ def book_schema_view():
                             "id": 1,
                             "title": "The Little Prince",
                             "author": "Antoine de Saint-Exupery",
+                            "author_id": 1,
                             "cover": "Hard",
                             "inventory": 10,
                             "daily_fee": "0.55",
@@ -51,4 +61,71 @@ def book_schema_view():
                 ),
             ],
         ),
+        autocomplete=extend_schema(
+            summary="Autocomplete titles and authors",
+            description="Get title and author completions for a typed "
+            "prefix. Served from an in-memory index, meant to be called on "
+            "every keystroke.",
+            parameters=[
+                OpenApiParameter(
+                    "q",
+                    OpenApiTypes.STR,
+                    OpenApiParameter.QUERY,
+                    description="Prefix of a title or an author name",
+                    required=True,
+                ),
+                OpenApiParameter(
+                    "limit",
+                    OpenApiTypes.INT,
+                    OpenApiParameter.QUERY,
+                    description="Max number of titles and of authors to "
+                    "return (default 10, max 50)",
+                    required=False,
+                ),
+            ],
+            examples=[
+                OpenApiExample(
+                    name="Autocomplete",
+                    value={
+                        "titles": ["The Little Prince"],
+                        "authors": [],
+                    },
+                    response_only=True,
+                ),
+            ],
+        ),
+        cache_stats=extend_schema(
+            summary="Catalog cache statistics",
+            description="Hit and miss counters of the book list and detail "
+            "response cache, its current generation, and hit and miss "
+            "counters of the per-book fragment cache (admin only).",
+            examples=[
+                OpenApiExample(
+                    name="Cache statistics",
+                    value={
+                        "generation": 42,
+                        "hits": 1024,
+                        "misses": 64,
+                        "fragment_hits": 20480,
+                        "fragment_misses": 512,
+                    },
+                    response_only=True,
+                ),
+            ],
+        ),
+    )
+
+
+def author_schema_view():
+    return extend_schema_view(
+        list=extend_schema(
+            summary="Get list of authors",
+            description="Retrieve authors sorted by name, with the number "
+            "of their books. Use `author_id` or `author_slug` on the book "
+            "list to get the books of an author.",
+        ),
+        retrieve=extend_schema(
+            summary="Retrieve an author",
+            description="Retrieve a specific author by its ID.",
+        ),
     )
@@ -9,7 +9,30 @@ book_filter_list_schema = {
             OpenApiTypes.STR,
             OpenApiParameter.QUERY,
             description="Comma separated list of authors (first name + last "
-            "name) to filter",
+            "name) to filter, tolerates typos and puts the closest matches "
+            "first",
+            required=False,
+        ),
+        OpenApiParameter(
+            "author_id",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            description="Comma separated list of author ids to filter",
+            required=False,
+        ),
+        OpenApiParameter(
+            "author_slug",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            description="Comma separated list of author slugs to filter",
+            required=False,
+        ),
+        OpenApiParameter(
+            "title",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            description="Comma separated list of titles to filter, tolerates "
+            "typos and puts the closest matches first",
             required=False,
         ),
         OpenApiParameter(
@@ -50,9 +73,18 @@ book_filter_list_schema = {
         ),
         OpenApiParameter(
             "search",
-            OpenApiTypes.NUMBER,
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            description="Full-text search by title and author, results are "
+            "ranked by relevance",
+            required=False,
+        ),
+        OpenApiParameter(
+            "stream",
+            OpenApiTypes.BOOL,
             OpenApiParameter.QUERY,
-            description="Search items by query parameter: title, cover, " "inventory",
+            description="Stream the whole unpaginated list, as JSON or as "
+            "NDJSON with `Accept: application/x-ndjson`",
             required=False,
         ),
     ]
@@ -1,4 +1,27 @@
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    OpenApiExample,
+    OpenApiParameter,
+)
+
+from borrowing.serializers import (
+    BorrowingCheckInSerializer,
+    BorrowingCheckoutSerializer,
+    BorrowingLiabilitiesSerializer,
+    HoldSerializer,
+)
+
+from schemas.dynamic_fields_schema_parameters import dynamic_fields_schema
+
+idempotency_key_parameter = OpenApiParameter(
+    name="Idempotency-Key",
+    type=str,
+    location=OpenApiParameter.HEADER,
+    description="Unique key of the request, retries sent with the same "
+    "key get the first response back instead of being run again",
+    required=False,
+)
 
 
 def borrowing_list_get_schema():
@@ -8,7 +31,7 @@ def borrowing_list_get_schema():
         summary="List of all borrowings",
         description="Retrieve a list of all borrowings for current user.  \n"
         "If **admin** authorized - possible to view borrowings from all "
-        "users.  \nAdmins can filter by `user_id` and `is_active`.",
+        "users.  \nAdmins can also filter by `user_id` and `user_email`.",
         parameters=[
             OpenApiParameter(
                 name="user_id",
@@ -16,14 +39,80 @@ def borrowing_list_get_schema():
                 description="Filter by user ID (admin only)",
                 required=False,
             ),
+            OpenApiParameter(
+                name="user_email",
+                type=str,
+                description="Filter by a part of the user email (admin only)",
+                required=False,
+            ),
             OpenApiParameter(
                 name="is_active",
                 type=str,
                 description="Filter active borrowings (`true` or `false`)",
                 required=False,
             ),
-        ],
-        responses={200: "List of borrowings"},
+            OpenApiParameter(
+                name="overdue",
+                type=str,
+                description="Filter overdue borrowings (`true` or `false`)",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="book",
+                type=int,
+                description="Filter by book ID",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="borrow_date_after",
+                type=OpenApiTypes.DATE,
+                description="Borrowed on or after this date",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="borrow_date_before",
+                type=OpenApiTypes.DATE,
+                description="Borrowed on or before this date",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="expected_return_date_after",
+                type=OpenApiTypes.DATE,
+                description="Due on or after this date",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="expected_return_date_before",
+                type=OpenApiTypes.DATE,
+                description="Due on or before this date",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=str,
+                description="Cursor of the page, taken from `next`",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="page_size",
+                type=int,
+                description="Number of borrowings per page "
+                "(default 20, max 100)",
+                required=False,
+            ),
+            OpenApiParameter(
+                name="stream",
+                type=bool,
+                description="Stream the whole unpaginated list, as JSON or "
+                "as NDJSON with `Accept: application/x-ndjson`",
+                required=False,
+            ),
+        ]
+        + dynamic_fields_schema["parameters"],
+        responses={
+            200: "List of borrowings",
+            304: "Not modified since the ETag sent in `If-None-Match`",
+        },
     )
 
 
@@ -33,6 +122,135 @@ def borrowing_list_post_schema():
         methods=["POST"],
         summary="Create a new borrowing",
         description="Create a new borrowing entry. The user must be authenticated.",
+        parameters=[idempotency_key_parameter],
+    )
+
+
+def borrowing_checkout_schema():
+    return extend_schema(
+        tags=["borrowings"],
+        methods=["POST"],
+        summary="Borrow several books at once",
+        description="Create one borrowing per item, up to 20 books.  \n"
+        "With `all_or_nothing` (default) nothing is borrowed unless every "
+        "item can be, errors are returned per item. Otherwise the valid "
+        "items are borrowed and `results` holds the outcome of each one.",
+        request=BorrowingCheckoutSerializer,
+        parameters=[idempotency_key_parameter],
+        examples=[
+            OpenApiExample(
+                "Checkout",
+                value={
+                    "items": [
+                        {"book": 1, "expected_return_date": "2025-05-01"},
+                        {"book": 2, "expected_return_date": "2025-05-08"},
+                    ],
+                    "all_or_nothing": False,
+                },
+                request_only=True,
+            ),
+        ],
+        responses={
+            201: "Outcome of each item",
+            400: "Invalid items, or no book could be borrowed",
+        },
+    )
+
+
+def borrowing_check_in_schema():
+    return extend_schema(
+        tags=["borrowings"],
+        methods=["POST"],
+        summary="Check in returned books (admin only)",
+        description="Mark up to 500 borrowings returned at the desk, put "
+        "their copies back and create a pending payment for each, without "
+        "Stripe sessions.  \nBorrowings already returned or unknown are "
+        "listed in `skipped`.",
+        request=BorrowingCheckInSerializer,
+        examples=[
+            OpenApiExample(
+                "Check-in",
+                value={"borrowings": [12, 15, 16]},
+                request_only=True,
+            ),
+        ],
+        responses={
+            200: "Returned borrowings with their payments, and skipped ids",
+        },
+    )
+
+
+def borrowing_quote_schema():
+    return extend_schema(
+        tags=["borrowings"],
+        methods=["GET"],
+        summary="Quote the fees of returning borrowings today",
+        description="Return what returning each open borrowing today "
+        "would cost, computed by the database, and their total.  \n"
+        "Without `borrowings`, all open borrowings of the current user are "
+        "quoted. Only **admins** can quote borrowings of other users.",
+        parameters=[
+            OpenApiParameter(
+                name="borrowings",
+                type=str,
+                description="Comma separated ids of borrowings to quote, "
+                "at most 500",
+                required=False,
+            ),
+        ],
+        responses={200: "Fee quotes", 400: "Invalid list of ids"},
+    )
+
+
+def borrowing_liabilities_schema():
+    return extend_schema(
+        tags=["borrowings"],
+        methods=["GET"],
+        summary="Outstanding liabilities (admin only)",
+        description="Rental fees and fines accrued today by all open "
+        "borrowings, computed with a single aggregate query.",
+        responses={200: BorrowingLiabilitiesSerializer},
+    )
+
+
+def borrowing_holds_get_schema():
+    return extend_schema(
+        tags=["borrowings"],
+        methods=["GET"],
+        summary="List of holds of current user",
+        description="Books the current user is waiting for, with the "
+        "position of each hold in the queue of its book (1 is next).",
+        responses={200: HoldSerializer(many=True)},
+    )
+
+
+def borrowing_holds_post_schema():
+    return extend_schema(
+        tags=["borrowings"],
+        methods=["POST"],
+        summary="Place a hold on an unavailable book",
+        description="Join the FIFO queue of a book with no copy left. When "
+        "a copy is returned, it is set aside for the patron at the head "
+        "of the queue, who is notified by Telegram and email and can "
+        "borrow it until `ready_until`, so there is no need to poll the "
+        "book.",
+        request=HoldSerializer,
+        parameters=[idempotency_key_parameter],
+        responses={
+            201: HoldSerializer,
+            400: "The book is available or already held by the user",
+        },
+    )
+
+
+def borrowing_hold_delete_schema():
+    return extend_schema(
+        tags=["borrowings"],
+        methods=["DELETE"],
+        summary="Cancel a hold",
+        description="Leave the queue of the book. A copy set aside for "
+        "the hold goes to the next patron in the queue.",
+        responses={204: None, 404: "No such hold of the current user"},
     )
 
 
@@ -42,7 +260,11 @@ def borrowing_detail_get_schema():
         methods=["GET"],
         summary="Retrieve borrowing",
         description="Retrieve all detail info about borrowing.",
-        responses={200: "Borrowing details"},
+        parameters=dynamic_fields_schema["parameters"],
+        responses={
+            200: "Borrowing details",
+            304: "Not modified since the ETag sent in `If-None-Match`",
+        },
     )
 
 
@@ -52,4 +274,5 @@ def borrowing_detail_return_post_schema():
         methods=["POST"],
         summary="Return book to library",
         description="Create a payment for returning borrowed book.",
+        parameters=[idempotency_key_parameter],
     )
@@ -0,0 +1,24 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+
+dynamic_fields_schema = {
+    "parameters": [
+        OpenApiParameter(
+            "fields",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            description="Comma separated list of fields to return, "
+            "e.g. `id,title`",
+            required=False,
+        ),
+        OpenApiParameter(
+            "expand",
+            OpenApiTypes.STR,
+            OpenApiParameter.QUERY,
+            description="Comma separated list of relations to return "
+            "inline instead of their ids, e.g. `book` or `borrowing.book`",
+            required=False,
+        ),
+    ]
+}
@@ -5,16 +5,20 @@ from drf_spectacular.utils import (
     extend_schema_view,
 )
 
+from schemas.dynamic_fields_schema_parameters import dynamic_fields_schema
+
 
 def payment_schema_view():
     return extend_schema_view(
         list=extend_schema(
             summary="Get list of payments of current user",
             description="Get list of payments of current user.",
+            parameters=dynamic_fields_schema["parameters"],
         ),
         retrieve=extend_schema(
             summary="Payment details.",
             description="Retrieve details about particular payment.",
+            parameters=dynamic_fields_schema["parameters"],
         ),
     )
 
@@ -6,7 +6,7 @@ from drf_spectacular.utils import (
 )
 
 from schemas.book_schema_parameters import book_filter_list_schema
-from user.serializers import UserSerializer
+from user.serializers import DashboardSerializer, UserSerializer
 
 
 def create_user_schema():
@@ -155,3 +155,20 @@ def manage_schema_view():
             },
         ),
     )
+
+
+def dashboard_schema():
+    return extend_schema(
+        summary="User dashboard",
+        description="The profile of the authenticated user, their "
+        "borrowing summary (active and overdue borrowings, pending "
+        "payments, last activity) and their first 20 active borrowings, "
+        "soonest due first, in a single response.",
+        responses={
+            200: OpenApiResponse(
+                response=DashboardSerializer,
+                description="Dashboard of the authenticated user",
+            ),
+            401: OpenApiResponse(description="Unauthorized"),
+        },
+    )
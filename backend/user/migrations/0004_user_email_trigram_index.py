@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:03
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("book", "0004_book_trigram_indexes"),
+        ("user", "0003_alter_user_tg_chat"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("email"), name="gin_trgm_ops"
+                ),
+                name="user_email_upper_trgm_idx",
+            ),
+        ),
+    ]
@@ -2,7 +2,9 @@ from django.contrib.auth.models import (
     BaseUserManager,
     AbstractUser
 )
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 
@@ -43,5 +45,13 @@ class User(AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="user_email_upper_trgm_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.email
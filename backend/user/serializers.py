@@ -1,6 +1,11 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from borrowing.serializers import (
+    BorrowingListSerializer,
+    BorrowingSummarySerializer,
+)
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -26,3 +31,9 @@ class UserSerializer(serializers.ModelSerializer):
             user.set_password(password)
             user.save()
         return user
+
+
+class DashboardSerializer(serializers.Serializer):
+    user = UserSerializer()
+    summary = BorrowingSummarySerializer()
+    active_borrowings = BorrowingListSerializer(many=True)
@@ -1,9 +1,17 @@
+from datetime import date, timedelta
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from book.models import Book
+from borrowing.models import Borrowing, BorrowingSummary
+from borrowing.services import check_in_borrowings, create_borrowing
+from borrowing.tasks import accrue_fines
+from payment.models import Payment
+
 
 def create_user(**params):
     return get_user_model().objects.create_user(**params)
@@ -97,3 +105,110 @@ class PrivateUserApiTests(TestCase):
                 "is_staff": False,
             },
         )
+
+
+class DashboardApiTests(TestCase):
+
+    def setUp(self):
+        self.dashboard_url = reverse("user:dashboard")
+        self.user = create_user(email="test@test.com", password="test123")
+        self.book = Book.objects.create(
+            title="test",
+            author="test",
+            cover="Hard",
+            inventory=5,
+            daily_fee=2,
+        )
+        today = date.today()
+        self.overdue = create_borrowing(
+            self.user, self.book, today + timedelta(days=1)
+        )
+        Borrowing.objects.filter(pk=self.overdue.pk).update(
+            expected_return_date=today - timedelta(days=2)
+        )
+        self.due = create_borrowing(
+            self.user, self.book, today + timedelta(days=5)
+        )
+        check_in_borrowings(
+            [
+                create_borrowing(
+                    self.user, self.book, today + timedelta(days=3)
+                ).id
+            ],
+            today,
+        )
+        self.client = APIClient()
+        res = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": "test@test.com", "password": "test123"},
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {res.data['access']}"
+        )
+
+    def test_dashboard(self):
+        accrue_fines()
+
+        # JWT user lookup, summary, active borrowings.
+        with self.assertNumQueries(3):
+            res = self.client.get(self.dashboard_url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user.email, res.data["user"]["email"])
+        summary = res.data["summary"]
+        self.assertEqual(
+            (2, 1, "2.00"),
+            (
+                summary["active_count"],
+                summary["overdue_count"],
+                summary["pending_payments"],
+            ),
+        )
+        self.assertIsNotNone(summary["last_activity"])
+        self.assertEqual(
+            [self.overdue.id, self.due.id],
+            [borrowing["id"] for borrowing in res.data["active_borrowings"]],
+        )
+
+    def test_summary_follows_payments(self):
+        payment = Payment.objects.get()
+        payment.status = Payment.PaymentStatus.PAID
+        payment.save()
+
+        res = self.client.get(self.dashboard_url)
+
+        self.assertEqual("0.00", res.data["summary"]["pending_payments"])
+
+    def test_paid_return_updates_summary(self):
+        Payment.objects.create(
+            borrowing=self.due,
+            session_url="https://example.com",
+            session_id="session",
+            money_to_pay="2.00",
+        )
+        payment = Payment.objects.get(borrowing=self.due)
+        payment.status = Payment.PaymentStatus.PAID
+        payment.save()
+
+        summary = BorrowingSummary.objects.get(user=self.user)
+        self.assertEqual(1, summary.active_count)
+
+    def test_dashboard_of_new_user(self):
+        create_user(email="new@test.com", password="test123")
+        res = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": "new@test.com", "password": "test123"},
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {res.data['access']}"
+        )
+
+        res = self.client.get(self.dashboard_url)
+
+        self.assertEqual(0, res.data["summary"]["active_count"])
+        self.assertEqual([], res.data["active_borrowings"])
+
+    def test_dashboard_requires_authentication(self):
+        res = APIClient().get(self.dashboard_url)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -5,12 +5,13 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
-from user.views import CreateUserView, ManageUserView
+from user.views import CreateUserView, DashboardView, ManageUserView
 
 
 urlpatterns = [
     path("register/", CreateUserView.as_view(), name="register"),
     path("me/", ManageUserView.as_view(), name="manage"),
+    path("me/dashboard/", DashboardView.as_view(), name="dashboard"),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
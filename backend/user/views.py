@@ -1,10 +1,17 @@
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from schemas.user_schema_decorator import create_user_schema, manage_schema_view
-from user.serializers import UserSerializer
+from borrowing.models import Borrowing
+from borrowing.summary import get_summary
+from schemas.user_schema_decorator import (
+    create_user_schema,
+    dashboard_schema,
+    manage_schema_view,
+)
+from user.serializers import DashboardSerializer, UserSerializer
 
 
 @extend_schema(tags=["user"])
@@ -22,3 +29,37 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         return self.request.user
+
+
+@extend_schema(tags=["user"])
+@dashboard_schema()
+class DashboardView(generics.GenericAPIView):
+    """
+    Everything the landing screen shows, in one response.
+
+    The profile comes with the authenticated user, the figures from the
+    maintained ``BorrowingSummary`` row and the active borrowings from one
+    query, soonest due first, so the whole response costs the JWT user
+    lookup plus two queries.
+    """
+
+    serializer_class = DashboardSerializer
+    authentication_classes = (JWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    active_borrowings_limit = 20
+
+    def get(self, request):
+        user = request.user
+        active_borrowings = Borrowing.objects.filter(
+            user=user, actual_return_date__isnull=True
+        ).order_by("expected_return_date", "id")
+        serializer = self.get_serializer(
+            {
+                "user": user,
+                "summary": get_summary(user),
+                "active_borrowings": active_borrowings[
+                    :self.active_borrowings_limit
+                ],
+            }
+        )
+        return Response(serializer.data)